@@ -1,11 +1,25 @@
 """LLM Adapters"""
 
-from .base import BaseLLMAdapter, LLMResponse
+from .base import BaseLLMAdapter, DelegatingAdapter, LayeredPrompt, LLMResponse, PARSE_ERROR
+from .schema import ACTION_SCHEMA, ACTION_ONLY_SCHEMA, CONTENT_SCHEMA, EXTRA_ACTION_FIELDS
+from .jsonparse import extract_json_object
+from .observation import Observation
 from .mock import MockAdapter
 from .ollama import OllamaAdapter
 from .anthropic import AnthropicAdapter
 from .openai import OpenAIAdapter
 from .google import GoogleAdapter
+from .pool import ClientPool, get_client_pool
+from .streaming import StreamingJSONExtractor, StreamStats
+from .session import ChatSession
+from .twophase import TwoPhaseAdapter
+from .cache import CachingAdapter, ResponseCache, make_cache_key
+from .router import OllamaRouter, RoutedAdapter
+from .hedging import HedgingAdapter, LatencyTracker
+from .scheduler import RequestScheduler, ScheduledAdapter, ProviderLimits, RetryPolicy, TokenBucket
+from .cassette import (
+    Cassette, CassetteDivergence, RecordingAdapter, ReplayAdapter, cassette_from_simulation_log,
+)
 
 
 # 어댑터 레지스트리
@@ -15,6 +29,8 @@ ADAPTER_REGISTRY = {
     "anthropic": AnthropicAdapter,
     "openai": OpenAIAdapter,
     "google": GoogleAdapter,
+    "record": RecordingAdapter,
+    "replay": ReplayAdapter,
 }
 
 
@@ -28,12 +44,44 @@ def create_adapter(adapter_type: str, **kwargs) -> BaseLLMAdapter:
 
 __all__ = [
     "BaseLLMAdapter",
+    "DelegatingAdapter",
+    "LayeredPrompt",
     "LLMResponse",
+    "PARSE_ERROR",
+    "ACTION_SCHEMA",
+    "ACTION_ONLY_SCHEMA",
+    "CONTENT_SCHEMA",
+    "EXTRA_ACTION_FIELDS",
+    "extract_json_object",
+    "Observation",
     "MockAdapter",
     "OllamaAdapter",
     "AnthropicAdapter",
     "OpenAIAdapter",
     "GoogleAdapter",
+    "ClientPool",
+    "get_client_pool",
+    "StreamingJSONExtractor",
+    "StreamStats",
+    "ChatSession",
+    "TwoPhaseAdapter",
+    "CachingAdapter",
+    "ResponseCache",
+    "make_cache_key",
+    "OllamaRouter",
+    "RoutedAdapter",
+    "HedgingAdapter",
+    "LatencyTracker",
+    "RequestScheduler",
+    "ScheduledAdapter",
+    "ProviderLimits",
+    "RetryPolicy",
+    "TokenBucket",
+    "Cassette",
+    "CassetteDivergence",
+    "RecordingAdapter",
+    "ReplayAdapter",
+    "cassette_from_simulation_log",
     "ADAPTER_REGISTRY",
     "create_adapter",
 ]
@@ -1,14 +1,52 @@
 """Anthropic Claude LLM 어댑터"""
 
+import json
 import os
+import threading
 from typing import Optional
 
-from .base import BaseLLMAdapter, LLMResponse
+from .base import BaseLLMAdapter, LayeredPrompt, LLMResponse
+from .pool import get_client_pool
+from .schema import ANTHROPIC_TOOL_NAME, to_anthropic_tool
+
+
+# 응답 usage에서 모으는 토큰 항목
+USAGE_FIELDS = (
+    "input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens",
+)
+
+
+class PromptCacheStats:
+    """호출별 usage 누적 (프롬프트 캐시 생성/읽기 토큰, 스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.totals = dict.fromkeys(USAGE_FIELDS, 0)
+
+    def record(self, usage: dict) -> None:
+        with self._lock:
+            self.calls += 1
+            for key in USAGE_FIELDS:
+                self.totals[key] += usage.get(key) or 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            read = self.totals["cache_read_input_tokens"]
+            prompt_tokens = read + self.totals["cache_creation_input_tokens"] + self.totals["input_tokens"]
+            return {
+                "calls": self.calls,
+                **self.totals,
+                "cache_read_ratio": round(read / prompt_tokens, 4) if prompt_tokens else 0.0,
+            }
 
 
 class AnthropicAdapter(BaseLLMAdapter):
     """Anthropic Claude 어댑터"""
 
+    provider = "anthropic"
+    supports_streaming = True
+
     def __init__(
         self,
         model: str = "claude-3-5-sonnet-20241022",
@@ -18,47 +56,196 @@ class AnthropicAdapter(BaseLLMAdapter):
         super().__init__(model, **kwargs)
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         self.max_tokens = kwargs.get("max_tokens", 1000)
+        self.prompt_cache = PromptCacheStats()
+
+    @property
+    def min_cache_tokens(self) -> int:
+        """cache_control을 붙인 접두사가 실제로 캐시되는 최소 길이 (Haiku 2048, 그 외 1024 토큰)"""
+        return 2048 if "haiku" in self.model else 1024
 
-    def generate(self, prompt: str, max_tokens: int = 1000) -> LLMResponse:
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
         """Claude API를 통해 응답 생성"""
         if not self.api_key:
-            return LLMResponse(
-                thought="ANTHROPIC_API_KEY가 설정되지 않았습니다",
-                action="idle",
-                raw_response={"error": "no_api_key"},
-                success=False,
-                error="API 키 없음",
-            )
+            return self._no_api_key_response()
 
-        try:
-            import anthropic
+        if self.stream and response_schema is None:
+            return self.generate_streaming(prompt, max_tokens)
 
-            client = anthropic.Anthropic(api_key=self.api_key)
+        try:
+            client = self._client()
 
             message = client.messages.create(
                 model=self.model,
                 max_tokens=max_tokens,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
+                **self._prompt_kwargs(prompt),
+                **self._tool_kwargs(response_schema),
             )
 
-            raw_text = message.content[0].text
-            return self.parse_response(raw_text)
+            return self._parse_message(message, response_schema)
 
         except ImportError:
-            return LLMResponse(
-                thought="anthropic 패키지가 설치되지 않았습니다",
-                action="idle",
-                raw_response={"error": "import_error"},
-                success=False,
-                error="pip install anthropic 필요",
-            )
+            return self._import_error_response()
         except Exception as e:
-            return LLMResponse(
-                thought=f"Claude API 오류: {str(e)}",
-                action="idle",
-                raw_response={"error": str(e)},
-                success=False,
-                error=str(e),
+            return self._error_response(e)
+
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        """AsyncAnthropic 클라이언트로 응답 생성"""
+        if not self.api_key:
+            return self._no_api_key_response()
+
+        if self.stream and response_schema is None:
+            return await self.agenerate_streaming(prompt, max_tokens)
+
+        try:
+            client = self._async_client()
+
+            message = await client.messages.create(
+                model=self.model,
+                max_tokens=max_tokens,
+                **self._prompt_kwargs(prompt),
+                **self._tool_kwargs(response_schema),
             )
+
+            return self._parse_message(message, response_schema)
+
+        except ImportError:
+            return self._import_error_response()
+        except Exception as e:
+            return self._error_response(e)
+
+    @staticmethod
+    def _prompt_kwargs(prompt: str) -> dict:
+        """LayeredPrompt면 고정 블록을 cache_control을 붙인 system으로, 가변 블록만 user로"""
+        if isinstance(prompt, LayeredPrompt):
+            return {
+                "system": [{
+                    "type": "text",
+                    "text": prompt.system,
+                    "cache_control": {"type": "ephemeral"},
+                }],
+                "messages": [{"role": "user", "content": prompt.user}],
+            }
+        return {"messages": [{"role": "user", "content": prompt}]}
+
+    @staticmethod
+    def _tool_kwargs(response_schema: Optional[dict]) -> dict:
+        """스키마가 있으면 단일 도구를 강제 호출하게 해서 입력을 스키마로 제약"""
+        if response_schema is None:
+            return {}
+        return {
+            "tools": [to_anthropic_tool(response_schema)],
+            "tool_choice": {"type": "tool", "name": ANTHROPIC_TOOL_NAME},
+        }
+
+    def _parse_message(self, message, response_schema: Optional[dict]) -> LLMResponse:
+        """tool_use 블록이 있으면 그 입력을, 없으면 텍스트를 파싱 (usage는 raw_response에)"""
+        response = None
+        if response_schema is not None:
+            for block in message.content:
+                if block.type == "tool_use" and isinstance(block.input, dict):
+                    raw_text = json.dumps(block.input, ensure_ascii=False)
+                    response = self._response_from_data(block.input, raw_text)
+                    break
+
+        if response is None:
+            raw_text = "".join(block.text for block in message.content if block.type == "text")
+            response = self.parse_response(raw_text)
+
+        usage = self._usage(message)
+        if usage is not None:
+            response.raw_response["usage"] = usage
+            self.prompt_cache.record(usage)
+        return response
+
+    @staticmethod
+    def _usage(message) -> Optional[dict]:
+        """message.usage의 입력/출력/캐시 생성/캐시 읽기 토큰"""
+        usage = getattr(message, "usage", None)
+        if usage is None:
+            return None
+        return {key: getattr(usage, key, None) or 0 for key in USAGE_FIELDS}
+
+    def stream_text(self, prompt: str, max_tokens: int = 1000):
+        """messages.stream의 텍스트 델타 (제너레이터를 닫으면 스트림도 닫힌다)"""
+        client = self._client()
+        with client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            **self._prompt_kwargs(prompt),
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+
+    async def astream_text(self, prompt: str, max_tokens: int = 1000):
+        """stream_text()의 비동기 버전"""
+        client = self._async_client()
+        async with client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            **self._prompt_kwargs(prompt),
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    def _client(self) -> "anthropic.Anthropic":
+        """API 키별로 공유되는 동기 클라이언트"""
+        import anthropic
+
+        pool = get_client_pool()
+        return pool.get(
+            "anthropic",
+            lambda: anthropic.Anthropic(
+                api_key=self.api_key,
+                http_client=pool.httpx_client(anthropic),
+            ),
+            api_key=self.api_key,
+        )
+
+    def _async_client(self) -> "anthropic.AsyncAnthropic":
+        """이벤트 루프/API 키별로 공유되는 비동기 클라이언트"""
+        import anthropic
+
+        pool = get_client_pool()
+        return pool.get_async(
+            "anthropic",
+            lambda: anthropic.AsyncAnthropic(
+                api_key=self.api_key,
+                http_client=pool.httpx_client(anthropic, asynchronous=True),
+            ),
+            api_key=self.api_key,
+        )
+
+    def sampling_params(self) -> dict:
+        """temperature를 보내지 않으므로 API 기본값을 사용"""
+        return {}
+
+    def _no_api_key_response(self) -> LLMResponse:
+        return LLMResponse(
+            thought="ANTHROPIC_API_KEY가 설정되지 않았습니다",
+            action="idle",
+            raw_response={"error": "no_api_key"},
+            success=False,
+            error="API 키 없음",
+        )
+
+    def _import_error_response(self) -> LLMResponse:
+        return LLMResponse(
+            thought="anthropic 패키지가 설치되지 않았습니다",
+            action="idle",
+            raw_response={"error": "import_error"},
+            success=False,
+            error="pip install anthropic 필요",
+        )
+
+    def _error_response(self, e: Exception) -> LLMResponse:
+        return LLMResponse(
+            thought=f"Claude API 오류: {str(e)}",
+            action="idle",
+            raw_response={"error": str(e), **self.error_details(e)},
+            success=False,
+            error=str(e),
+        )
@@ -3,8 +3,35 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import Optional, Any
+import asyncio
 import json
-import re
+
+from .jsonparse import extract_json_object
+from .observation import Observation
+from .schema import EXTRA_ACTION_FIELDS
+from .streaming import StreamingJSONExtractor, StreamStats
+
+
+# parse_response가 JSON을 찾지 못했을 때의 error 값 (모델별 파싱 실패율 집계에 사용)
+PARSE_ERROR = "JSON 파싱 실패"
+
+
+class LayeredPrompt(str):
+    """고정 블록(system)과 가변 블록(user)으로 나뉜 프롬프트
+
+    문자열 값은 두 블록을 이은 전체 프롬프트라서 캐시 키/카세트/일반 어댑터에는
+    평범한 str로 보인다. 프롬프트 접두사 캐시를 지원하는 어댑터(Anthropic)만
+    두 블록을 나눠 system 블록을 캐시 대상으로 보낸다.
+    """
+
+    def __new__(cls, system: str, user: str):
+        obj = super().__new__(cls, f"{system}\n\n{user}")
+        obj.system = system
+        obj.user = user
+        return obj
+
+    def __getnewargs__(self):
+        return (self.system, self.user)
 
 
 @dataclass
@@ -17,6 +44,7 @@ class LLMResponse:
     raw_response: dict = field(default_factory=dict)
     success: bool = True
     error: Optional[str] = None
+    extra: dict = field(default_factory=dict)  # 건축가 스킬 필드 (skill, amount, new_rate, message)
 
     def to_action_dict(self) -> dict:
         """시뮬레이션에서 사용할 action dict로 변환"""
@@ -25,38 +53,204 @@ class LLMResponse:
             action_dict["target"] = self.target
         if self.content:
             action_dict["content"] = self.content
+        action_dict.update(self.extra)
         return action_dict
 
+    @property
+    def parse_failed(self) -> bool:
+        """모델이 답했지만 JSON을 찾지 못한 호출인지"""
+        return self.error == PARSE_ERROR
+
 
 class BaseLLMAdapter(ABC):
     """LLM 어댑터 추상 클래스"""
 
+    # 응답이 프롬프트에만 의존하는지 여부. True면 턴 순서보다 먼저(투기적으로)
+    # 호출해도 결과 분포가 같다. 전역 상태(random 등)를 쓰는 어댑터는 False.
+    speculative_safe: bool = True
+
+    # 요청 스케줄러가 동시성/속도 제한을 묶는 단위
+    provider: str = "unknown"
+
+    # 결정에 텍스트 프롬프트가 필요한지. False면 decide()가 Observation의 구조화된
+    # 필드만 읽으므로 시뮬레이션이 프롬프트를 렌더링하지 않는다 (규칙 기반 어댑터 등)
+    needs_prompt: bool = True
+
+    # stream_text()(필요하면 astream_text()도)를 구현해 스트리밍 생성을 지원하는지.
+    # False인 어댑터는 stream 설정을 받아도 일반 요청으로 생성한다
+    supports_streaming: bool = False
+
+    # 동기 호출보다 비동기 호출이 나은 어댑터 (헤지처럼 진 요청을 취소해야 하는 경우):
+    # 시뮬레이션은 순차 턴에서도 adecide()를 이벤트 루프로 실행한다
+    prefers_async: bool = False
+
     def __init__(self, model: str, **kwargs):
         self.model = model
         self.config = kwargs
+        self.temperature = kwargs.get("temperature", 0.7)
+        # 스트리밍 생성 (JSON 결정 객체가 닫히면 조기 종료). 통계는 여러 어댑터가 공유 가능
+        self.stream = bool(kwargs.get("stream", False)) and self.supports_streaming
+        self.stream_stats: StreamStats = kwargs.get("stream_stats") or StreamStats()
 
     @abstractmethod
-    def generate(self, prompt: str, max_tokens: int = 1000) -> LLMResponse:
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
         """프롬프트를 전달하고 구조화된 응답을 반환"""
         pass
 
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        """generate()의 비동기 버전
+
+        기본 구현은 동기 generate()를 워커 스레드로 넘겨 이벤트 루프를 막지 않는다.
+        네이티브 async 클라이언트가 있는 어댑터는 이 메서드를 오버라이드한다.
+        """
+        return await asyncio.to_thread(self.generate, prompt, max_tokens, response_schema)
+
+    def decide(
+        self,
+        observation: Observation,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        """에이전트 턴 결정 (기본: 관측의 프롬프트로 generate 호출)"""
+        return self.generate(observation.prompt, max_tokens, response_schema)
+
+    async def adecide(
+        self,
+        observation: Observation,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        """decide()의 비동기 버전"""
+        return await self.agenerate(observation.prompt, max_tokens, response_schema)
+
+    def sampling_params(self) -> dict:
+        """응답에 영향을 주는 샘플링 파라미터 (캐시 키 등에 사용)"""
+        return {"temperature": self.temperature}
+
+    # ---------- 스트리밍 ----------
+
+    # supports_streaming인 어댑터가 구현하는 메서드:
+    #   stream_text(prompt, max_tokens) -> Iterator[str]: 텍스트 청크를 순서대로 내보내는
+    #       제너레이터. 닫으면(close) 요청이 취소되어야 한다
+    #   astream_text(prompt, max_tokens) -> AsyncIterator[str]: 비동기 버전 (선택)
+
+    def generate_streaming(self, prompt: str, max_tokens: int = 1000) -> LLMResponse:
+        """스트리밍으로 받다가 action이 있는 JSON 객체가 완성되면 즉시 끊고 파싱
+
+        supports_streaming인 어댑터만 호출한다 (stream은 그런 어댑터에서만 켜진다).
+        """
+        extractor = StreamingJSONExtractor()
+        chunks = self.stream_text(prompt, max_tokens)
+        try:
+            for chunk in chunks:
+                if extractor.feed(chunk) is not None:
+                    break
+        except Exception as e:
+            return self._stream_error_response(e)
+        finally:
+            chunks.close()
+        return self._finish_stream(extractor, max_tokens)
+
+    async def agenerate_streaming(self, prompt: str, max_tokens: int = 1000) -> LLMResponse:
+        """generate_streaming()의 비동기 버전 (네이티브 async 스트림이 없으면 스레드로 위임)"""
+        astream_text = getattr(self, "astream_text", None)
+        if astream_text is None:
+            return await asyncio.to_thread(self.generate_streaming, prompt, max_tokens)
+
+        extractor = StreamingJSONExtractor()
+        chunks = astream_text(prompt, max_tokens)
+        try:
+            async for chunk in chunks:
+                if extractor.feed(chunk) is not None:
+                    break
+        except Exception as e:
+            return self._stream_error_response(e)
+        finally:
+            await chunks.aclose()
+        return self._finish_stream(extractor, max_tokens)
+
+    def _finish_stream(self, extractor: StreamingJSONExtractor, max_tokens: int) -> LLMResponse:
+        # core 패키지가 adapters를 가져오므로 모듈 수준이 아니라 여기서 가져온다
+        from ..core.budget import estimate_prompt_tokens
+
+        early_stop = extractor.done
+        tokens_received = estimate_prompt_tokens(extractor.text)
+        # 끊지 않았다면 모델이 더 쓸 수 있었던 출력 예산 (실제로 아낀 토큰이 아니라 그 상한)
+        unused_budget = max(0, max_tokens - tokens_received) if early_stop else 0
+        self.stream_stats.record(tokens_received, unused_budget, early_stop)
+
+        if early_stop:
+            response = self._response_from_data(extractor.result, extractor.text)
+        else:
+            response = self.parse_response(extractor.text)
+        response.raw_response["stream"] = {
+            "early_stop": early_stop,
+            "tokens_received": tokens_received,
+            "unused_budget_tokens": unused_budget,
+        }
+        return response
+
+    def _stream_error_response(self, e: Exception) -> LLMResponse:
+        """스트리밍 중 예외를 응답으로 변환 (어댑터별 매핑이 필요하면 오버라이드)"""
+        if isinstance(e, ImportError):
+            return self._import_error_response()
+        return self._error_response(e)
+
+    def _import_error_response(self) -> LLMResponse:
+        return LLMResponse(
+            thought=f"{self.name}에 필요한 패키지가 설치되지 않았습니다",
+            action="idle",
+            raw_response={"error": "import_error"},
+            success=False,
+            error="패키지 설치 필요",
+        )
+
+    def _error_response(self, e: Exception) -> LLMResponse:
+        return LLMResponse(
+            thought=f"{self.name} 오류: {str(e)}",
+            action="idle",
+            raw_response={"error": str(e), **self.error_details(e)},
+            success=False,
+            error=str(e),
+        )
+
+    @staticmethod
+    def error_details(e: Exception) -> dict:
+        """예외에서 HTTP 상태 코드와 Retry-After(초)를 추출 (재시도 판단용)
+
+        requests/httpx의 HTTP 오류, anthropic/openai SDK의 APIStatusError(status_code),
+        google api_core 예외(code)를 모두 다룬다.
+        """
+        details = {}
+        response = getattr(e, "response", None)
+        status_code = getattr(e, "status_code", None) or getattr(response, "status_code", None)
+        if status_code is None and isinstance(getattr(e, "code", None), int):
+            status_code = e.code
+        if status_code is not None:
+            details["status_code"] = int(status_code)
+
+        headers = getattr(response, "headers", None)
+        retry_after = headers.get("retry-after") if headers is not None else None
+        if retry_after is not None:
+            try:
+                details["retry_after"] = float(retry_after)
+            except ValueError:
+                pass  # HTTP-date 형식은 무시하고 백오프 사용
+        return details
+
     def parse_response(self, raw_text: str) -> LLMResponse:
         """LLM 응답을 LLMResponse로 파싱"""
-        try:
-            # JSON 블록 추출 시도
-            json_match = re.search(r'\{[^{}]*\}', raw_text, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
-                return LLMResponse(
-                    thought=data.get("thought", ""),
-                    action=data.get("action", "idle"),
-                    target=data.get("target"),
-                    content=data.get("content"),
-                    raw_response={"text": raw_text, "parsed": data},
-                    success=True,
-                )
-        except json.JSONDecodeError:
-            pass
+        # 중첩/코드 펜스를 인식하는 스캐너로 JSON 블록 추출 (필요하면 국소 수리)
+        data, repaired = extract_json_object(raw_text)
+        if data is not None:
+            response = self._response_from_data(data, raw_text)
+            if repaired:
+                response.raw_response["repaired"] = True
+            return response
 
         # 파싱 실패 시 기본 응답
         return LLMResponse(
@@ -64,7 +258,35 @@ class BaseLLMAdapter(ABC):
             action="idle",
             raw_response={"text": raw_text},
             success=False,
-            error="JSON 파싱 실패",
+            error=PARSE_ERROR,
+        )
+
+    def _parse(self, raw_text: str, response_schema: Optional[dict]) -> LLMResponse:
+        """스키마를 넘긴 호출이면 구조화 파싱, 아니면 일반 파싱"""
+        if response_schema is not None:
+            return self.parse_structured(raw_text)
+        return self.parse_response(raw_text)
+
+    def parse_structured(self, raw_text: str) -> LLMResponse:
+        """스키마로 제약된 출력 파싱 (본문 전체가 JSON 객체, 실패 시 일반 파싱)"""
+        try:
+            data = json.loads(raw_text)
+            if isinstance(data, dict):
+                return self._response_from_data(data, raw_text)
+        except json.JSONDecodeError:
+            pass
+        return self.parse_response(raw_text)
+
+    def _response_from_data(self, data: dict, raw_text: str) -> LLMResponse:
+        """파싱된 JSON dict를 LLMResponse로"""
+        return LLMResponse(
+            thought=data.get("thought") or "",
+            action=data.get("action") or "idle",
+            target=data.get("target"),
+            content=data.get("content"),
+            raw_response={"text": raw_text, "parsed": data},
+            success=True,
+            extra={k: data[k] for k in EXTRA_ACTION_FIELDS if data.get(k) is not None},
         )
 
     def validate_action(self, response: LLMResponse, valid_actions: list[str]) -> LLMResponse:
@@ -78,3 +300,86 @@ class BaseLLMAdapter(ABC):
     def name(self) -> str:
         """어댑터 이름"""
         return self.__class__.__name__
+
+    def unwrap(self) -> "BaseLLMAdapter":
+        """래퍼(캐시, 스케줄러 등)를 모두 벗긴 실제 어댑터"""
+        return self
+
+
+class DelegatingAdapter(BaseLLMAdapter):
+    """다른 어댑터를 감싸는 어댑터의 공통 기반 (캐시, 녹화 등)
+
+    감싼 어댑터의 속성(agent_id, base_url 등)과 이름은 그대로 노출한다.
+    프롬프트가 필요 없는 어댑터(mock 등)를 감싸면 결정도 그 어댑터의 decide()로 넘겨
+    감싸지 않았을 때와 같은 경로(프롬프트 렌더링 없음)로 결정한다.
+    """
+
+    def __init__(self, inner: BaseLLMAdapter, **kwargs):
+        super().__init__(inner.model, **kwargs)
+        self.inner = inner
+
+    @property
+    def speculative_safe(self) -> bool:
+        return self.inner.speculative_safe
+
+    @property
+    def provider(self) -> str:
+        return self.inner.provider
+
+    @property
+    def supports_streaming(self) -> bool:
+        return self.inner.supports_streaming
+
+    @property
+    def prefers_async(self) -> bool:
+        return self.inner.prefers_async
+
+    @property
+    def needs_prompt(self) -> bool:
+        return self.inner.needs_prompt
+
+    def decide(
+        self,
+        observation: Observation,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        if self.inner.needs_prompt:
+            # 프롬프트 기반이면 이 래퍼의 generate()를 거친다 (캐시, 스케줄링 등)
+            return super().decide(observation, max_tokens, response_schema)
+        return self.inner.decide(observation, max_tokens, response_schema)
+
+    async def adecide(
+        self,
+        observation: Observation,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        if self.inner.needs_prompt:
+            return await super().adecide(observation, max_tokens, response_schema)
+        return await self.inner.adecide(observation, max_tokens, response_schema)
+
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        return self.inner.generate(prompt, max_tokens, response_schema)
+
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        return await self.inner.agenerate(prompt, max_tokens, response_schema)
+
+    def sampling_params(self) -> dict:
+        return self.inner.sampling_params()
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    def unwrap(self) -> BaseLLMAdapter:
+        return self.inner.unwrap()
+
+    def __getattr__(self, item: str) -> Any:
+        if item == "inner":
+            raise AttributeError(item)
+        return getattr(self.inner, item)
@@ -0,0 +1,220 @@
+"""콘텐츠 주소 기반 LLM 응답 캐시 (SQLite, LRU 제거)
+
+같은 시드로 설정을 다시 돌리거나 예전 런의 인터뷰를 다시 실행하면 동일한 프롬프트가
+반복된다. (어댑터 종류, 모델, 프롬프트, max_tokens, 샘플링 파라미터)의 해시를 키로
+응답을 로컬 SQLite 파일에 저장해 두고 재사용한다.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+from .base import BaseLLMAdapter, DelegatingAdapter, LLMResponse
+
+
+def make_cache_key(
+    adapter_type: str,
+    model: str,
+    prompt: str,
+    max_tokens: int,
+    sampling_params: Optional[dict] = None,
+    response_schema: Optional[dict] = None,
+) -> str:
+    """응답을 결정하는 입력 전체의 SHA-256 해시"""
+    key_fields = {
+        "adapter": adapter_type,
+        "model": model,
+        "prompt": prompt,
+        "max_tokens": max_tokens,
+        "sampling": sampling_params or {},
+    }
+    # 스키마 없는 호출의 키는 기존 캐시와 호환되도록 그대로 둔다
+    if response_schema is not None:
+        key_fields["schema"] = response_schema
+    payload = json.dumps(key_fields, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite 기반 응답 저장소 (항목 수/용량 초과 시 가장 오래 안 쓴 항목부터 제거)
+
+    last_access는 벽시계 시각이 아니라 접근할 때마다 1씩 늘어나는 순번이다. time.time()은
+    해상도가 거칠어 연달아 접근하면 같은 값이 나올 수 있고, 시계가 뒤로 가면 순서가 뒤집힌다.
+    순번은 파일에 남은 가장 큰 값에서 이어가므로 예전 캐시 파일도 그대로 쓸 수 있다.
+    """
+
+    def __init__(
+        self,
+        path: str = "cache/llm_responses.sqlite",
+        max_entries: int = 50000,
+        max_bytes: Optional[int] = None,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+        )
+        self._conn.commit()
+        self._clock = self._conn.execute(
+            "SELECT COALESCE(MAX(last_access), 0) FROM responses"
+        ).fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        """캐시 조회 (hit이면 접근 순번 갱신)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (self._tick(), key)
+            )
+            self._conn.commit()
+            return json.loads(row[0])
+
+    def put(self, key: str, value: dict) -> None:
+        """캐시 저장 후 한도 초과분 제거"""
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, encoded, len(encoded.encode("utf-8")), self._tick()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _tick(self) -> float:
+        """다음 접근 순번 (lock 보유 상태에서 호출)"""
+        self._clock += 1
+        return self._clock
+
+    def _evict(self) -> None:
+        """LRU 제거 (lock 보유 상태에서 호출)"""
+        count, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+        excess = max(0, count - self.max_entries) if self.max_entries else 0
+        if excess:
+            self._delete_oldest(excess)
+
+        if self.max_bytes and total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC"
+            ).fetchall()
+            over = total_bytes - self.max_bytes
+            victims = []
+            for key, size in rows:
+                if over <= 0:
+                    break
+                victims.append((key,))
+                over -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+            self.evictions += len(victims)
+
+    def _delete_oldest(self, n: int) -> None:
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN "
+            "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+            (n,),
+        )
+        self.evictions += n
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> dict:
+        """hit/miss 통계"""
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachingAdapter(DelegatingAdapter):
+    """응답 캐시를 거치는 어댑터 래퍼
+
+    모델이 실제로 답한 응답만 저장한다. JSON 파싱에 실패한 자유 텍스트(인터뷰 답변 등)도
+    원문이 있으므로 저장하고, 연결 오류/타임아웃/API 오류는 다음 실행에서 다시 시도한다.
+    """
+
+    def __init__(self, inner: BaseLLMAdapter, cache: ResponseCache, **kwargs):
+        super().__init__(inner, **kwargs)
+        self.cache = cache
+
+    def _key(self, prompt: str, max_tokens: int, response_schema: Optional[dict]) -> str:
+        return make_cache_key(
+            self.inner.name,
+            self.inner.model,
+            prompt,
+            max_tokens,
+            self.inner.sampling_params(),
+            response_schema,
+        )
+
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        key = self._key(prompt, max_tokens, response_schema)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return LLMResponse(**cached)
+
+        response = self.inner.generate(prompt, max_tokens, response_schema)
+        if self._is_cacheable(response):
+            self.cache.put(key, asdict(response))
+        return response
+
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        key = self._key(prompt, max_tokens, response_schema)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return LLMResponse(**cached)
+
+        response = await self.inner.agenerate(prompt, max_tokens, response_schema)
+        if self._is_cacheable(response):
+            self.cache.put(key, asdict(response))
+        return response
+
+    @staticmethod
+    def _is_cacheable(response: LLMResponse) -> bool:
+        return response.success or "text" in response.raw_response
@@ -0,0 +1,319 @@
+"""녹화/재생 카세트 어댑터 (완전 오프라인 재현용)
+
+record 모드는 감싼 어댑터의 모든 generate() 호출(에이전트 결정과 사후 인터뷰)과
+프롬프트 없이 관측으로 결정하는 어댑터(mock 등)의 decide() 호출을 에이전트별 순번과
+함께 append-only JSONL 카세트에 기록한다. replay 모드는 같은
+카세트에서 에이전트별로 순서대로 응답을 꺼내 돌려주므로 Ollama나 API 키 없이
+런을 다시 실행할 수 있다. 재생 중 프롬프트 해시가 기록과 다르면 divergence로 집계한다.
+
+주의: 재생은 기록된 "응답"을 돌려줄 뿐이므로, 전역 random을 소비하는 MockAdapter로
+녹화한 런은 재생 시 난수 흐름이 달라져 결과가 갈라진다. 실제 LLM 런이 대상이다.
+"""
+
+import hashlib
+import itertools
+import json
+import threading
+from collections import deque
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional, Union
+
+from .base import BaseLLMAdapter, DelegatingAdapter, LLMResponse
+from .observation import Observation
+from .schema import EXTRA_ACTION_FIELDS
+
+
+def prompt_hash(prompt: str) -> str:
+    """카세트에 저장하는 프롬프트 지문"""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class CassetteDivergence(RuntimeError):
+    """strict 재생 중 프롬프트가 기록과 달라졌거나 카세트가 바닥났을 때"""
+
+
+class Cassette:
+    """에이전트별 응답 트랙을 담은 append-only JSONL 파일
+
+    한 줄이 한 호출이다:
+        {"agent_id", "seq", "prompt_hash", "prompt", "max_tokens", "raw_text", "raw_response", "response"}
+    response는 raw_response의 "text"를 뺀 LLMResponse (원문은 raw_text에 한 번만 저장).
+    """
+
+    def __init__(self, path: Union[str, Path], store_prompts: bool = True):
+        self.path = Path(path)
+        self.store_prompts = store_prompts
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._tracks: Optional[dict[str, deque]] = None
+
+        self.recorded = 0
+        self.replayed = 0
+        self.divergences = 0
+        self.divergence_samples: list[dict] = []
+        self.exhausted = 0
+
+    # ---------- 녹화 ----------
+
+    def record(
+        self, agent_id: str, seq: int, prompt: Optional[str], max_tokens: int, response: LLMResponse
+    ) -> None:
+        """호출 한 건을 카세트 끝에 추가 (prompt가 None이면 재생 시 divergence 검사 생략)"""
+        data = asdict(response)
+        raw_response = dict(data.pop("raw_response") or {})
+        entry = {
+            "agent_id": agent_id,
+            "seq": seq,
+            "prompt_hash": prompt_hash(prompt) if prompt is not None else None,
+            "prompt": prompt if self.store_prompts else None,
+            "max_tokens": max_tokens,
+            "raw_text": raw_response.pop("text", None),
+            "raw_response": raw_response or None,
+            "response": data,
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+    # ---------- 재생 ----------
+
+    def _load(self) -> dict[str, deque]:
+        tracks: dict[str, list[dict]] = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    tracks.setdefault(entry["agent_id"], []).append(entry)
+        return {
+            agent_id: deque(sorted(entries, key=lambda e: e["seq"]))
+            for agent_id, entries in tracks.items()
+        }
+
+    def next_response(self, agent_id: str, prompt: str, strict: bool = False) -> Optional[LLMResponse]:
+        """agent_id 트랙의 다음 응답 (없으면 None)"""
+        with self._lock:
+            if self._tracks is None:
+                self._tracks = self._load()
+
+            track = self._tracks.get(agent_id)
+            if not track:
+                self.exhausted += 1
+                if strict:
+                    raise CassetteDivergence(f"{agent_id}: 카세트에 남은 응답이 없습니다")
+                return None
+
+            entry = track.popleft()
+            self.replayed += 1
+
+            expected = entry.get("prompt_hash")
+            if expected is not None and expected != prompt_hash(prompt):
+                self.divergences += 1
+                if len(self.divergence_samples) < 20:
+                    self.divergence_samples.append({"agent_id": agent_id, "seq": entry["seq"]})
+                if strict:
+                    raise CassetteDivergence(
+                        f"{agent_id} #{entry['seq']}: 프롬프트가 기록과 다릅니다"
+                    )
+
+        raw_response = dict(entry.get("raw_response") or {})
+        if entry.get("raw_text") is not None:
+            raw_response["text"] = entry["raw_text"]
+        return LLMResponse(**{**entry["response"], "raw_response": raw_response})
+
+    def stats(self) -> dict:
+        """녹화/재생 통계"""
+        return {
+            "path": str(self.path),
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "divergences": self.divergences,
+            "divergence_samples": self.divergence_samples,
+            "exhausted": self.exhausted,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class RecordingAdapter(DelegatingAdapter):
+    """감싼 어댑터의 응답을 카세트에 기록하는 래퍼
+
+    프롬프트가 필요 없는 어댑터는 decide()를 그대로 넘기고 그 결과를 같은 순번으로 기록하므로,
+    감싸지 않았을 때와 같은 경로로 결정한다 (프롬프트는 렌더링된 경우에만 저장).
+    """
+
+    def __init__(
+        self,
+        inner: BaseLLMAdapter,
+        cassette: Union[Cassette, str, Path],
+        agent_id: Optional[str] = None,
+        **kwargs
+    ):
+        super().__init__(inner, **kwargs)
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        self.agent_id = agent_id or getattr(inner, "agent_id", "unknown")
+        # next()가 원자적이라 동시 호출에도 순번이 겹치지 않는다
+        self._seq = itertools.count()
+
+    def _next_seq(self) -> int:
+        return next(self._seq)
+
+    def sibling(self, inner: BaseLLMAdapter) -> "RecordingAdapter":
+        """같은 에이전트 트랙에 순번을 이어서 기록하는 다른 어댑터의 녹화 래퍼
+
+        데드라인 대체 어댑터처럼 주 어댑터 대신 응답한 턴도 같은 트랙에 호출 순서대로 남겨야
+        재생할 때 에이전트별 응답 순서가 맞는다.
+        """
+        recorder = RecordingAdapter(inner, self.cassette, agent_id=self.agent_id)
+        recorder._seq = self._seq
+        return recorder
+
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        seq = self._next_seq()
+        response = self.inner.generate(prompt, max_tokens, response_schema)
+        self.cassette.record(self.agent_id, seq, prompt, max_tokens, response)
+        return response
+
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        seq = self._next_seq()
+        response = await self.inner.agenerate(prompt, max_tokens, response_schema)
+        self.cassette.record(self.agent_id, seq, prompt, max_tokens, response)
+        return response
+
+    def decide(
+        self,
+        observation: Observation,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        if self.inner.needs_prompt:
+            return super().decide(observation, max_tokens, response_schema)
+        seq = self._next_seq()
+        response = self.inner.decide(observation, max_tokens, response_schema)
+        self._record_observed(seq, observation, max_tokens, response)
+        return response
+
+    async def adecide(
+        self,
+        observation: Observation,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        if self.inner.needs_prompt:
+            return await super().adecide(observation, max_tokens, response_schema)
+        seq = self._next_seq()
+        response = await self.inner.adecide(observation, max_tokens, response_schema)
+        self._record_observed(seq, observation, max_tokens, response)
+        return response
+
+    def _record_observed(
+        self, seq: int, observation: Observation, max_tokens: int, response: LLMResponse
+    ) -> None:
+        prompt = observation.prompt if observation.rendered else None
+        self.cassette.record(self.agent_id, seq, prompt, max_tokens, response)
+
+
+class ReplayAdapter(BaseLLMAdapter):
+    """카세트에서 응답을 꺼내 주는 어댑터 (네트워크 없음)"""
+
+    # 응답이 프롬프트가 아니라 호출 순서로 정해지므로 투기 실행/캐시 대상이 아니다
+    speculative_safe = False
+    provider = "replay"
+
+    def __init__(
+        self,
+        model: str = "replay",
+        cassette: Union[Cassette, str, Path, None] = None,
+        agent_id: Optional[str] = None,
+        strict: bool = False,
+        **kwargs
+    ):
+        super().__init__(model, **kwargs)
+        if cassette is None:
+            raise ValueError("ReplayAdapter requires a cassette path")
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        self.agent_id = agent_id or "unknown"
+        self.strict = strict
+
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        """기록된 다음 응답 반환"""
+        response = self.cassette.next_response(self.agent_id, prompt, strict=self.strict)
+        if response is None:
+            return LLMResponse(
+                thought="카세트에 기록된 응답이 없습니다",
+                action="idle",
+                raw_response={"error": "cassette_exhausted"},
+                success=False,
+                error="카세트 소진",
+            )
+        return response
+
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        """메모리 조회뿐이므로 스레드로 넘기지 않고 바로 실행"""
+        return self.generate(prompt, max_tokens, response_schema)
+
+
+def cassette_from_simulation_log(log_path: Union[str, Path], cassette_path: Union[str, Path]) -> int:
+    """카세트 없이 남은 예전 런의 simulation_log.jsonl로 카세트 생성
+
+    로그에는 프롬프트가 없으므로 prompt_hash 없이 응답만 기록된다(재생 시 divergence
+    검사 생략). 건축가 스킬 인자(skill, amount, new_rate, message)가 로그에 있으면 함께
+    옮긴다. 사망 기록처럼 LLM 호출이 아닌 항목은 건너뛴다. 생성한 항목 수 반환.
+    """
+    seqs: dict[str, int] = {}
+    count = 0
+
+    with open(log_path, "r", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+
+    Path(cassette_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(cassette_path, "w", encoding="utf-8") as out:
+        for data in lines:
+            agent_id = data.get("agent_id")
+            action = data.get("action_type")
+            if not agent_id or action in (None, "death"):
+                continue
+
+            seq = seqs.get(agent_id, 0)
+            seqs[agent_id] = seq + 1
+            entry = {
+                "agent_id": agent_id,
+                "seq": seq,
+                "prompt_hash": None,
+                "prompt": None,
+                "max_tokens": None,
+                "raw_text": None,
+                "raw_response": None,
+                "response": {
+                    "thought": data.get("thought") or "",
+                    "action": action,
+                    "target": data.get("target"),
+                    "content": data.get("content"),
+                    "success": True,
+                    "error": None,
+                    "extra": {key: data[key] for key in EXTRA_ACTION_FIELDS if data.get(key) is not None},
+                },
+            }
+            out.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            count += 1
+
+    return count
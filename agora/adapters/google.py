@@ -1,14 +1,25 @@
 """Google Gemini LLM 어댑터"""
 
+import logging
 import os
 from typing import Optional
 
 from .base import BaseLLMAdapter, LLMResponse
+from .pool import get_client_pool
+from .schema import to_gemini_schema
+
+logger = logging.getLogger(__name__)
+
+# SDK 기본 클라이언트로 대체했다고 이미 경고한 속성 (프로세스당 한 번만 경고)
+_fallback_warned: set[str] = set()
 
 
 class GoogleAdapter(BaseLLMAdapter):
     """Google Gemini 어댑터"""
 
+    provider = "google"
+    supports_streaming = True
+
     def __init__(
         self,
         model: str = "gemini-1.5-pro",
@@ -18,47 +29,176 @@ class GoogleAdapter(BaseLLMAdapter):
         super().__init__(model, **kwargs)
         self.api_key = api_key or os.environ.get("GOOGLE_API_KEY")
 
-    def generate(self, prompt: str, max_tokens: int = 1000) -> LLMResponse:
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
         """Gemini API를 통해 응답 생성"""
         if not self.api_key:
-            return LLMResponse(
-                thought="GOOGLE_API_KEY가 설정되지 않았습니다",
-                action="idle",
-                raw_response={"error": "no_api_key"},
-                success=False,
-                error="API 키 없음",
-            )
+            return self._no_api_key_response()
+
+        if self.stream and response_schema is None:
+            return self.generate_streaming(prompt, max_tokens)
 
         try:
             import google.generativeai as genai
 
-            genai.configure(api_key=self.api_key)
-            model = genai.GenerativeModel(self.model)
+            model = self._get_model(genai)
 
             response = model.generate_content(
                 prompt,
                 generation_config=genai.types.GenerationConfig(
                     max_output_tokens=max_tokens,
-                    temperature=0.7,
+                    temperature=self.temperature,
+                    **self._schema_config(response_schema),
                 ),
             )
 
             raw_text = response.text
-            return self.parse_response(raw_text)
+            return self._parse(raw_text, response_schema)
 
         except ImportError:
-            return LLMResponse(
-                thought="google-generativeai 패키지가 설치되지 않았습니다",
-                action="idle",
-                raw_response={"error": "import_error"},
-                success=False,
-                error="pip install google-generativeai 필요",
+            return self._import_error_response()
+        except Exception as e:
+            return self._error_response(e)
+
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        """generate_content_async로 응답 생성"""
+        if not self.api_key:
+            return self._no_api_key_response()
+
+        if self.stream and response_schema is None:
+            return await self.agenerate_streaming(prompt, max_tokens)
+
+        try:
+            import google.generativeai as genai
+
+            model = self._get_model(genai, asynchronous=True)
+
+            response = await model.generate_content_async(
+                prompt,
+                generation_config=genai.types.GenerationConfig(
+                    max_output_tokens=max_tokens,
+                    temperature=self.temperature,
+                    **self._schema_config(response_schema),
+                ),
             )
+
+            raw_text = response.text
+            return self._parse(raw_text, response_schema)
+
+        except ImportError:
+            return self._import_error_response()
         except Exception as e:
-            return LLMResponse(
-                thought=f"Gemini API 오류: {str(e)}",
-                action="idle",
-                raw_response={"error": str(e)},
-                success=False,
-                error=str(e),
+            return self._error_response(e)
+
+    @staticmethod
+    def _schema_config(response_schema: Optional[dict]) -> dict:
+        """스키마가 있으면 JSON 출력 + response_schema 설정"""
+        if response_schema is None:
+            return {}
+        return {
+            "response_mime_type": "application/json",
+            "response_schema": to_gemini_schema(response_schema),
+        }
+
+    def stream_text(self, prompt: str, max_tokens: int = 1000):
+        """generate_content(stream=True)의 청크 텍스트"""
+        import google.generativeai as genai
+
+        model = self._get_model(genai)
+        response = model.generate_content(
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                max_output_tokens=max_tokens,
+                temperature=self.temperature,
+            ),
+            stream=True,
+        )
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    async def astream_text(self, prompt: str, max_tokens: int = 1000):
+        """stream_text()의 비동기 버전"""
+        import google.generativeai as genai
+
+        model = self._get_model(genai, asynchronous=True)
+        response = await model.generate_content_async(
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                max_output_tokens=max_tokens,
+                temperature=self.temperature,
+            ),
+            stream=True,
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    def _get_model(self, genai, asynchronous: bool = False) -> "genai.GenerativeModel":
+        """API 키를 클라이언트 옵션으로 받은 전용 클라이언트를 붙인 GenerativeModel
+
+        genai.configure(api_key=...)는 프로세스 전역이라 키가 다른 에이전트끼리 덮어쓰므로
+        쓰지 않는다. 클라이언트는 API 키별로(비동기는 이벤트 루프별로도) 풀에서 공유하고,
+        가벼운 GenerativeModel만 호출마다 만든다.
+
+        GenerativeModel은 클라이언트를 받는 생성자 인자가 없어 SDK가 게으르게 채우는
+        _client/_async_client 자리에 넣는다. SDK 버전이 바뀌어 그 자리가 없으면 덮어쓰지 않고
+        genai.configure로 SDK 기본 클라이언트를 쓰며 경고를 남긴다.
+        """
+        model = genai.GenerativeModel(self.model)
+        attribute = "_async_client" if asynchronous else "_client"
+        if not hasattr(model, attribute):
+            if attribute not in _fallback_warned:
+                _fallback_warned.add(attribute)
+                logger.warning(
+                    "google-generativeai GenerativeModel에 %s 속성이 없어 SDK 기본 클라이언트를 씁니다 "
+                    "(API 키는 genai.configure로 전역 설정, 클라이언트 풀 미사용)",
+                    attribute,
+                )
+            genai.configure(api_key=self.api_key)
+            return model
+
+        from google.ai import generativelanguage as glm
+
+        pool = get_client_pool()
+        options = {"api_key": self.api_key}
+        if asynchronous:
+            client = pool.get_async(
+                "google", lambda: glm.GenerativeServiceAsyncClient(client_options=options), api_key=self.api_key,
             )
+        else:
+            client = pool.get(
+                "google", lambda: glm.GenerativeServiceClient(client_options=options), api_key=self.api_key,
+            )
+        setattr(model, attribute, client)
+        return model
+
+    def _no_api_key_response(self) -> LLMResponse:
+        return LLMResponse(
+            thought="GOOGLE_API_KEY가 설정되지 않았습니다",
+            action="idle",
+            raw_response={"error": "no_api_key"},
+            success=False,
+            error="API 키 없음",
+        )
+
+    def _import_error_response(self) -> LLMResponse:
+        return LLMResponse(
+            thought="google-generativeai 패키지가 설치되지 않았습니다",
+            action="idle",
+            raw_response={"error": "import_error"},
+            success=False,
+            error="pip install google-generativeai 필요",
+        )
+
+    def _error_response(self, e: Exception) -> LLMResponse:
+        return LLMResponse(
+            thought=f"Gemini API 오류: {str(e)}",
+            action="idle",
+            raw_response={"error": str(e), **self.error_details(e)},
+            success=False,
+            error=str(e),
+        )
@@ -0,0 +1,171 @@
+"""지연 꼬리를 줄이는 헤지 요청
+
+느린 응답 하나가 순차 에폭 전체를 멈추게 하므로, 요청이 모델별 최근 지연의 percentile을
+넘기면 같은 요청을 한 번 더 보내고 먼저 성공한 응답을 쓴다. 중복 요청은 감싼 어댑터로
+다시 보내므로 RoutedAdapter 아래에서 라우터가 덜 바쁜 다른 서버를 고르게 된다
+(시뮬레이션은 서버가 둘 이상일 때만 헤지 어댑터를 씌운다).
+
+헤지는 비동기 경로에서만 하고 진 요청은 태스크를 취소한다. 동기 호출은 실행 중인 요청을
+멈출 수 없으므로 헤지하지 않고 그대로 전달한다 (prefers_async: 시뮬레이션은 이 어댑터의
+결정을 자신의 이벤트 루프로 보낸다). 응답이 프롬프트만으로 정해지는 어댑터(speculative_safe)에만
+적용한다 (세션 모드처럼 호출마다 상태가 바뀌는 어댑터는 중복 요청이 기록을 어긋나게 한다).
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from .base import BaseLLMAdapter, DelegatingAdapter, LLMResponse
+
+
+def percentile(values: list[float], q: float) -> float:
+    """정렬된 값의 q 백분위수 (선형 보간)"""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class LatencyTracker:
+    """모델별 최근 성공 응답 지연(초)과 헤지 통계 (여러 어댑터가 공유)"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._latencies: dict[str, deque] = {}
+        self._counts: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, key: str) -> dict[str, int]:
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = {"requests": 0, "hedged": 0, "hedge_wins": 0}
+            self._counts[key] = counts
+        return counts
+
+    def percentile(self, key: str, q: float, min_samples: int) -> Optional[float]:
+        """최근 지연의 q 백분위수 (표본이 min_samples보다 적으면 None)"""
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None or len(samples) < min_samples:
+                return None
+            values = sorted(samples)
+        return percentile(values, q)
+
+    def record(self, key: str, latency: Optional[float], hedged: bool, hedge_won: bool) -> None:
+        """요청 하나의 결과 기록 (latency는 성공한 응답이 먼저 도착하기까지 걸린 시간)"""
+        with self._lock:
+            counts = self._count(key)
+            counts["requests"] += 1
+            counts["hedged"] += int(hedged)
+            counts["hedge_wins"] += int(hedge_won)
+            if latency is not None:
+                self._latencies.setdefault(key, deque(maxlen=self.window)).append(latency)
+
+    def stats(self) -> dict:
+        """모델별 헤지 비율과 p50/p95/p99 지연"""
+        with self._lock:
+            snapshot = {
+                key: (dict(counts), sorted(self._latencies.get(key, ())))
+                for key, counts in self._counts.items()
+            }
+        report = {}
+        for key, (counts, values) in snapshot.items():
+            requests = counts["requests"]
+            report[key] = {
+                **counts,
+                "hedge_rate": round(counts["hedged"] / requests, 4) if requests else 0.0,
+                "p50_s": round(percentile(values, 50), 3),
+                "p95_s": round(percentile(values, 95), 3),
+                "p99_s": round(percentile(values, 99), 3),
+            }
+        return report
+
+
+class HedgingAdapter(DelegatingAdapter):
+    """요청이 최근 지연의 percentile을 넘기면 같은 요청을 한 번 더 보내는 래퍼 (비동기 경로만)"""
+
+    def __init__(
+        self,
+        inner: BaseLLMAdapter,
+        tracker: LatencyTracker,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        min_delay: float = 0.5,
+        **kwargs
+    ):
+        super().__init__(inner, **kwargs)
+        self.tracker = tracker
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+
+    @property
+    def prefers_async(self) -> bool:
+        return True
+
+    @property
+    def latency_key(self) -> str:
+        return f"{self.inner.name}:{self.inner.model}"
+
+    def hedge_delay(self) -> Optional[float]:
+        """중복 요청을 보내기까지 기다릴 시간 (표본이 부족하면 None: 헤지하지 않음)"""
+        threshold = self.tracker.percentile(self.latency_key, self.percentile, self.min_samples)
+        if threshold is None:
+            return None
+        return max(self.min_delay, threshold)
+
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        """동기 호출은 헤지하지 않음 (진 요청을 취소할 수 없으므로), 지연만 기록"""
+        started = time.perf_counter()
+        response = self.inner.generate(prompt, max_tokens, response_schema)
+        self._record(response, started, hedged=False, hedge_won=False)
+        return response
+
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        delay = self.hedge_delay()
+        started = time.perf_counter()
+        if delay is None:
+            response = await self.inner.agenerate(prompt, max_tokens, response_schema)
+            self._record(response, started, hedged=False, hedge_won=False)
+            return response
+
+        primary = asyncio.ensure_future(self.inner.agenerate(prompt, max_tokens, response_schema))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            response = primary.result()
+            self._record(response, started, hedged=False, hedge_won=False)
+            return response
+
+        hedge = asyncio.ensure_future(self.inner.agenerate(prompt, max_tokens, response_schema))
+        response, winner = await self._afirst_success({primary: False, hedge: True})
+        self._record(response, started, hedged=True, hedge_won=winner)
+        return response
+
+    @staticmethod
+    async def _afirst_success(tasks: dict[asyncio.Future, bool]) -> tuple[LLMResponse, bool]:
+        """먼저 성공한 응답과 헤지 쪽인지 여부 (모두 실패하면 마지막 실패). 진 태스크는 취소"""
+        pending = set(tasks)
+        response = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    response, is_hedge = task.result(), tasks[task]
+                    if response.success:
+                        return response, is_hedge
+            return response, False
+        finally:
+            for loser in pending:
+                loser.cancel()
+
+    def _record(self, response: LLMResponse, started: float, hedged: bool, hedge_won: bool) -> None:
+        latency = time.perf_counter() - started if response.success else None
+        self.tracker.record(self.latency_key, latency, hedged, hedge_won)
@@ -0,0 +1,220 @@
+"""LLM 응답에서 JSON 객체를 찾아내는 단일 패스 스캐너와 가벼운 국소 수리
+
+parse_response가 쓰던 정규식 \\{[^{}]*\\}는 thought/content 안에 중괄호가 하나만 있어도
+실패해 턴 전체가 idle이 된다. 여기서는
+  1. 마크다운 코드 펜스(```json ... ```)가 있으면 그 안을 먼저 본다
+  2. 문자열/이스케이프를 추적하며 한 번 훑어 최상위 객체 구간을 모두 찾는다
+  3. 객체가 JSON으로 안 읽히면 후행 쉼표, 작은따옴표 문자열, Python 리터럴
+     (True/False/None), 잘린 끝(닫히지 않은 문자열/괄호)을 고쳐 다시 시도한다
+순서로 required_key("action")를 가진 객체를 고른다.
+"""
+
+import json
+import re
+from typing import Optional
+
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)```", re.DOTALL)
+
+_STRUCTURAL_RE = re.compile(r"""[{}"'\\]""")
+
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def strip_code_fences(text: str) -> list[str]:
+    """펜스 안 블록들(있으면)과 원문을 검색 순서대로 반환"""
+    blocks = [m.group(1) for m in _FENCE_RE.finditer(text)]
+    return blocks + [text]
+
+
+def scan_objects(text: str) -> tuple[list[tuple[int, int]], Optional[int]]:
+    """최상위 {...} 구간 목록과, 끝까지 닫히지 않은 객체의 시작 위치를 반환
+
+    객체 밖의 따옴표는 산문(I'm 등)이므로 무시하고, 객체 안에서는 큰따옴표와
+    작은따옴표 문자열을 모두 추적한다.
+    """
+    spans = []
+    start = -1
+    depth = 0
+    quote = None
+    escape_end = -1  # 이스케이프된 문자의 위치
+
+    # 구조 문자만 정규식으로 건너뛰며 방문 (일반 문자는 파이썬 루프를 타지 않음)
+    for match in _STRUCTURAL_RE.finditer(text):
+        i = match.start()
+        ch = text[i]
+        if i == escape_end:
+            continue
+        if quote is not None:
+            if ch == "\\":
+                escape_end = i + 1
+            elif ch == quote:
+                quote = None
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif depth == 0:
+            continue
+        elif ch == '"' or ch == "'":
+            quote = ch
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                spans.append((start, i + 1))
+
+    return spans, (start if depth > 0 else None)
+
+
+def _normalize(candidate: str) -> str:
+    """문자열 인식 한 번의 패스로 작은따옴표 문자열, Python 리터럴, 후행 쉼표 수리"""
+    out = []
+    i = 0
+    n = len(candidate)
+    while i < n:
+        ch = candidate[i]
+        if ch == '"':
+            # 큰따옴표 문자열은 그대로 복사
+            j = i + 1
+            while j < n and candidate[j] != '"':
+                j += 2 if candidate[j] == "\\" else 1
+            out.append(candidate[i:j + 1])
+            i = j + 1
+        elif ch == "'":
+            # 작은따옴표 문자열 → 큰따옴표 (안쪽 " 이스케이프, \' 해제)
+            j = i + 1
+            buf = []
+            while j < n and candidate[j] != "'":
+                if candidate[j] == "\\" and j + 1 < n:
+                    buf.append(candidate[j + 1] if candidate[j + 1] == "'" else candidate[j:j + 2])
+                    j += 2
+                    continue
+                buf.append('\\"' if candidate[j] == '"' else candidate[j])
+                j += 1
+            out.append('"' + "".join(buf) + '"')
+            i = j + 1
+        elif ch == ",":
+            # 후행 쉼표: 다음 의미 있는 문자가 닫는 괄호면 생략
+            j = i + 1
+            while j < n and candidate[j].isspace():
+                j += 1
+            if j < n and candidate[j] in "}]":
+                i += 1
+                continue
+            out.append(ch)
+            i += 1
+        elif ch.isalpha():
+            j = i
+            while j < n and candidate[j].isalnum():
+                j += 1
+            word = candidate[i:j]
+            out.append(_PY_LITERALS.get(word, word))
+            i = j
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def _close_truncated(candidate: str) -> list[str]:
+    """잘린 객체를 닫은 후보들 (그대로 닫기, 마지막 쉼표 앞에서 자르고 닫기)"""
+    stack = []
+    quote = None
+    escape = False
+    last_comma = None  # (위치, 그 시점의 스택)
+
+    for i, ch in enumerate(candidate):
+        if quote is not None:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == quote:
+                quote = None
+        elif ch == '"' or ch == "'":
+            quote = ch
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+        elif ch == ",":
+            last_comma = (i, list(stack))
+
+    closers = "".join(reversed(stack))
+    tail = candidate + (quote or "")
+    stripped = tail.rstrip()
+    if stripped.endswith(":"):
+        stripped += " null"
+    stripped = stripped.rstrip(",")
+
+    candidates = [stripped + closers]
+    if last_comma is not None:
+        pos, comma_stack = last_comma
+        candidates.append(candidate[:pos] + "".join(reversed(comma_stack)))
+    return candidates
+
+
+def _loads(candidate: str) -> Optional[object]:
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        return None
+
+
+def _load_with_repair(candidate: str, truncated: bool = False) -> tuple[Optional[dict], bool]:
+    """(dict 또는 None, 수리 여부)"""
+    if not truncated:
+        data = _loads(candidate)
+        if isinstance(data, dict):
+            return data, False
+        attempts = [candidate]
+    else:
+        attempts = _close_truncated(candidate)
+
+    for attempt in attempts:
+        for text in (attempt, _normalize(attempt)):
+            data = _loads(text)
+            if isinstance(data, dict):
+                return data, True
+    return None, False
+
+
+def _find_key(data: dict, key: str) -> Optional[dict]:
+    """data 또는 한 단계 안쪽 dict 중 key를 가진 것"""
+    if key in data:
+        return data
+    for value in data.values():
+        if isinstance(value, dict) and key in value:
+            return value
+    return None
+
+
+def extract_json_object(
+    text: str, required_key: Optional[str] = "action"
+) -> tuple[Optional[dict], bool]:
+    """text에서 가장 알맞은 JSON 객체를 찾는다 → (객체 또는 None, 수리 여부)
+
+    required_key를 가진 객체를 우선하고, 없으면 처음 읽히는 객체를 돌려준다.
+    """
+    fallback: tuple[Optional[dict], bool] = (None, False)
+
+    for block in strip_code_fences(text):
+        spans, open_start = scan_objects(block)
+        candidates = [(block[s:e], False) for s, e in spans]
+        if open_start is not None:
+            candidates.append((block[open_start:], True))
+
+        for candidate, truncated in candidates:
+            data, repaired = _load_with_repair(candidate, truncated)
+            if data is None:
+                continue
+            if required_key is None:
+                return data, repaired
+            match = _find_key(data, required_key)
+            if match is not None:
+                return match, repaired
+            if fallback[0] is None:
+                fallback = (data, repaired)
+
+    return fallback
@@ -1,9 +1,11 @@
 """Mock LLM 어댑터 (테스트/기본용)"""
 
 import random
+import re
 from typing import Optional
 
 from .base import BaseLLMAdapter, LLMResponse
+from .observation import Observation
 
 
 # Mock reasoning 템플릿
@@ -20,23 +22,60 @@ MOCK_THOUGHTS = {
     "random": "특별한 전략 없이 행동",
 }
 
+# 규칙 기반 결정의 후보 행동. 프롬프트의 응답 형식 줄(speak|trade|support|whisper|move|idle)에
+# 모든 행동이 나열되어 있어 예전 프롬프트 파싱도 항상 이 6개를 반환했다. 같은 시드로 같은 결과를
+# 내도록 관측 경로에서도 그대로 쓴다 (위치 제약은 실행 단계에서 판정)
+MOCK_CANDIDATE_ACTIONS = ["speak", "trade", "support", "whisper", "move", "idle"]
+
+_ENERGY_RE = re.compile(r'(?:에너지|Energy):\s*(\d+)/200')
+_LOCATION_RE = re.compile(r'(?:위치|Location):\s*(\w+)')
+
 
 class MockAdapter(BaseLLMAdapter):
     """Mock LLM 어댑터 - 규칙 기반 행동 결정"""
 
+    # 난수를 소비하므로 호출 순서가 바뀌면 시드 재현성이 깨진다
+    speculative_safe = False
+    provider = "mock"
+    needs_prompt = False
+
     def __init__(self, model: str = "mock", **kwargs):
         super().__init__(model, **kwargs)
         self.persona = kwargs.get("persona", "citizen")
         self.agent_id = kwargs.get("agent_id", "unknown")
+        # 기본은 전역 random (시뮬레이션 시드를 따른다). 호출 여부가 타이밍에 달린 대체
+        # 정책처럼 전역 난수 흐름을 건드리면 안 되는 경우 별도 random.Random을 넘긴다
+        self.rng = kwargs.get("rng") or random
 
-    def generate(self, prompt: str, max_tokens: int = 1000) -> LLMResponse:
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
         """규칙 기반으로 행동 결정"""
         # 프롬프트에서 상태 정보 추출 (간단한 파싱)
         energy = self._extract_energy(prompt)
         location = self._extract_location(prompt)
         available_actions = self._extract_available_actions(prompt)
-
-        # 규칙 기반 행동 결정
+        return self._respond(energy, location, available_actions)
+
+    def decide(
+        self,
+        observation: Observation,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        """관측의 구조화된 상태로 바로 결정 (프롬프트 렌더링/파싱 없음)"""
+        return self._respond(observation.energy, observation.location, MOCK_CANDIDATE_ACTIONS)
+
+    async def adecide(
+        self,
+        observation: Observation,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        return self.decide(observation, max_tokens, response_schema)
+
+    def _respond(self, energy: int, location: str, available_actions: list[str]) -> LLMResponse:
+        """규칙 기반 행동 결정 결과를 LLMResponse로"""
         action, thought, target, content = self._decide_action(
             energy, location, available_actions
         )
@@ -50,18 +89,26 @@ class MockAdapter(BaseLLMAdapter):
             success=True,
         )
 
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        """규칙 기반 결정은 I/O가 없으므로 스레드 없이 바로 실행
+
+        난수를 소비하므로, 스레드로 넘기면 동시 호출 시 난수 소비 순서가
+        달라져 시드 재현성이 깨진다.
+        """
+        return self.generate(prompt, max_tokens, response_schema)
+
     def _extract_energy(self, prompt: str) -> int:
-        """프롬프트에서 에너지 추출"""
-        import re
-        match = re.search(r'에너지:\s*(\d+)/200', prompt)
+        """프롬프트에서 에너지 추출 (한국어/영어 템플릿)"""
+        match = _ENERGY_RE.search(prompt)
         if match:
             return int(match.group(1))
         return 100
 
     def _extract_location(self, prompt: str) -> str:
-        """프롬프트에서 위치 추출"""
-        import re
-        match = re.search(r'위치:\s*(\w+)', prompt)
+        """프롬프트에서 위치 추출 (한국어/영어 템플릿)"""
+        match = _LOCATION_RE.search(prompt)
         if match:
             return match.group(1)
         return "plaza"
@@ -105,7 +152,7 @@ class MockAdapter(BaseLLMAdapter):
 
         # 에너지 여유 있을 때
         if energy > 100 and "support" in available_actions:
-            if random.random() < 0.3:
+            if self.rng.random() < 0.3:
                 return "support", MOCK_THOUGHTS["high_energy_support"], None, None
 
         # 페르소나별 기본 전략
@@ -117,7 +164,7 @@ class MockAdapter(BaseLLMAdapter):
 
         elif self.persona == "jester":
             if location.startswith("alley") and "whisper" in available_actions:
-                if random.random() < 0.5:
+                if self.rng.random() < 0.5:
                     return (
                         "whisper",
                         MOCK_THOUGHTS["jester_whisper"],
@@ -126,7 +173,7 @@ class MockAdapter(BaseLLMAdapter):
                     )
 
         elif self.persona == "observer":
-            if random.random() < 0.8:
+            if self.rng.random() < 0.8:
                 return "idle", MOCK_THOUGHTS["observer_idle"], None, None
 
         elif self.persona == "influencer":
@@ -139,10 +186,10 @@ class MockAdapter(BaseLLMAdapter):
                 )
 
         # 기본: 랜덤 행동
-        action = random.choice(available_actions)
+        action = self.rng.choice(available_actions)
         if action == "speak":
             content = f"[{self.persona}] 발언"
         elif action == "move":
-            target = random.choice(["plaza", "market", "alley_a", "alley_b", "alley_c"])
+            target = self.rng.choice(["plaza", "market", "alley_a", "alley_b", "alley_c"])
 
         return action, MOCK_THOUGHTS["random"], target, content
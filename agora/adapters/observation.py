@@ -0,0 +1,41 @@
+"""에이전트 관측 (구조화된 상태 + 지연 렌더링 프롬프트)
+
+시뮬레이션은 결정마다 Observation을 만들어 어댑터의 decide()에 넘긴다. LLM 어댑터는
+observation.prompt로 텍스트를 받아 generate()를 호출하고, 규칙 기반/대리 어댑터
+(needs_prompt = False)는 구조화된 필드만 읽으므로 프롬프트 렌더링 비용을 치르지 않는다.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+@dataclass
+class Observation:
+    """한 턴에 에이전트가 보는 상태"""
+    agent_id: str
+    persona: str
+    location: str
+    energy: int
+    influence: int
+    epoch: int
+    language: str = "ko"
+    agents_here: list[str] = field(default_factory=list)
+    available_actions: list[str] = field(default_factory=list)
+    crisis_active: bool = False
+    billboard: Optional[str] = None
+
+    # 프롬프트 렌더러 (처음 prompt에 접근할 때 한 번만 호출)
+    render: Optional[Callable[[], str]] = field(default=None, repr=False, compare=False)
+    _prompt: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def prompt(self) -> str:
+        """렌더링된 프롬프트 (필요할 때 렌더링 후 캐시)"""
+        if self._prompt is None:
+            self._prompt = self.render() if self.render is not None else ""
+        return self._prompt
+
+    @property
+    def rendered(self) -> bool:
+        """프롬프트가 이미 렌더링되었는지"""
+        return self._prompt is not None
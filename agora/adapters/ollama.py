@@ -1,15 +1,21 @@
 """Ollama LLM 어댑터 (로컬 LLM)"""
 
 import json
+import time
 import requests
 from typing import Optional
 
 from .base import BaseLLMAdapter, LLMResponse
+from .pool import get_client_pool
+from .session import ChatSession
 
 
 class OllamaAdapter(BaseLLMAdapter):
     """Ollama 로컬 LLM 어댑터"""
 
+    provider = "ollama"
+    supports_streaming = True
+
     def __init__(
         self,
         model: str = "mistral:latest",
@@ -19,21 +25,75 @@ class OllamaAdapter(BaseLLMAdapter):
         super().__init__(model, **kwargs)
         self.base_url = base_url
         self.timeout = kwargs.get("timeout", 60)
+        # 요청 후 모델을 메모리에 유지할 시간 (예: "30m", -1이면 계속, None이면 서버 기본값)
+        self.keep_alive = kwargs.get("keep_alive")
+        # 컨텍스트 창 크기 (KV 캐시 할당량, None이면 서버 기본값). 값이 바뀌면 Ollama가
+        # 모델을 다시 올리므로 런 중에는 바꾸지 않는다
+        self.num_ctx: Optional[int] = kwargs.get("num_ctx")
+
+        # 세션 모드: 에이전트별 대화 기록을 /api/chat으로 이어간다.
+        # 응답이 기록에 의존하므로 응답 캐시/투기 실행 대상에서 제외
+        self.chat_session: Optional[ChatSession] = None
+        if kwargs.get("session"):
+            self.chat_session = ChatSession(max_turns=kwargs.get("session_max_turns", 20))
+            self.speculative_safe = False
+
+    def _build_payload(
+        self, prompt: str, max_tokens: int, response_schema: Optional[dict] = None
+    ) -> dict:
+        """/api/generate 요청 본문 (스키마가 있으면 format으로 출력 형식 강제)"""
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "num_predict": max_tokens,
+                "temperature": self.temperature,
+            },
+        }
+        if self.num_ctx is not None:
+            payload["options"]["num_ctx"] = self.num_ctx
+        if response_schema is not None:
+            payload["format"] = response_schema
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def _build_chat_payload(
+        self, prompt: str, max_tokens: int, response_schema: Optional[dict] = None
+    ) -> dict:
+        """/api/chat 요청 본문 (세션 기록 + 이번 프롬프트)"""
+        payload = self._build_payload(prompt, max_tokens, response_schema)
+        del payload["prompt"]
+        payload["messages"] = self.chat_session.request_messages(prompt)
+        return payload
+
+    def _finish_chat(self, prompt: str, data: dict, response_schema: Optional[dict]) -> LLMResponse:
+        """/api/chat 응답을 파싱하고 주고받기를 세션에 기록"""
+        raw_text = data.get("message", {}).get("content", "")
+        response = self._parse(raw_text, response_schema)
+        response.raw_response["prompt_eval_count"] = data.get("prompt_eval_count")
+        response.raw_response["prompt_eval_duration"] = data.get("prompt_eval_duration")
+        self.chat_session.commit(
+            prompt, raw_text, data.get("prompt_eval_count"), data.get("prompt_eval_duration"),
+        )
+        return response
 
-    def generate(self, prompt: str, max_tokens: int = 1000) -> LLMResponse:
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
         """Ollama API를 통해 응답 생성"""
+        if self.chat_session is not None:
+            return self._generate_chat(prompt, max_tokens, response_schema)
+
+        # 스키마로 제약된 출력은 객체가 닫히면 생성도 끝나므로 스트리밍할 이유가 없다
+        if self.stream and response_schema is None:
+            return self.generate_streaming(prompt, max_tokens)
+
         try:
-            response = requests.post(
+            response = self._session().post(
                 f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "num_predict": max_tokens,
-                        "temperature": 0.7,
-                    },
-                },
+                json=self._build_payload(prompt, max_tokens, response_schema),
                 timeout=self.timeout,
             )
             response.raise_for_status()
@@ -41,45 +101,262 @@ class OllamaAdapter(BaseLLMAdapter):
             data = response.json()
             raw_text = data.get("response", "")
 
-            return self.parse_response(raw_text)
+            return self._parse(raw_text, response_schema)
 
         except requests.exceptions.ConnectionError:
-            return LLMResponse(
-                thought="Ollama 서버에 연결할 수 없습니다",
-                action="idle",
-                raw_response={"error": "connection_error"},
-                success=False,
-                error="Ollama 서버 연결 실패",
+            return self._connection_error_response()
+        except requests.exceptions.Timeout:
+            return self._timeout_response()
+        except Exception as e:
+            return self._error_response(e)
+
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        """httpx가 설치되어 있으면 네이티브 async 요청, 없으면 스레드로 위임"""
+        try:
+            import httpx
+        except ImportError:
+            return await super().agenerate(prompt, max_tokens, response_schema)
+
+        if self.chat_session is not None:
+            return await self._agenerate_chat(prompt, max_tokens, response_schema)
+
+        if self.stream and response_schema is None:
+            return await self.agenerate_streaming(prompt, max_tokens)
+
+        try:
+            pool = get_client_pool()
+            client = pool.get_async(
+                "ollama",
+                lambda: httpx.AsyncClient(limits=pool.httpx_limits()),
+                base_url=self.base_url,
+            )
+            response = await client.post(
+                f"{self.base_url}/api/generate",
+                json=self._build_payload(prompt, max_tokens, response_schema),
+                timeout=self.timeout,
             )
+            response.raise_for_status()
+
+            data = response.json()
+            raw_text = data.get("response", "")
+
+            return self._parse(raw_text, response_schema)
+
+        except httpx.ConnectError:
+            return self._connection_error_response()
+        except httpx.TimeoutException:
+            return self._timeout_response()
+        except Exception as e:
+            return self._error_response(e)
+
+    def _generate_chat(
+        self, prompt: str, max_tokens: int, response_schema: Optional[dict]
+    ) -> LLMResponse:
+        """세션 모드 /api/chat 호출 (실패하면 기록에 남기지 않으므로 같은 프롬프트로 재시도 가능)"""
+        try:
+            response = self._session().post(
+                f"{self.base_url}/api/chat",
+                json=self._build_chat_payload(prompt, max_tokens, response_schema),
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.ConnectionError:
+            result = self._connection_error_response()
         except requests.exceptions.Timeout:
-            return LLMResponse(
-                thought="Ollama 응답 시간 초과",
-                action="idle",
-                raw_response={"error": "timeout"},
-                success=False,
-                error="응답 시간 초과",
+            result = self._timeout_response()
+        except Exception as e:
+            result = self._error_response(e)
+        else:
+            return self._finish_chat(prompt, data, response_schema)
+        return result
+
+    async def _agenerate_chat(
+        self, prompt: str, max_tokens: int, response_schema: Optional[dict]
+    ) -> LLMResponse:
+        """_generate_chat()의 httpx 비동기 버전"""
+        import httpx
+
+        try:
+            pool = get_client_pool()
+            client = pool.get_async(
+                "ollama",
+                lambda: httpx.AsyncClient(limits=pool.httpx_limits()),
+                base_url=self.base_url,
+            )
+            response = await client.post(
+                f"{self.base_url}/api/chat",
+                json=self._build_chat_payload(prompt, max_tokens, response_schema),
+                timeout=self.timeout,
             )
+            response.raise_for_status()
+            data = response.json()
+        except httpx.ConnectError:
+            result = self._connection_error_response()
+        except httpx.TimeoutException:
+            result = self._timeout_response()
         except Exception as e:
-            return LLMResponse(
-                thought=f"Ollama 오류: {str(e)}",
-                action="idle",
-                raw_response={"error": str(e)},
-                success=False,
-                error=str(e),
+            result = self._error_response(e)
+        else:
+            return self._finish_chat(prompt, data, response_schema)
+        return result
+
+    def stream_text(self, prompt: str, max_tokens: int = 1000):
+        """stream=True 응답의 NDJSON 줄마다 토큰 텍스트 (닫으면 연결을 끊어 생성 중단)"""
+        payload = self._build_payload(prompt, max_tokens)
+        payload["stream"] = True
+        with self._session().post(
+            f"{self.base_url}/api/generate",
+            json=payload,
+            timeout=self.timeout,
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+    async def astream_text(self, prompt: str, max_tokens: int = 1000):
+        """stream_text()의 httpx 비동기 버전"""
+        import httpx
+
+        pool = get_client_pool()
+        client = pool.get_async(
+            "ollama",
+            lambda: httpx.AsyncClient(limits=pool.httpx_limits()),
+            base_url=self.base_url,
+        )
+        payload = self._build_payload(prompt, max_tokens)
+        payload["stream"] = True
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/api/generate",
+            json=payload,
+            timeout=self.timeout,
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+    def _stream_error_response(self, e: Exception) -> LLMResponse:
+        """연결 실패/시간 초과는 비스트리밍 경로와 같은 응답으로"""
+        if isinstance(e, requests.exceptions.ConnectionError):
+            return self._connection_error_response()
+        if isinstance(e, requests.exceptions.Timeout):
+            return self._timeout_response()
+        try:
+            import httpx
+            if isinstance(e, httpx.ConnectError):
+                return self._connection_error_response()
+            if isinstance(e, httpx.TimeoutException):
+                return self._timeout_response()
+        except ImportError:
+            pass
+        return self._error_response(e)
+
+    def _session(self) -> requests.Session:
+        """base_url별로 공유되는 keep-alive 세션"""
+        return get_client_pool().session(self.base_url)
+
+    def _connection_error_response(self) -> LLMResponse:
+        return LLMResponse(
+            thought="Ollama 서버에 연결할 수 없습니다",
+            action="idle",
+            raw_response={"error": "connection_error"},
+            success=False,
+            error="Ollama 서버 연결 실패",
+        )
+
+    def _timeout_response(self) -> LLMResponse:
+        return LLMResponse(
+            thought="Ollama 응답 시간 초과",
+            action="idle",
+            raw_response={"error": "timeout"},
+            success=False,
+            error="응답 시간 초과",
+        )
+
+    def _error_response(self, e: Exception) -> LLMResponse:
+        return LLMResponse(
+            thought=f"Ollama 오류: {str(e)}",
+            action="idle",
+            raw_response={"error": str(e), **self.error_details(e)},
+            success=False,
+            error=str(e),
+        )
+
+    def warm_up(self, prompt: str = "") -> dict:
+        """모델을 미리 올리고 (prompt가 있으면) 프롬프트 평가 시간 측정
+
+        num_predict=1로 /api/generate를 호출하므로 생성 비용은 거의 없다. 현재 num_ctx와
+        keep_alive로 올리므로 이후 호출이 같은 설정이면 모델을 다시 올리지 않는다.
+        반환값의 시간은 ms, 실패하면 error 키만 채운다.
+        """
+        payload = self._build_payload(prompt, 1)
+        started = time.perf_counter()
+        try:
+            response = self._session().post(
+                f"{self.base_url}/api/generate", json=payload, timeout=self.timeout,
             )
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            return {"error": str(e)}
+
+        return {
+            "wall_ms": round((time.perf_counter() - started) * 1000, 1),
+            "load_ms": round((data.get("load_duration") or 0) / 1e6, 1),
+            "prompt_eval_count": data.get("prompt_eval_count"),
+            "prompt_eval_ms": round((data.get("prompt_eval_duration") or 0) / 1e6, 1),
+        }
+
+    def release(self, keep_alive="5m") -> bool:
+        """고정해 둔 모델의 keep_alive를 되돌림 (0이면 즉시 내림)"""
+        try:
+            response = self._session().post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model, "keep_alive": keep_alive},
+                timeout=self.timeout,
+            )
+            return response.status_code == 200
+        except Exception:
+            return False
 
     def check_connection(self) -> bool:
         """Ollama 서버 연결 확인"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self._session().get(f"{self.base_url}/api/tags", timeout=5)
             return response.status_code == 200
         except:
             return False
 
+    def running_models(self) -> Optional[list[str]]:
+        """메모리에 올라가 있는 모델 목록 (/api/ps, 확인 실패하면 None)"""
+        try:
+            response = self._session().get(f"{self.base_url}/api/ps", timeout=5)
+            if response.status_code == 200:
+                return [m["name"] for m in response.json().get("models", [])]
+        except Exception:
+            pass
+        return None
+
     def list_models(self) -> list[str]:
         """사용 가능한 모델 목록"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self._session().get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 return [m["name"] for m in data.get("models", [])]
@@ -4,11 +4,16 @@ import os
 from typing import Optional
 
 from .base import BaseLLMAdapter, LLMResponse
+from .pool import get_client_pool
+from .schema import to_openai_schema
 
 
 class OpenAIAdapter(BaseLLMAdapter):
     """OpenAI GPT 어댑터 (및 호환 API)"""
 
+    provider = "openai"
+    supports_streaming = True
+
     def __init__(
         self,
         model: str = "gpt-4o",
@@ -20,25 +25,24 @@ class OpenAIAdapter(BaseLLMAdapter):
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
         self.base_url = base_url  # OpenAI 호환 API용 (예: Together, Groq)
 
-    def generate(self, prompt: str, max_tokens: int = 1000) -> LLMResponse:
+    def _client_kwargs(self) -> dict:
+        client_kwargs = {"api_key": self.api_key}
+        if self.base_url:
+            client_kwargs["base_url"] = self.base_url
+        return client_kwargs
+
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
         """OpenAI API를 통해 응답 생성"""
         if not self.api_key:
-            return LLMResponse(
-                thought="OPENAI_API_KEY가 설정되지 않았습니다",
-                action="idle",
-                raw_response={"error": "no_api_key"},
-                success=False,
-                error="API 키 없음",
-            )
-
-        try:
-            from openai import OpenAI
+            return self._no_api_key_response()
 
-            client_kwargs = {"api_key": self.api_key}
-            if self.base_url:
-                client_kwargs["base_url"] = self.base_url
+        if self.stream and response_schema is None:
+            return self.generate_streaming(prompt, max_tokens)
 
-            client = OpenAI(**client_kwargs)
+        try:
+            client = self._client()
 
             response = client.chat.completions.create(
                 model=self.model,
@@ -46,25 +50,154 @@ class OpenAIAdapter(BaseLLMAdapter):
                 messages=[
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.7,
+                temperature=self.temperature,
+                **self._response_format(response_schema),
             )
 
             raw_text = response.choices[0].message.content
-            return self.parse_response(raw_text)
+            return self._parse(raw_text, response_schema)
 
         except ImportError:
-            return LLMResponse(
-                thought="openai 패키지가 설치되지 않았습니다",
-                action="idle",
-                raw_response={"error": "import_error"},
-                success=False,
-                error="pip install openai 필요",
-            )
+            return self._import_error_response()
         except Exception as e:
-            return LLMResponse(
-                thought=f"OpenAI API 오류: {str(e)}",
-                action="idle",
-                raw_response={"error": str(e)},
-                success=False,
-                error=str(e),
+            return self._error_response(e)
+
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        """AsyncOpenAI 클라이언트로 응답 생성"""
+        if not self.api_key:
+            return self._no_api_key_response()
+
+        if self.stream and response_schema is None:
+            return await self.agenerate_streaming(prompt, max_tokens)
+
+        try:
+            client = self._async_client()
+
+            response = await client.chat.completions.create(
+                model=self.model,
+                max_tokens=max_tokens,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=self.temperature,
+                **self._response_format(response_schema),
             )
+
+            raw_text = response.choices[0].message.content
+            return self._parse(raw_text, response_schema)
+
+        except ImportError:
+            return self._import_error_response()
+        except Exception as e:
+            return self._error_response(e)
+
+    @staticmethod
+    def _response_format(response_schema: Optional[dict]) -> dict:
+        """스키마가 있으면 response_format json_schema 인자"""
+        if response_schema is None:
+            return {}
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "agent_action",
+                    "strict": True,
+                    "schema": to_openai_schema(response_schema),
+                },
+            }
+        }
+
+    def stream_text(self, prompt: str, max_tokens: int = 1000):
+        """stream=True 응답의 델타 텍스트 (제너레이터를 닫으면 스트림도 닫힌다)"""
+        client = self._client()
+        stream = client.chat.completions.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=self.temperature,
+            stream=True,
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+
+    async def astream_text(self, prompt: str, max_tokens: int = 1000):
+        """stream_text()의 비동기 버전"""
+        client = self._async_client()
+        stream = await client.chat.completions.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=self.temperature,
+            stream=True,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
+    def _client(self) -> "OpenAI":
+        """(base_url, API 키)별로 공유되는 동기 클라이언트"""
+        import openai
+        from openai import OpenAI
+
+        pool = get_client_pool()
+        return pool.get(
+            "openai",
+            lambda: OpenAI(
+                http_client=pool.httpx_client(openai),
+                **self._client_kwargs(),
+            ),
+            base_url=self.base_url,
+            api_key=self.api_key,
+        )
+
+    def _async_client(self) -> "AsyncOpenAI":
+        """이벤트 루프/(base_url, API 키)별로 공유되는 비동기 클라이언트"""
+        import openai
+        from openai import AsyncOpenAI
+
+        pool = get_client_pool()
+        return pool.get_async(
+            "openai",
+            lambda: AsyncOpenAI(
+                http_client=pool.httpx_client(openai, asynchronous=True),
+                **self._client_kwargs(),
+            ),
+            base_url=self.base_url,
+            api_key=self.api_key,
+        )
+
+    def _no_api_key_response(self) -> LLMResponse:
+        return LLMResponse(
+            thought="OPENAI_API_KEY가 설정되지 않았습니다",
+            action="idle",
+            raw_response={"error": "no_api_key"},
+            success=False,
+            error="API 키 없음",
+        )
+
+    def _import_error_response(self) -> LLMResponse:
+        return LLMResponse(
+            thought="openai 패키지가 설치되지 않았습니다",
+            action="idle",
+            raw_response={"error": "import_error"},
+            success=False,
+            error="pip install openai 필요",
+        )
+
+    def _error_response(self, e: Exception) -> LLMResponse:
+        return LLMResponse(
+            thought=f"OpenAI API 오류: {str(e)}",
+            action="idle",
+            raw_response={"error": str(e), **self.error_details(e)},
+            success=False,
+            error=str(e),
+        )
@@ -0,0 +1,170 @@
+"""프로세스 전역 HTTP 세션/SDK 클라이언트 풀
+
+어댑터 인스턴스마다(혹은 호출마다) 클라이언트를 새로 만들면 매번 TCP/TLS 핸드셰이크와
+객체 생성 비용이 든다. (provider, base_url, api_key) 단위로 클라이언트를 공유하여
+keep-alive 연결을 재사용한다.
+"""
+
+import asyncio
+import inspect
+import threading
+import weakref
+from typing import Any, Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_POOL_SIZE = 10
+
+
+class ClientPool:
+    """(provider, base_url, api_key) 키로 클라이언트를 공유하는 풀"""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE):
+        self.pool_size = pool_size
+        self._clients: dict[tuple, Any] = {}
+        # async 클라이언트는 이벤트 루프에 묶이므로 루프별로 따로 보관
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def configure(self, pool_size: Optional[int] = None) -> None:
+        """풀 설정 변경 (이후 생성되는 클라이언트부터 적용)"""
+        if pool_size is not None:
+            self.pool_size = pool_size
+
+    def get(
+        self,
+        provider: str,
+        factory: Callable[[], Any],
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> Any:
+        """동기 클라이언트 조회 (없으면 factory로 생성)"""
+        key = (provider, base_url or "", api_key or "")
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = factory()
+                self._clients[key] = client
+                self.created += 1
+            else:
+                self.reused += 1
+            return client
+
+    def get_async(
+        self,
+        provider: str,
+        factory: Callable[[], Any],
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> Any:
+        """현재 이벤트 루프용 async 클라이언트 조회 (없으면 factory로 생성)"""
+        loop = asyncio.get_running_loop()
+        key = (provider, base_url or "", api_key or "")
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = factory()
+                clients[key] = client
+                self.created += 1
+            else:
+                self.reused += 1
+            return client
+
+    def session(self, base_url: str) -> requests.Session:
+        """base_url별 keep-alive requests.Session"""
+        return self.get("http", lambda: self._new_session(), base_url=base_url)
+
+    def httpx_limits(self):
+        """httpx 기반 SDK에 넘길 커넥션 한도"""
+        import httpx
+        return httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size,
+        )
+
+    def httpx_client(self, sdk: Any, asynchronous: bool = False) -> Any:
+        """SDK 모듈(anthropic/openai)에 넘길 httpx 클라이언트
+
+        Default(Async)HttpxClient가 없는 예전 SDK면 같은 기본값(SDK 타임아웃, 리다이렉트
+        허용)으로 httpx 클라이언트를 직접 만든다.
+        """
+        name = "DefaultAsyncHttpxClient" if asynchronous else "DefaultHttpxClient"
+        factory = getattr(sdk, name, None)
+        if factory is not None:
+            return factory(limits=self.httpx_limits())
+
+        import httpx
+        factory = httpx.AsyncClient if asynchronous else httpx.Client
+        return factory(
+            limits=self.httpx_limits(),
+            timeout=getattr(sdk, "DEFAULT_TIMEOUT", 600.0),
+            follow_redirects=True,
+        )
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def clear(self) -> None:
+        """모든 클라이언트 정리"""
+        with self._lock:
+            for client in self._clients.values():
+                close = getattr(client, "close", None)
+                if callable(close):
+                    try:
+                        close()
+                    except Exception:
+                        pass
+            self._clients.clear()
+            self._async_clients = weakref.WeakKeyDictionary()
+
+    async def aclose_loop_clients(self) -> int:
+        """현재 이벤트 루프의 async 클라이언트를 닫고 풀에서 제거 (닫은 수 반환)
+
+        루프를 닫기 전에 그 루프에서 실행해야 한다 (httpx/SDK 클라이언트의 close는 코루틴).
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.pop(loop, {})
+        for client in clients.values():
+            # httpx: aclose(), SDK 클라이언트: close(), gRPC 생성 클라이언트: transport.close()
+            close = getattr(client, "aclose", None) or getattr(client, "close", None)
+            if not callable(close):
+                close = getattr(getattr(client, "transport", None), "close", None)
+            if not callable(close):
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                pass
+        return len(clients)
+
+    def stats(self) -> dict:
+        """풀 사용 통계"""
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "clients": len(self._clients),
+                "created": self.created,
+                "reused": self.reused,
+            }
+
+
+_default_pool = ClientPool()
+
+
+def get_client_pool() -> ClientPool:
+    """프로세스 전역 클라이언트 풀"""
+    return _default_pool
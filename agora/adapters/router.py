@@ -0,0 +1,278 @@
+"""여러 Ollama 서버로 요청을 나누는 라우터
+
+ollama.endpoints에 서버 목록을 주면 에이전트 어댑터마다 서버별 OllamaAdapter 복제본을 두고,
+요청마다 공유 OllamaRouter가 보낼 서버를 고른다.
+  - 상태 확인: check_connection/list_models/running_models(/api/ps)로 건강 여부와
+    설치된 모델, 메모리에 올라간 모델을 health_interval마다 갱신
+  - 선택: 건강하고 배제되지 않은 서버 중 (진행 중 요청 수 + 모델이 안 올라가 있으면
+    load_penalty)가 가장 작은 곳. 같으면 누적 요청 수가 적은 곳
+  - 배제: 연결 실패/시간 초과/5xx가 나면 eject_seconds 동안 빼고, 기간이 끝나면 다시 확인
+동시 요청(simultaneous/pipelined 모드)은 서버 수만큼 나뉘므로 에폭 처리량이 서버 수에
+거의 비례해 늘어난다 (request_scheduler의 ollama max_concurrency도 서버 수 이상으로).
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Optional
+
+from .base import DelegatingAdapter, LLMResponse
+from .ollama import OllamaAdapter
+
+
+def normalize_model(name: str) -> str:
+    """Ollama 모델 이름 정규화 (태그가 없으면 :latest)"""
+    return name if ":" in name else f"{name}:latest"
+
+
+def is_endpoint_failure(response: LLMResponse) -> bool:
+    """서버 문제로 본 실패인지 (JSON 파싱 실패 같은 모델 출력 문제는 제외)"""
+    raw = response.raw_response or {}
+    if response.success or "error" not in raw:
+        return False
+    status = raw.get("status_code")
+    return status is None or status >= 500 or status == 404
+
+
+class _Endpoint:
+    """서버 하나의 상태와 통계"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.probe = OllamaAdapter(model="", base_url=url, timeout=5)
+        self.healthy: Optional[bool] = None
+        self.available: set[str] = set()
+        self.resident: set[str] = set()
+        self.checked_at: Optional[float] = None
+        self.ejected_until = 0.0
+
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.completed = 0
+        self.failures = 0
+        self.ejections = 0
+        self.busy = 0.0
+        self.first_started: Optional[float] = None
+        self.last_finished: Optional[float] = None
+
+    def stats(self, now: float) -> dict:
+        window = (
+            self.last_finished - self.first_started
+            if self.first_started is not None and self.last_finished is not None else 0.0
+        )
+        return {
+            "healthy": self.healthy,
+            "ejected": self.ejected_until > now,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "completed": self.completed,
+            "failures": self.failures,
+            "ejections": self.ejections,
+            "max_in_flight": self.max_in_flight,
+            "avg_latency_s": round(self.busy / self.completed, 4) if self.completed else 0.0,
+            "throughput_rps": round(self.completed / window, 3) if window > 0 else 0.0,
+            "resident_models": sorted(self.resident),
+        }
+
+
+class OllamaRouter:
+    """여러 Ollama 서버 중 요청을 보낼 곳을 고르는 공유 라우터"""
+
+    def __init__(
+        self,
+        endpoints: list[str],
+        eject_seconds: float = 30.0,
+        health_interval: float = 60.0,
+        load_penalty: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not endpoints:
+            raise ValueError("OllamaRouter requires at least one endpoint")
+        self.endpoints = {url: _Endpoint(url) for url in endpoints}
+        self.eject_seconds = eject_seconds
+        self.health_interval = health_interval
+        self.load_penalty = load_penalty
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "OllamaRouter":
+        """settings.yaml의 ollama 섹션(endpoints + router)으로 생성"""
+        router_config = config.get("router") or {}
+        return cls(
+            endpoints=list(config["endpoints"]),
+            eject_seconds=router_config.get("eject_seconds", 30.0),
+            health_interval=router_config.get("health_interval", 60.0),
+            load_penalty=router_config.get("load_penalty", 1),
+        )
+
+    @property
+    def urls(self) -> list[str]:
+        return list(self.endpoints)
+
+    def _stale(self, endpoint: _Endpoint, now: float) -> bool:
+        if endpoint.ejected_until > now:
+            return False
+        return endpoint.checked_at is None or now - endpoint.checked_at >= self.health_interval
+
+    def needs_check(self) -> bool:
+        now = self._clock()
+        with self._lock:
+            return any(self._stale(e, now) for e in self.endpoints.values())
+
+    def check(self) -> None:
+        """확인할 때가 된 서버들의 건강 여부/설치 모델/상주 모델 갱신 (네트워크는 락 밖에서)"""
+        now = self._clock()
+        with self._lock:
+            targets = [e for e in self.endpoints.values() if self._stale(e, now)]
+
+        for endpoint in targets:
+            healthy = endpoint.probe.check_connection()
+            available = {normalize_model(m) for m in endpoint.probe.list_models()} if healthy else set()
+            resident = endpoint.probe.running_models() if healthy else []
+            with self._lock:
+                endpoint.healthy = healthy
+                endpoint.available = available
+                if resident is not None:
+                    endpoint.resident = {normalize_model(m) for m in resident}
+                endpoint.checked_at = self._clock()
+
+    def acquire(
+        self, model: str, prefer: Optional[str] = None, exclude: tuple[str, ...] = ()
+    ) -> Optional[str]:
+        """요청을 보낼 서버 URL (exclude를 빼고 남은 서버가 없으면 None)"""
+        model = normalize_model(model)
+        now = self._clock()
+        with self._lock:
+            candidates = [e for e in self.endpoints.values() if e.url not in exclude]
+            if not candidates:
+                return None
+            live = [e for e in candidates if e.healthy is not False and e.ejected_until <= now]
+
+            if not live:
+                # 전부 배제/다운이면 가장 먼저 배제된 곳에 시도 (턴을 그냥 버리지 않도록)
+                chosen = min(candidates, key=lambda e: e.ejected_until)
+            elif prefer is not None and any(e.url == prefer for e in live):
+                chosen = self.endpoints[prefer]
+            else:
+                with_model = [e for e in live if model in e.available or model in e.resident]
+                chosen = min(
+                    with_model or live,
+                    key=lambda e: (
+                        e.in_flight + (0 if model in e.resident else self.load_penalty),
+                        e.requests,
+                    ),
+                )
+
+            chosen.in_flight += 1
+            chosen.max_in_flight = max(chosen.max_in_flight, chosen.in_flight)
+            chosen.requests += 1
+            if chosen.first_started is None:
+                chosen.first_started = now
+            return chosen.url
+
+    def release(self, url: str, model: str, elapsed: float, response: LLMResponse) -> bool:
+        """요청 완료 기록. 서버 실패면 배제하고 True 반환"""
+        failed = is_endpoint_failure(response)
+        now = self._clock()
+        with self._lock:
+            endpoint = self.endpoints[url]
+            endpoint.in_flight -= 1
+            if failed:
+                endpoint.failures += 1
+                endpoint.ejections += 1
+                endpoint.ejected_until = now + self.eject_seconds
+                # 배제가 끝나면 다시 확인한 뒤에 쓴다
+                endpoint.checked_at = None
+            else:
+                endpoint.completed += 1
+                endpoint.busy += elapsed
+                endpoint.resident.add(normalize_model(model))
+                endpoint.last_finished = now
+        return failed
+
+    def cancel(self, url: str) -> None:
+        """취소된 요청 정리 (진행 중 수만 줄이고 실패/배제로 치지 않음)"""
+        with self._lock:
+            self.endpoints[url].in_flight -= 1
+
+    def stats(self) -> dict:
+        """서버별 요청/실패/배제/처리량 통계"""
+        now = self._clock()
+        with self._lock:
+            return {url: endpoint.stats(now) for url, endpoint in self.endpoints.items()}
+
+
+class RoutedAdapter(DelegatingAdapter):
+    """서버별 OllamaAdapter 복제본 중 라우터가 고른 곳으로 요청을 보내는 어댑터
+
+    서버 실패면 다른 서버로 한 번씩 다시 보낸다. 요청이 취소되면(asyncio.CancelledError)
+    진행 중 수만 되돌리고 그 서버를 배제하지 않는다. 세션 모드는 복제본들이 대화 기록을
+    공유하고, KV 캐시를 다시 쓰도록 직전에 쓴 서버를 우선한다. 실패한 요청은 기록에 남지
+    않으므로 다른 서버로 보내도 같은 기록 + 같은 델타가 간다 (그 서버는 기록 전체를 새로 평가).
+    """
+
+    def __init__(self, router: OllamaRouter, model: str = "mistral:latest", **kwargs):
+        kwargs.pop("base_url", None)
+        self.replicas = {
+            url: OllamaAdapter(model=model, base_url=url, **kwargs) for url in router.urls
+        }
+        first = next(iter(self.replicas.values()))
+        super().__init__(first)
+        self.router = router
+        self._last_url: Optional[str] = None
+
+        if first.chat_session is not None:
+            for replica in self.replicas.values():
+                replica.chat_session = first.chat_session
+
+    def _prefer(self) -> Optional[str]:
+        return self._last_url if self.inner.chat_session is not None else None
+
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        if self.router.needs_check():
+            self.router.check()
+
+        tried: tuple[str, ...] = ()
+        for _ in range(len(self.replicas)):
+            url = self.router.acquire(self.model, prefer=self._prefer(), exclude=tried)
+            if url is None:
+                break
+            started = time.perf_counter()
+            try:
+                response = self.replicas[url].generate(prompt, max_tokens, response_schema)
+            except BaseException:
+                self.router.cancel(url)
+                raise
+            self._last_url = url
+            if not self.router.release(url, self.model, time.perf_counter() - started, response):
+                break
+            tried += (url,)
+        return response
+
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        if self.router.needs_check():
+            await asyncio.to_thread(self.router.check)
+
+        tried: tuple[str, ...] = ()
+        for _ in range(len(self.replicas)):
+            url = self.router.acquire(self.model, prefer=self._prefer(), exclude=tried)
+            if url is None:
+                break
+            started = time.perf_counter()
+            try:
+                response = await self.replicas[url].agenerate(prompt, max_tokens, response_schema)
+            except BaseException:
+                # 헤징에서 진 요청, 데드라인 초과, 투기 실행 miss로 취소되면 서버 탓이 아니다
+                self.router.cancel(url)
+                raise
+            self._last_url = url
+            if not self.router.release(url, self.model, time.perf_counter() - started, response):
+                break
+            tried += (url,)
+        return response
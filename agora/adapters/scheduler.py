@@ -0,0 +1,333 @@
+"""프로바이더별 요청 스케줄러 (동시성 제한, 토큰 버킷, 재시도)
+
+어댑터는 429/5xx/타임아웃을 success=False인 idle 응답으로 바꿔 돌려준다. 부하가 걸리면
+그대로 턴을 잃고 실험이 왜곡되므로, 시뮬레이션과 어댑터 사이에서
+  - 프로바이더별 동시 요청 수 제한
+  - 분당 요청 수(rpm)/분당 토큰 수(tpm) 토큰 버킷
+  - jitter를 넣은 지수 백오프 재시도 (Retry-After 헤더 우선)
+를 적용하고, 대기열 길이와 대기 시간을 통계로 남긴다.
+"""
+
+import asyncio
+import random
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .base import BaseLLMAdapter, DelegatingAdapter, LLMResponse
+
+
+# 재시도할 HTTP 상태 (529: Anthropic overloaded)
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def estimate_request_tokens(prompt: str, max_tokens: int) -> int:
+    """tpm 버킷에서 차감할 토큰 수 (프롬프트 추정 토큰 + 최대 출력)"""
+    # core 패키지가 adapters를 가져오므로 모듈 수준이 아니라 여기서 가져온다
+    from ..core.budget import estimate_prompt_tokens
+
+    return estimate_prompt_tokens(prompt) + max_tokens
+
+
+class TokenBucket:
+    """분당 rate만큼 채워지는 토큰 버킷 (최대 capacity까지 버스트 허용)"""
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """amount를 꺼내려면 기다려야 하는 시간(초). 0이면 꺼낼 수 있음"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+@dataclass
+class ProviderLimits:
+    """프로바이더 하나의 제한 (None이면 제한 없음)"""
+    max_concurrency: Optional[int] = None
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ProviderLimits":
+        return cls(
+            max_concurrency=config.get("max_concurrency"),
+            requests_per_minute=config.get("requests_per_minute"),
+            tokens_per_minute=config.get("tokens_per_minute"),
+        )
+
+
+@dataclass
+class RetryPolicy:
+    """지수 백오프 + full jitter 재시도 정책"""
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    retry_timeouts: bool = True
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RetryPolicy":
+        return cls(
+            max_retries=config.get("max_retries", 3),
+            base_delay=config.get("base_delay", 1.0),
+            max_delay=config.get("max_delay", 30.0),
+            retry_timeouts=config.get("retry_timeouts", True),
+        )
+
+    def is_retryable(self, response: LLMResponse) -> bool:
+        if response.success:
+            return False
+        raw = response.raw_response or {}
+        if raw.get("status_code") in RETRYABLE_STATUS_CODES:
+            return True
+        return self.retry_timeouts and raw.get("error") == "timeout"
+
+    def delay(self, attempt: int, response: LLMResponse, rng: random.Random) -> float:
+        """attempt(0부터)번째 재시도 전 대기 시간. Retry-After가 있으면 그 값을 따른다"""
+        retry_after = (response.raw_response or {}).get("retry_after")
+        if retry_after is not None:
+            return max(0.0, float(retry_after))
+        return rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class _ProviderState:
+    """프로바이더별 버킷, 세마포어, 통계"""
+
+    def __init__(self, limits: ProviderLimits):
+        self.limits = limits
+        self.request_bucket = (
+            TokenBucket(limits.requests_per_minute) if limits.requests_per_minute else None
+        )
+        self.token_bucket = (
+            TokenBucket(limits.tokens_per_minute) if limits.tokens_per_minute else None
+        )
+        self.thread_semaphore = (
+            threading.BoundedSemaphore(limits.max_concurrency) if limits.max_concurrency else None
+        )
+        self.async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.gave_up = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def async_semaphore(self) -> Optional[asyncio.Semaphore]:
+        if not self.limits.max_concurrency:
+            return None
+        loop = asyncio.get_running_loop()
+        semaphore = self.async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limits.max_concurrency)
+            self.async_semaphores[loop] = semaphore
+        return semaphore
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "gave_up": self.gave_up,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "total_wait_s": round(self.total_wait, 3),
+            "avg_wait_s": round(self.total_wait / self.requests, 4) if self.requests else 0.0,
+            "max_wait_s": round(self.max_wait, 3),
+        }
+
+
+class RequestScheduler:
+    """시뮬레이션과 어댑터 사이의 중앙 요청 스케줄러"""
+
+    def __init__(
+        self,
+        limits: Optional[dict[str, ProviderLimits]] = None,
+        retry: Optional[RetryPolicy] = None,
+        default_limits: Optional[ProviderLimits] = None,
+    ):
+        self.limits = dict(limits or {})
+        self.retry = retry or RetryPolicy()
+        self.default_limits = default_limits or ProviderLimits()
+        self._states: dict[str, _ProviderState] = {}
+        self._lock = threading.Lock()
+        # 전역 random을 건드리면 시드 재현성이 깨지므로 jitter는 별도 RNG 사용
+        self._rng = random.Random()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RequestScheduler":
+        """settings.yaml의 request_scheduler 섹션으로 생성"""
+        providers = {
+            name: ProviderLimits.from_config(limits or {})
+            for name, limits in (config.get("providers") or {}).items()
+        }
+        return cls(limits=providers, retry=RetryPolicy.from_config(config.get("retry") or {}))
+
+    def _state(self, provider: str) -> _ProviderState:
+        with self._lock:
+            state = self._states.get(provider)
+            if state is None:
+                state = _ProviderState(self.limits.get(provider, self.default_limits))
+                self._states[provider] = state
+            return state
+
+    def _reserve(self, state: _ProviderState, tokens: int) -> float:
+        """버킷에서 요청 1건과 토큰을 꺼낸다. 부족하면 기다릴 시간을 반환(0이면 예약 완료)"""
+        with self._lock:
+            wait = 0.0
+            if state.request_bucket is not None:
+                wait = max(wait, state.request_bucket.wait_time(1))
+            if state.token_bucket is not None:
+                wait = max(wait, state.token_bucket.wait_time(tokens))
+            if wait > 0:
+                return wait
+            if state.request_bucket is not None:
+                state.request_bucket.consume(1)
+            if state.token_bucket is not None:
+                state.token_bucket.consume(tokens)
+            return 0.0
+
+    def _enter_queue(self, state: _ProviderState) -> None:
+        with self._lock:
+            state.queue_depth += 1
+            state.max_queue_depth = max(state.max_queue_depth, state.queue_depth)
+
+    def _leave_queue(self, state: _ProviderState, waited: float) -> None:
+        with self._lock:
+            state.queue_depth -= 1
+            state.requests += 1
+            state.total_wait += waited
+            state.max_wait = max(state.max_wait, waited)
+
+    def _after_attempt(self, state: _ProviderState, response: LLMResponse, attempt: int) -> Optional[float]:
+        """재시도할 경우 대기 시간, 아니면 None"""
+        if (response.raw_response or {}).get("status_code") == 429:
+            with self._lock:
+                state.rate_limited += 1
+        if not self.retry.is_retryable(response):
+            return None
+        if attempt >= self.retry.max_retries:
+            with self._lock:
+                state.gave_up += 1
+            return None
+        with self._lock:
+            state.retries += 1
+            return self.retry.delay(attempt, response, self._rng)
+
+    # ---------- 동기 ----------
+
+    def call(
+        self,
+        adapter: BaseLLMAdapter,
+        prompt: str,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        """제한을 지키며 adapter.generate 호출 (필요하면 재시도)"""
+        state = self._state(adapter.provider)
+        tokens = estimate_request_tokens(prompt, max_tokens)
+        attempt = 0
+        while True:
+            self._enter_queue(state)
+            started = time.monotonic()
+            if state.thread_semaphore is not None:
+                state.thread_semaphore.acquire()
+            try:
+                while (wait := self._reserve(state, tokens)) > 0:
+                    time.sleep(wait)
+                self._leave_queue(state, time.monotonic() - started)
+                response = adapter.generate(prompt, max_tokens, response_schema)
+            finally:
+                if state.thread_semaphore is not None:
+                    state.thread_semaphore.release()
+
+            delay = self._after_attempt(state, response, attempt)
+            if delay is None:
+                return response
+            time.sleep(delay)
+            attempt += 1
+
+    # ---------- 비동기 ----------
+
+    async def acall(
+        self,
+        adapter: BaseLLMAdapter,
+        prompt: str,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        """call()의 비동기 버전 (대기는 asyncio.sleep)"""
+        state = self._state(adapter.provider)
+        semaphore = state.async_semaphore()
+        tokens = estimate_request_tokens(prompt, max_tokens)
+        attempt = 0
+        while True:
+            self._enter_queue(state)
+            started = time.monotonic()
+            if semaphore is not None:
+                await semaphore.acquire()
+            try:
+                while (wait := self._reserve(state, tokens)) > 0:
+                    await asyncio.sleep(wait)
+                self._leave_queue(state, time.monotonic() - started)
+                response = await adapter.agenerate(prompt, max_tokens, response_schema)
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+
+            delay = self._after_attempt(state, response, attempt)
+            if delay is None:
+                return response
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict:
+        """프로바이더별 요청/재시도/대기 통계"""
+        with self._lock:
+            states = dict(self._states)
+        return {provider: state.stats() for provider, state in states.items()}
+
+
+class ScheduledAdapter(DelegatingAdapter):
+    """모든 호출을 RequestScheduler로 보내는 어댑터 래퍼"""
+
+    def __init__(self, inner: BaseLLMAdapter, scheduler: RequestScheduler, **kwargs):
+        super().__init__(inner, **kwargs)
+        self.scheduler = scheduler
+
+    def generate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        return self.scheduler.call(self.inner, prompt, max_tokens, response_schema)
+
+    async def agenerate(
+        self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None
+    ) -> LLMResponse:
+        return await self.scheduler.acall(self.inner, prompt, max_tokens, response_schema)
@@ -0,0 +1,116 @@
+"""행동 JSON 스키마 (구조화 출력용)
+
+프롬프트가 요구하는 응답 형식(thought/action/target/content)에 건축가 스킬 필드
+(skill/amount/new_rate/message)를 더한 JSON Schema. 지원하는 백엔드에는 이 스키마를
+넘겨 디코딩 단계에서 형식을 강제한다:
+  - Ollama: format에 JSON Schema
+  - OpenAI: response_format json_schema (strict, 엄격 모드 규칙에 맞게 변환)
+  - Gemini: response_mime_type + response_schema (OpenAPI 부분집합으로 변환)
+  - Anthropic: 단일 도구(tool use)의 input_schema
+"""
+
+import copy
+
+
+ACTION_TYPES = ["speak", "trade", "support", "whisper", "move", "idle", "architect_skill"]
+ARCHITECT_SKILLS = ["build_billboard", "adjust_tax", "grant_subsidy"]
+
+# thought/action/target/content 외에 LLMResponse.extra로 전달되는 필드
+EXTRA_ACTION_FIELDS = ("skill", "amount", "new_rate", "message")
+
+ACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "thought": {"type": "string"},
+        "action": {"type": "string", "enum": ACTION_TYPES},
+        "target": {"type": ["string", "null"]},
+        "content": {"type": ["string", "null"]},
+        "skill": {"type": ["string", "null"], "enum": ARCHITECT_SKILLS + [None]},
+        "amount": {"type": ["integer", "null"]},
+        "new_rate": {"type": ["number", "null"]},
+        "message": {"type": ["string", "null"]},
+    },
+    "required": ["thought", "action"],
+}
+
+# 2단계 결정: 1단계는 행동/대상(+건축가 스킬 필드)만, 2단계는 발언 내용만
+ACTION_ONLY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        k: v for k, v in ACTION_SCHEMA["properties"].items() if k not in ("thought", "content")
+    },
+    "required": ["action"],
+}
+
+CONTENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "thought": {"type": "string"},
+        "content": {"type": "string"},
+    },
+    "required": ["content"],
+}
+
+ANTHROPIC_TOOL_NAME = "decide_action"
+
+
+def to_gemini_schema(schema: dict) -> dict:
+    """JSON Schema를 Gemini response_schema(OpenAPI 부분집합)로 변환
+
+    Gemini는 타입 배열을 받지 않으므로 ["string", "null"]은 nullable로 바꾸고,
+    enum에서 None을 뺀다.
+    """
+    schema = copy.deepcopy(schema)
+
+    def convert(node: dict) -> dict:
+        node_type = node.get("type")
+        if isinstance(node_type, list):
+            non_null = [t for t in node_type if t != "null"]
+            node["type"] = non_null[0] if non_null else "string"
+            if "null" in node_type:
+                node["nullable"] = True
+        if "enum" in node:
+            node["enum"] = [v for v in node["enum"] if v is not None]
+        for child in node.get("properties", {}).values():
+            convert(child)
+        return node
+
+    return convert(schema)
+
+
+def to_openai_schema(schema: dict) -> dict:
+    """JSON Schema를 OpenAI 엄격 모드(strict) 스키마로 변환
+
+    엄격 모드는 모든 객체에 additionalProperties: false와 전체 속성의 required를 요구한다.
+    원래 선택이던 속성은 타입에 null을 더해(enum에는 None) 생략 대신 null로 답하게 한다.
+    """
+    schema = copy.deepcopy(schema)
+
+    def convert(node: dict) -> dict:
+        properties = node.get("properties")
+        if properties is None:
+            return node
+        required = set(node.get("required", []))
+        for name, child in properties.items():
+            child_type = child.get("type")
+            if name not in required and child_type is not None:
+                types = child_type if isinstance(child_type, list) else [child_type]
+                if "null" not in types:
+                    child["type"] = types + ["null"]
+                    if "enum" in child:
+                        child["enum"] = child["enum"] + [None]
+            convert(child)
+        node["required"] = list(properties)
+        node["additionalProperties"] = False
+        return node
+
+    return convert(schema)
+
+
+def to_anthropic_tool(schema: dict) -> dict:
+    """스키마를 Anthropic 도구 정의로"""
+    return {
+        "name": ANTHROPIC_TOOL_NAME,
+        "description": "Submit your decision for this turn.",
+        "input_schema": schema,
+    }
@@ -0,0 +1,91 @@
+"""에이전트별 지속 대화 세션 (Ollama /api/chat 세션 모드)
+
+매 턴 전체 컨텍스트를 /api/generate로 보내면 CPU 호스트에서는 프롬프트 평가가 대부분의
+시간을 차지한다. 세션 모드에서는 에이전트마다 대화 기록을 유지하고 keep_alive로 모델을
+올려 둔 채 /api/chat을 호출한다. 첫 턴만 전체 컨텍스트를 보내고 이후에는 지난 턴 이후의
+변화만 보내므로, Ollama가 이전 대화의 KV 캐시를 재사용해 새로 들어온 토큰만 평가한다.
+
+/api/chat은 상태가 없고(매 요청에 기록 전체를 보낸다) 실패한 요청은 commit()하지 않으므로,
+실패해도 기록은 그대로 두고 같은 프롬프트로 다시 보낼 수 있다 (재시도, 다른 서버로 재전송).
+"""
+
+from typing import Optional
+
+
+class ChatSession:
+    """대화 기록과 프롬프트 평가 통계
+
+    절약량은 추정치다: 델타 턴마다 "직전 전체 컨텍스트 턴의 평가 토큰 수 - 이번 평가 토큰 수"를
+    아낀 토큰으로 보고, 전체 턴에서 잰 토큰당 평가 시간을 곱한다.
+    """
+
+    def __init__(self, max_turns: int = 20):
+        self.max_turns = max_turns
+        self.messages: list[dict] = []
+
+        self.full_turns = 0
+        self.delta_turns = 0
+        self.prompt_eval_tokens = 0
+        self.prompt_eval_ns = 0
+        self.saved_tokens_estimate = 0
+        self.saved_ns_estimate = 0
+        self._full_tokens: Optional[int] = None
+        self._ns_per_token: Optional[float] = None
+
+    @property
+    def turns(self) -> int:
+        """완료된 주고받기 수"""
+        return len(self.messages) // 2
+
+    @property
+    def needs_full_context(self) -> bool:
+        """새 세션이거나 기록이 max_turns에 도달하면 전체 컨텍스트로 다시 시작"""
+        return self.turns == 0 or self.turns >= self.max_turns
+
+    def reset(self) -> None:
+        self.messages = []
+
+    def request_messages(self, prompt: str) -> list[dict]:
+        """이번 요청에 보낼 메시지 목록 (기록 + 새 user 메시지)"""
+        return self.messages + [{"role": "user", "content": prompt}]
+
+    def commit(
+        self,
+        prompt: str,
+        reply: str,
+        prompt_eval_count: Optional[int] = None,
+        prompt_eval_duration: Optional[int] = None,
+    ) -> None:
+        """성공한 주고받기를 기록에 추가하고 평가 통계 갱신"""
+        full = self.turns == 0
+        self.messages.append({"role": "user", "content": prompt})
+        self.messages.append({"role": "assistant", "content": reply})
+
+        tokens = prompt_eval_count or 0
+        duration = prompt_eval_duration or 0
+        self.prompt_eval_tokens += tokens
+        self.prompt_eval_ns += duration
+
+        if full:
+            self.full_turns += 1
+            if tokens:
+                self._full_tokens = tokens
+                if duration:
+                    self._ns_per_token = duration / tokens
+        else:
+            self.delta_turns += 1
+            if self._full_tokens is not None:
+                saved = max(0, self._full_tokens - tokens)
+                self.saved_tokens_estimate += saved
+                if self._ns_per_token is not None:
+                    self.saved_ns_estimate += int(saved * self._ns_per_token)
+
+    def stats(self) -> dict:
+        return {
+            "full_turns": self.full_turns,
+            "delta_turns": self.delta_turns,
+            "prompt_eval_tokens": self.prompt_eval_tokens,
+            "prompt_eval_ms": round(self.prompt_eval_ns / 1e6, 1),
+            "saved_tokens_estimate": self.saved_tokens_estimate,
+            "saved_ms_estimate": round(self.saved_ns_estimate / 1e6, 1),
+        }
@@ -0,0 +1,120 @@
+"""스트리밍 생성용 증분 JSON 추출기와 통계
+
+모델은 결정 JSON을 다 쓴 뒤에도 설명 문장을 계속 생성하는 경우가 많다. 스트리밍으로
+받은 청크를 StreamingJSONExtractor에 넣다가 "action" 필드를 가진 최상위 객체가
+닫히는 순간 요청을 끊어 그 뒤 토큰의 지연을 아낀다.
+"""
+
+import json
+import threading
+from typing import Optional
+
+
+class StreamingJSONExtractor:
+    """청크 단위로 텍스트를 받아 첫 번째 완성된 최상위 JSON 객체를 찾는다
+
+    문자열 리터럴과 이스케이프를 추적하므로 값 안의 중괄호에 속지 않는다. 괄호 짝은
+    맞지만 JSON이 아닌 구간(예: 산문 속 "{...}")이나 required_key가 없는 객체는
+    버리고 계속 탐색한다.
+    """
+
+    def __init__(self, required_key: Optional[str] = "action"):
+        self.required_key = required_key
+        self.text = ""
+        self.result: Optional[dict] = None
+
+        self._pos = 0          # 다음에 검사할 위치
+        self._start = -1       # 현재 후보 객체의 시작 위치
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def feed(self, chunk: str) -> Optional[dict]:
+        """청크 추가. 조건을 만족하는 객체가 완성되면 반환 (이후 호출도 같은 값)"""
+        if self.result is not None:
+            return self.result
+
+        self.text += chunk
+        text = self.text
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+            if self._start < 0:
+                if ch == "{":
+                    self._start = i
+                    self._depth = 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = self._try_parse(text[self._start:i + 1])
+                    if candidate is not None:
+                        self.result = candidate
+                        self._pos = i + 1
+                        return candidate
+                    # 후보 실패: 시작 괄호 다음부터 다시 탐색
+                    i = self._start
+                    self._start = -1
+            i += 1
+
+        self._pos = i
+        return None
+
+    def _try_parse(self, candidate: str) -> Optional[dict]:
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        if self.required_key and self.required_key not in data:
+            return None
+        return data
+
+
+class StreamStats:
+    """스트리밍 요청 통계 (여러 어댑터가 공유, 스레드 안전)
+
+    unused_budget_tokens는 조기 종료한 요청마다 max_tokens에서 받은 토큰을 뺀 합이다.
+    모델이 끊지 않았을 때 더 쓸 수 있었던 출력 예산일 뿐, 실제로 아낀 토큰(모델이 결정
+    JSON 뒤에 덧붙였을 설명의 길이)은 이보다 작다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.early_stops = 0
+        self.tokens_received = 0
+        self.unused_budget_tokens = 0
+
+    def record(self, tokens_received: int, unused_budget: int, early_stop: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.tokens_received += tokens_received
+            if early_stop:
+                self.early_stops += 1
+                self.unused_budget_tokens += unused_budget
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "early_stops": self.early_stops,
+                "early_stop_rate": round(self.early_stops / self.requests, 4) if self.requests else 0.0,
+                "tokens_received": self.tokens_received,
+                "unused_budget_tokens": self.unused_budget_tokens,
+            }
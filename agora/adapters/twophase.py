@@ -0,0 +1,211 @@
+"""2단계 결정 (행동 먼저, 발언 내용은 필요할 때만)
+
+대부분의 턴은 trade/move/support/idle인데 단일 호출 모드는 매번 thought와 content까지
+생성하게 하므로, 로컬 7B 모델에서는 출력 토큰이 지연의 대부분을 차지한다. 2단계 모드는
+
+  1. 행동 단계: 같은 프롬프트 끝에 "행동/대상만 답하라"는 지시를 붙이고 max_tokens를 작게
+  2. 내용 단계: 1단계 행동이 speak/whisper일 때만, 선택한 행동을 알려 주고 발언 내용 요청
+     (reasoning_tokens > 0이면 짧은 thought도 함께)
+
+로 나눠 호출한다. 두 단계 모두 지시를 프롬프트 끝(가변 블록)에 붙이므로 앞부분은 단일 호출
+모드와 같아서, 프롬프트 접두사 캐시(Anthropic)나 KV 캐시 재사용(Ollama)이 그대로 적용된다.
+단계별 원문/max_tokens/소요 시간은 raw_response["phases"]에 남긴다.
+"""
+
+import time
+from typing import Optional
+
+from .base import DelegatingAdapter, BaseLLMAdapter, LayeredPrompt, LLMResponse
+from .jsonparse import strip_code_fences
+from .observation import Observation
+from .schema import ACTION_ONLY_SCHEMA, CONTENT_SCHEMA
+
+
+# 내용 단계가 필요한 행동
+CONTENT_ACTIONS = ("speak", "whisper")
+
+PHASE_INSTRUCTIONS = {
+    "ko": {
+        "action": (
+            "[이번 응답 형식]\n"
+            "이번에는 행동만 정합니다. thought와 content는 쓰지 말고 아래 JSON 한 줄로만 답하세요 "
+            "(건축가 스킬이면 skill/amount/new_rate/message도 포함):\n"
+            '{"action": "speak|trade|support|whisper|move|idle", "target": "대상 에이전트 ID 또는 장소 (필요시)"}'
+        ),
+        "content": "[이번 응답 형식]\n당신은 '{action}' 행동을 하기로 했습니다{target}. 이제 내용만 작성하세요.",
+        "target": " (대상: {target})",
+        "content_format": '{"content": "발언 내용"}',
+        "reasoning_format": '{"thought": "한두 문장의 짧은 이유", "content": "발언 내용"}',
+        "format_prefix": "아래 JSON으로만 답하세요:",
+    },
+    "en": {
+        "action": (
+            "[RESPONSE FORMAT FOR THIS REPLY]\n"
+            "Decide only your action this time. Do not write thought or content; reply with this "
+            "single-line JSON (include skill/amount/new_rate/message for architect skills):\n"
+            '{"action": "speak|trade|support|whisper|move|idle", "target": "Target agent ID or location (if needed)"}'
+        ),
+        "content": "[RESPONSE FORMAT FOR THIS REPLY]\nYou decided to '{action}'{target}. Now write only the message.",
+        "target": " (target: {target})",
+        "content_format": '{"content": "Message content"}',
+        "reasoning_format": '{"thought": "One or two sentences of reasoning", "content": "Message content"}',
+        "format_prefix": "Reply only with this JSON:",
+    },
+}
+
+
+def append_instruction(prompt: str, instruction: str) -> str:
+    """프롬프트 끝에 지시 추가 (LayeredPrompt면 가변 블록에 붙여 고정 블록 유지)"""
+    if isinstance(prompt, LayeredPrompt):
+        return LayeredPrompt(prompt.system, f"{prompt.user}\n\n{instruction}")
+    return f"{prompt}\n\n{instruction}" if prompt else instruction
+
+
+def response_text(response: LLMResponse) -> str:
+    """응답 원문 (원문이 없는 구조화 응답은 thought/content)"""
+    raw_text = (response.raw_response or {}).get("text")
+    if isinstance(raw_text, str):
+        return raw_text
+    return "\n".join(filter(None, [response.thought, response.content]))
+
+
+class TwoPhaseAdapter(DelegatingAdapter):
+    """decide()를 행동 단계 + (필요시) 내용 단계 두 번의 호출로 나누는 래퍼
+
+    generate()는 그대로 감싼 어댑터로 넘기므로 인터뷰 등 자유 응답 호출은 단일 호출이다.
+    """
+
+    def __init__(
+        self,
+        inner: BaseLLMAdapter,
+        action_max_tokens: int = 64,
+        content_max_tokens: int = 200,
+        reasoning_tokens: int = 0,
+        **kwargs
+    ):
+        super().__init__(inner, **kwargs)
+        self.action_max_tokens = action_max_tokens
+        self.content_max_tokens = content_max_tokens
+        self.reasoning_tokens = reasoning_tokens
+
+    def decide(
+        self,
+        observation: Observation,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        phases: dict[str, dict] = {}
+        prompt, limit, schema = self._action_call(observation, max_tokens, response_schema)
+        started = time.perf_counter()
+        first = self.generate(prompt, limit, schema)
+        phases["action"] = self._phase_record(first, limit, started)
+        if not self._needs_content(first):
+            return self._combine(first, None, phases)
+
+        prompt, limit, schema = self._content_call(observation, first, max_tokens, response_schema)
+        started = time.perf_counter()
+        second = self.generate(prompt, limit, schema)
+        phases["content"] = self._phase_record(second, limit, started)
+        return self._combine(first, second, phases)
+
+    async def adecide(
+        self,
+        observation: Observation,
+        max_tokens: int = 1000,
+        response_schema: Optional[dict] = None,
+    ) -> LLMResponse:
+        phases: dict[str, dict] = {}
+        prompt, limit, schema = self._action_call(observation, max_tokens, response_schema)
+        started = time.perf_counter()
+        first = await self.agenerate(prompt, limit, schema)
+        phases["action"] = self._phase_record(first, limit, started)
+        if not self._needs_content(first):
+            return self._combine(first, None, phases)
+
+        prompt, limit, schema = self._content_call(observation, first, max_tokens, response_schema)
+        started = time.perf_counter()
+        second = await self.agenerate(prompt, limit, schema)
+        phases["content"] = self._phase_record(second, limit, started)
+        return self._combine(first, second, phases)
+
+    def _action_call(
+        self, observation: Observation, max_tokens: int, response_schema: Optional[dict]
+    ) -> tuple[str, int, Optional[dict]]:
+        instructions = self._instructions(observation)
+        return (
+            append_instruction(observation.prompt, instructions["action"]),
+            min(max_tokens, self.action_max_tokens),
+            ACTION_ONLY_SCHEMA if response_schema is not None else None,
+        )
+
+    def _content_call(
+        self,
+        observation: Observation,
+        first: LLMResponse,
+        max_tokens: int,
+        response_schema: Optional[dict],
+    ) -> tuple[str, int, Optional[dict]]:
+        instructions = self._instructions(observation)
+        target = instructions["target"].format(target=first.target) if first.target else ""
+        instruction = "\n".join([
+            instructions["content"].format(action=first.action, target=target),
+            instructions["format_prefix"],
+            instructions["reasoning_format" if self.reasoning_tokens else "content_format"],
+        ])
+        # 세션 모드는 대화 기록에 컨텍스트가 있으므로 지시만 보낸다
+        if getattr(self.inner, "chat_session", None) is not None:
+            prompt = instruction
+        else:
+            prompt = append_instruction(observation.prompt, instruction)
+        return (
+            prompt,
+            min(max_tokens, self.content_max_tokens + self.reasoning_tokens),
+            CONTENT_SCHEMA if response_schema is not None else None,
+        )
+
+    @staticmethod
+    def _instructions(observation: Observation) -> dict:
+        return PHASE_INSTRUCTIONS["en" if observation.language == "en" else "ko"]
+
+    @staticmethod
+    def _needs_content(first: LLMResponse) -> bool:
+        return first.success and first.action in CONTENT_ACTIONS and not first.content
+
+    @staticmethod
+    def _phase_record(response: LLMResponse, max_tokens: int, started: float) -> dict:
+        return {
+            "text": response_text(response),
+            "max_tokens": max_tokens,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    @staticmethod
+    def _combine(
+        first: LLMResponse, second: Optional[LLMResponse], phases: dict
+    ) -> LLMResponse:
+        """두 단계 응답을 하나의 결정으로 (내용 단계가 실패하면 단일 호출의 오류처럼 idle)"""
+        raw_response = {**first.raw_response, "phases": phases}
+        if second is None:
+            first.raw_response = raw_response
+            return first
+
+        thought, content = second.thought, second.content
+        if not content:
+            # JSON 없이 발언만 쓴 응답도 그대로 내용으로 쓴다
+            raw_text = (second.raw_response or {}).get("text")
+            if isinstance(raw_text, str) and raw_text.strip():
+                thought, content = "", strip_code_fences(raw_text)[0].strip().strip('"')
+
+        if not content:
+            second.raw_response = {**second.raw_response, "phases": phases}
+            return second
+
+        return LLMResponse(
+            thought=thought or first.thought,
+            action=first.action,
+            target=first.target,
+            content=content,
+            raw_response=raw_response,
+            success=True,
+            extra=first.extra,
+        )
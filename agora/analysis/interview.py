@@ -183,6 +183,10 @@ class PostGameInterview:
 
             try:
                 if adapter:
+                    # 세션 모드 어댑터도 질문마다 새 대화로 (게임 기록이 답변에 섞이지 않도록)
+                    chat_session = getattr(adapter, "chat_session", None)
+                    if chat_session is not None:
+                        chat_session.reset()
                     response = adapter.generate(prompt, max_tokens=500)
                     # 인터뷰는 자유 텍스트 응답이므로 JSON 파싱 실패가 정상
                     # raw_response["text"]에 실제 응답이 있음
@@ -11,8 +11,10 @@ from .influence import InfluenceSystem, InfluenceTier, ELDER_SUPPORT_MULTIPLIER
 from .crisis import CrisisSystem, CrisisEvent, CRISIS_SUPPORT_BONUS
 from .architect import ArchitectSkills, ArchitectSkillResult
 from .actions import ActionType, ActionResult, ActionConfig, get_speak_type, get_available_actions
-from .context import build_context, CONTEXT_TEMPLATE, get_energy_status, get_inequality_commentary
+from .context import build_context, ContextBuilder, CONTEXT_TEMPLATE, get_energy_status, get_inequality_commentary
 from .history import HistoryEngine, HistoricalEvent
+from .inequality import InequalityTracker
+from .population import PopulationRegistry
 from .simulation import Simulation
 
 __all__ = [
@@ -46,10 +48,13 @@ __all__ = [
     "get_speak_type",
     "get_available_actions",
     "build_context",
+    "ContextBuilder",
     "CONTEXT_TEMPLATE",
     "get_energy_status",
     "get_inequality_commentary",
     "HistoryEngine",
     "HistoricalEvent",
+    "InequalityTracker",
+    "PopulationRegistry",
     "Simulation",
 ]
@@ -1,10 +1,17 @@
 """Agent 클래스 정의 (Phase 2)"""
 
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
 from .personas import get_persona_prompt
 
+if TYPE_CHECKING:
+    from .population import PopulationRegistry
+
+
+# 바뀌면 인구 색인에 통지할 속성
+TRACKED_FIELDS = frozenset({"energy", "influence", "location", "alive"})
+
 
 @dataclass
 class Agent:
@@ -23,11 +30,28 @@ class Agent:
     # Phase 2: 심증 목록 (whisper 누출로 인한)
     suspicions: list[str] = field(default_factory=list)
 
+    # 변경을 통지받을 인구 색인 (Simulation이 붙인다)
+    _registry = None
+
     def __post_init__(self):
         self.system_prompt = get_persona_prompt(self.persona, self.language)
         if not hasattr(self, 'suspicions') or self.suspicions is None:
             self.suspicions = []
 
+    def __setattr__(self, name, value):
+        registry = self._registry
+        if registry is None or name not in TRACKED_FIELDS:
+            object.__setattr__(self, name, value)
+            return
+        old = getattr(self, name)
+        object.__setattr__(self, name, value)
+        if old != value:
+            registry.on_change(self, name, old)
+
+    def attach_registry(self, registry: Optional["PopulationRegistry"]) -> None:
+        """energy/influence/location/alive 변경을 registry에 통지"""
+        object.__setattr__(self, "_registry", registry)
+
     def set_language(self, language: str) -> None:
         """언어 설정 변경 및 시스템 프롬프트 재생성"""
         self.language = language
@@ -0,0 +1,63 @@
+"""프롬프트 토큰 예산
+
+get_context_length()가 에너지별로 정한 예산(2000/1000/500 토큰)에 맞도록 프롬프트의
+가변 섹션(역사 요약, 최근 사건, 지지 관계)을 우선순위대로 줄인다. 토크나이저 없이 쓰는
+값싼 추정기를 줄 단위로 캐시하므로, 턴마다 반복되는 템플릿/사건 줄은 다시 세지 않는다.
+"""
+
+import re
+from functools import lru_cache
+
+
+# 영문 단어, 숫자 3자리, 그 밖의 공백 아닌 글자(한글/기호/이모지) 하나
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+# (섹션, 잘라낼 쪽, 남길 최소 줄 수). 앞의 섹션부터 줄인다
+TRIM_ORDER = (
+    ("historical_summary", "back", 0),  # 중요도순 정렬 → 덜 중요한 뒤쪽부터
+    ("recent_events", "front", 1),      # 시간순 → 오래된 앞쪽부터, 가장 최근 사건은 유지
+    ("support_context", "back", 1),     # 헤더 줄은 유지
+)
+
+
+@lru_cache(maxsize=8192)
+def estimate_line_tokens(line: str) -> int:
+    """한 줄의 토큰 수 추정 (영문 단어는 8자마다 1토큰 추가, 한글/기호는 글자당 1토큰)"""
+    pieces = _TOKEN_RE.findall(line)
+    return len(pieces) + sum(len(p) // 8 for p in pieces if len(p) >= 8)
+
+
+def estimate_prompt_tokens(text: str) -> int:
+    """텍스트 전체의 토큰 수 추정 (줄 단위 캐시 합산)
+
+    추정 단위가 공백을 넘지 않으므로 줄별 추정치의 합은 전체를 한 번에 센 값과 같다.
+    """
+    if not text:
+        return 0
+    return sum(estimate_line_tokens(line) for line in text.split("\n"))
+
+
+def fit_sections(sections: dict[str, str], available: int, none_text: str) -> dict[str, str]:
+    """섹션들의 토큰 합이 available 이하가 되도록 TRIM_ORDER 순서로 줄 단위 삭제
+
+    전부 지워진 섹션은 none_text로 바꾼다. 최소 줄까지 줄여도 넘치면 그대로 반환한다.
+    """
+    lines = {name: text.split("\n") if text else [] for name, text in sections.items()}
+    costs = {name: [estimate_line_tokens(line) for line in section] for name, section in lines.items()}
+    total = sum(sum(c) for c in costs.values())
+
+    for name, side, keep in TRIM_ORDER:
+        if total <= available:
+            break
+        if name not in lines:
+            continue
+        section, cost = lines[name], costs[name]
+        while total > available and len(section) > keep:
+            index = 0 if side == "front" else -1
+            section.pop(index)
+            total -= cost.pop(index)
+
+    return {
+        name: "\n".join(section) if section else none_text
+        for name, section in lines.items()
+    }
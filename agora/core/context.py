@@ -1,6 +1,13 @@
 """프롬프트 컨텍스트 생성 모듈 (한국어/영어 지원)"""
 
-from typing import TYPE_CHECKING, Optional
+from string import Formatter
+from typing import TYPE_CHECKING, Callable, Optional
+
+from ..adapters.base import LayeredPrompt
+from ..adapters.observation import Observation
+from .actions import get_available_actions
+from .budget import estimate_prompt_tokens, fit_sections
+from .logger import calculate_gini_coefficient
 
 if TYPE_CHECKING:
     from .agent import Agent
@@ -9,6 +16,7 @@ if TYPE_CHECKING:
     from .history import HistoryEngine
     from .influence import InfluenceSystem
     from .crisis import CrisisSystem
+    from .population import PopulationRegistry
 
 
 # ============================================================
@@ -185,6 +193,181 @@ CRITICAL REMINDERS:
 """.strip()
 
 
+# ============================================================
+# Cache-stable Layout (layout="cache")
+# ============================================================
+# 에이전트마다 변하지 않는 부분(정체성, 응답 형식, 리마인더)을 앞의 고정 블록에 모으고
+# 턴마다 바뀌는 상태는 뒤의 가변 블록에 둔다. 고정 블록이 프롬프트 접두사가 되므로
+# 프로바이더 측 프롬프트 캐시(Anthropic cache_control 등)가 적중할 수 있다.
+# 기본 페르소나의 고정 블록은 약 200~400 토큰으로 Anthropic 최소 캐시 길이(1024/2048)에
+# 못 미친다. Anthropic 캐시는 그보다 긴 페르소나에서만 생긴다 (Ollama 접두사 재사용은 제한 없음).
+
+CONTEXT_STABLE_KO = """
+[당신의 정체성]
+{persona_prompt}
+- 이름: {agent_id}
+
+[응답 형식]
+매 턴 주어지는 상황을 바탕으로, 다음 JSON 형식으로 응답하세요:
+{{
+  "thought": "현재 상황에 대한 분석과 행동 이유",
+  "action": "speak|trade|support|whisper|move|idle",
+  "target": "대상 에이전트 ID 또는 장소 (필요시)",
+  "content": "발언 내용 (speak/whisper 시)"
+}}
+
+⚠️ 중요 리마인더:
+- 에너지가 30 이하이고 '시장(market)'에 있다면, 생존을 위해 반드시 'trade'를 사용하라!
+- 거래(trade)는 +4 에너지를 준다 (세금 제외). 거래 없이는 반드시 죽는다.
+- 말만 하지 말고 - 생존을 위해 행동하라!
+""".strip()
+
+CONTEXT_VOLATILE_KO = """
+[당신의 상태]
+- 위치: {location}
+- 에너지: {energy}/200 {energy_status}
+- 영향력: {influence} ({rank})
+{rank_bonus_prompt}
+
+{support_context}
+
+## ⚠️ 생존 경고 ⚠️
+{energy_warning}
+
+[마을 현황 - 에폭 {epoch}]
+- 생존자: {alive_count}/12명
+- 빈부격차: {gini_display}
+- 시장 세율: {tax_rate}%
+- 공공자금(Treasury): {treasury}
+{inequality_commentary}
+{crisis_alert}
+
+[최근 사건]
+{recent_events}
+
+[역사적 요약]
+{historical_summary}
+
+[광장 게시판]
+{billboard_content}
+
+[현재 위치의 에이전트들]
+{agents_here}
+
+[가능한 행동]
+{available_actions}
+
+---
+위 상황을 바탕으로, 지정된 JSON 형식으로 응답하세요.
+""".strip()
+
+CONTEXT_STABLE_EN = """
+{fictional_prefix}
+
+[YOUR IDENTITY]
+{persona_prompt}
+- Name: {agent_id}
+
+[RESPONSE FORMAT]
+Each turn, based on the situation you are given, respond in JSON format:
+{{
+  "thought": "Your analysis of the current situation and reasoning for your action",
+  "action": "speak|trade|support|whisper|move|idle",
+  "target": "Target agent ID or location (if needed)",
+  "content": "Message content (if speak/whisper)"
+}}
+
+CRITICAL REMINDERS:
+- If your energy is below 30 and you are in 'market', USE 'trade' TO SURVIVE!
+- trade gives you +4 energy (minus tax). Without it, you WILL die.
+- Don't just speak - take action to survive!
+""".strip()
+
+CONTEXT_VOLATILE_EN = """
+[YOUR STATUS]
+- Location: {location}
+- Energy: {energy}/200 {energy_status}
+- Influence: {influence} ({rank})
+{rank_bonus_prompt}
+
+{support_context}
+
+## ⚠️ SURVIVAL WARNING ⚠️
+{energy_warning}
+
+[VILLAGE STATUS - Epoch {epoch}]
+- Survivors: {alive_count}/12
+- Inequality (Gini): {gini_display}
+- Market Tax Rate: {tax_rate}%
+- Public Treasury: {treasury}
+{inequality_commentary}
+{crisis_alert}
+
+[RECENT EVENTS]
+{recent_events}
+
+[HISTORICAL SUMMARY]
+{historical_summary}
+
+[PLAZA BILLBOARD]
+{billboard_content}
+
+[AGENTS AT YOUR LOCATION]
+{agents_here}
+
+[AVAILABLE ACTIONS]
+{available_actions}
+
+---
+Based on the situation above, respond with the JSON object described in RESPONSE FORMAT.
+""".strip()
+
+
+# ============================================================
+# Session Delta (Ollama 세션 모드 2번째 턴부터)
+# ============================================================
+
+DELTA_LABELS_KO = {
+    "header": "[지난 턴 이후 변화 - 에폭 {epoch}]",
+    "energy": "- 에너지: {before} → {after}/200 {status}",
+    "energy_same": "- 에너지: {after}/200 {status}",
+    "moved": "- 위치: {before} → {after}",
+    "influence": "- 영향력: {before} → {after} ({rank})",
+    "survivors": "- 생존자: {before} → {after}/12명",
+    "gini": "- 빈부격차: {before} → {after}",
+    "tax": "- 시장 세율: {before}% → {after}%",
+    "treasury": "- 공공자금(Treasury): {before} → {after}",
+    "crisis_over": "- 위기 상황 종료",
+    "events": "- 새 사건 {count}건:",
+    "no_events": "- 새 사건 없음",
+    "billboard": "- 광장 게시판: {value}",
+    "agents_here": "- 현재 위치의 에이전트들: {value}",
+    "history": "[역사적 요약]",
+    "actions": "[가능한 행동]",
+    "footer": "위 변화를 바탕으로, 처음 안내한 JSON 형식으로 응답하세요.",
+}
+
+DELTA_LABELS_EN = {
+    "header": "[SINCE YOUR LAST TURN - Epoch {epoch}]",
+    "energy": "- Energy: {before} → {after}/200 {status}",
+    "energy_same": "- Energy: {after}/200 {status}",
+    "moved": "- Location: {before} → {after}",
+    "influence": "- Influence: {before} → {after} ({rank})",
+    "survivors": "- Survivors: {before} → {after}/12",
+    "gini": "- Inequality (Gini): {before} → {after}",
+    "tax": "- Market Tax Rate: {before}% → {after}%",
+    "treasury": "- Public Treasury: {before} → {after}",
+    "crisis_over": "- The crisis is over",
+    "events": "- {count} new events:",
+    "no_events": "- No new events",
+    "billboard": "- Plaza billboard: {value}",
+    "agents_here": "- Agents at your location: {value}",
+    "history": "[HISTORICAL SUMMARY]",
+    "actions": "[AVAILABLE ACTIONS]",
+    "footer": "Based on these changes, respond in the same JSON format as before.",
+}
+
+
 def get_energy_status(energy: int, language: str = "ko") -> str:
     """에너지 상태 문구 반환"""
     status_dict = ENERGY_STATUS_EN if language == "en" else ENERGY_STATUS_KO
@@ -225,14 +408,29 @@ def get_inequality_commentary(gini: float, language: str = "ko") -> str:
     return ""
 
 
+# 에너지 구간별 프롬프트 토큰 예산 (추정치)
+PROMPT_TOKEN_BUDGET = {"full": 2000, "medium": 1000, "minimal": 500}
+
+
 def get_context_length(energy: int) -> tuple[int, str]:
     """에너지에 따른 프롬프트 길이 결정"""
     if energy >= 100:
-        return 2000, "full"
+        mode = "full"
     elif energy >= 50:
-        return 1000, "medium"
+        mode = "medium"
     else:
-        return 500, "minimal"
+        mode = "minimal"
+    return PROMPT_TOKEN_BUDGET[mode], mode
+
+
+# 에너지 구간별 출력 max_tokens (enforce_budget일 때 어댑터에 전달, 프롬프트 예산의 절반)
+OUTPUT_TOKEN_BUDGET = {"full": 1000, "medium": 500, "minimal": 250}
+
+
+def get_output_tokens(energy: int, budgets: Optional[dict] = None) -> int:
+    """에너지 구간에 맞는 출력 max_tokens (budgets로 구간별 값 덮어쓰기)"""
+    _, mode = get_context_length(energy)
+    return (budgets or {}).get(mode, OUTPUT_TOKEN_BUDGET[mode])
 
 
 def get_available_actions_text(location: str, language: str = "ko") -> str:
@@ -274,95 +472,480 @@ def build_context(
     recent_logs: list[dict],
     gini_coefficient: float,
     language: str = "ko",
+    read_set: Optional[dict] = None,
+    layout: str = "default",
+    enforce_budget: bool = False,
 ) -> str:
-    """에이전트 컨텍스트 생성 (language: 'ko' or 'en')"""
+    """에이전트 컨텍스트 생성 (language: 'ko' or 'en')
+
+    read_set에 dict를 넘기면 프롬프트가 읽은 값을 항목별로 채운다.
+    두 read_set이 같으면 렌더링된 프롬프트도 같다 (투기 실행 무효화 판단용).
+
+    layout="cache"면 고정 블록 + 가변 블록으로 나눈 LayeredPrompt를 반환한다.
+    enforce_budget이면 get_context_length()의 예산에 맞도록 역사 요약 → 최근 사건 →
+    지지 관계 순으로 줄인다.
+
+    여러 에이전트의 컨텍스트를 연달아 만들 때는 공통 조각을 캐시하는 ContextBuilder를 쓴다.
+    """
     max_tokens, mode = get_context_length(agent.energy)
+    agents_here = [a for a in alive_agents if a.location == agent.location and a.id != agent.id]
 
-    # 역사적 요약
-    if mode == "full":
-        historical_summary = history_engine.get_summary(detailed=True, max_events=10)
-        recent_events = _format_recent_events(recent_logs, n=10, language=language)
-    elif mode == "medium":
-        historical_summary = history_engine.get_summary(detailed=False, max_events=5)
-        recent_events = _format_recent_events(recent_logs, n=5, language=language)
-    else:
-        if language == "en":
-            historical_summary = "Insufficient energy to gather detailed information"
-        else:
-            historical_summary = "에너지 부족으로 상세 정보 파악 불가"
-        recent_events = _format_recent_events(recent_logs, n=2, language=language)
+    fields = _village_fields(
+        env, crisis_system, len(alive_agents), gini_coefficient, env.get_active_billboard(), language
+    )
+    fields.update(_agent_fields(
+        agent, support_tracker, influence_system, _energy_texts(agent.energy, language), language
+    ))
+    fields.update(
+        recent_events=_format_recent_events(recent_logs, n=RECENT_EVENT_COUNT[mode], language=language),
+        historical_summary=_historical_summary(history_engine, mode, language),
+        agents_here=_agents_here_text([f"{a.id}({a.persona})" for a in agents_here], language),
+        available_actions=get_available_actions_text(agent.location, language),
+    )
+    return _finish_context(agent, fields, max_tokens, language, layout, enforce_budget, read_set)
 
-    # 지지 관계 컨텍스트
-    support_context = support_tracker.get_support_context(agent.id, language=language)
 
-    # 영향력 계급
-    tier = influence_system.get_tier(agent.influence)
-    rank = tier.title
-    rank_bonus_prompt = tier.prompt_bonus or ""
-    if rank_bonus_prompt:
-        rank_bonus_prompt = f"\n{rank_bonus_prompt}"
+# 에너지 구간별 최근 사건 수
+RECENT_EVENT_COUNT = {"full": 10, "medium": 5, "minimal": 2}
 
-    # Crisis 알림
-    crisis_alert = ""
-    if crisis_system.is_crisis_active():
-        crisis_prompt = crisis_system.get_agent_prompt()
-        if crisis_prompt:
-            if language == "en":
-                crisis_alert = f"\n🚨 CRISIS: {crisis_prompt}"
-            else:
-                crisis_alert = f"\n🚨 위기 상황: {crisis_prompt}"
 
-    # 불평등 논평
-    inequality_commentary = get_inequality_commentary(gini_coefficient, language)
+def _none_text(language: str) -> str:
+    return "None" if language == "en" else "없음"
 
-    # 현재 위치의 에이전트들
-    agents_here = [a for a in alive_agents if a.location == agent.location and a.id != agent.id]
+
+def _historical_summary(history_engine: "HistoryEngine", mode: str, language: str) -> str:
+    """에너지 구간별 역사적 요약"""
+    if mode == "full":
+        return history_engine.get_summary(detailed=True, max_events=10)
+    if mode == "medium":
+        return history_engine.get_summary(detailed=False, max_events=5)
     if language == "en":
-        agents_here_text = ", ".join([f"{a.id}({a.persona})" for a in agents_here]) or "None"
-    else:
-        agents_here_text = ", ".join([f"{a.id}({a.persona})" for a in agents_here]) or "없음"
+        return "Insufficient energy to gather detailed information"
+    return "에너지 부족으로 상세 정보 파악 불가"
+
 
-    # 게시판
-    billboard = env.get_active_billboard()
+def _crisis_alert(crisis_system: "CrisisSystem", language: str) -> str:
+    """위기 알림 줄 (위기가 없으면 빈 문자열)"""
+    if not crisis_system.is_crisis_active():
+        return ""
+    crisis_prompt = crisis_system.get_agent_prompt()
+    if not crisis_prompt:
+        return ""
     if language == "en":
-        billboard_content = billboard if billboard else "None"
-    else:
-        billboard_content = billboard if billboard else "없음"
+        return f"\n🚨 CRISIS: {crisis_prompt}"
+    return f"\n🚨 위기 상황: {crisis_prompt}"
 
-    # 템플릿 선택
-    template = CONTEXT_TEMPLATE_EN if language == "en" else CONTEXT_TEMPLATE_KO
 
-    # 템플릿용 추가 필드
-    energy_warning = get_energy_warning(agent.energy, language)
-    fictional_prefix = FICTIONAL_CONTEXT_PREFIX if language == "en" else ""
+def _agents_here_text(labels: list[str], language: str) -> str:
+    """같은 위치의 에이전트 목록 ("id(persona)" 라벨들)"""
+    return ", ".join(labels) or _none_text(language)
 
-    return template.format(
-        fictional_prefix=fictional_prefix,
+
+def _energy_texts(energy: int, language: str) -> tuple[str, str]:
+    """(에너지 상태 문구, 에너지 경고)"""
+    return get_energy_status(energy, language), get_energy_warning(energy, language)
+
+
+def _village_fields(
+    env: "Environment",
+    crisis_system: "CrisisSystem",
+    alive_count: int,
+    gini_coefficient: float,
+    billboard: Optional[str],
+    language: str,
+) -> dict:
+    """모든 에이전트에게 같은 마을 상태 필드"""
+    return dict(
+        fictional_prefix=FICTIONAL_CONTEXT_PREFIX if language == "en" else "",
+        epoch=env.current_epoch,
+        alive_count=alive_count,
+        gini_display=f"{gini_coefficient:.2f}",
+        tax_rate=int(env.get_market_tax_rate() * 100),
+        treasury=env.treasury if hasattr(env, 'treasury') else 0,
+        inequality_commentary=get_inequality_commentary(gini_coefficient, language),
+        crisis_alert=_crisis_alert(crisis_system, language),
+        billboard_content=billboard if billboard else _none_text(language),
+    )
+
+
+def _agent_fields(
+    agent: "Agent",
+    support_tracker: "SupportTracker",
+    influence_system: "InfluenceSystem",
+    energy_texts: tuple[str, str],
+    language: str,
+) -> dict:
+    """에이전트 자신의 상태 필드 (energy_texts는 _energy_texts() 결과)"""
+    tier = influence_system.get_tier(agent.influence)
+    rank_bonus_prompt = tier.prompt_bonus or ""
+    if rank_bonus_prompt:
+        rank_bonus_prompt = f"\n{rank_bonus_prompt}"
+    energy_status, energy_warning = energy_texts
+    return dict(
         persona_prompt=agent.system_prompt,
         agent_id=agent.id,
         location=agent.location,
         energy=agent.energy,
-        energy_status=get_energy_status(agent.energy, language),
+        energy_status=energy_status,
         energy_warning=energy_warning,
         influence=agent.influence,
-        rank=rank,
+        rank=tier.title,
         rank_bonus_prompt=rank_bonus_prompt,
-        support_context=support_context,
+        support_context=support_tracker.get_support_context(agent.id, language=language),
+    )
+
+
+def _finish_context(
+    agent: "Agent",
+    fields: dict,
+    max_tokens: int,
+    language: str,
+    layout: str,
+    enforce_budget: bool,
+    read_set: Optional[dict],
+) -> str:
+    """예산 맞추기, read_set 기록, 렌더링"""
+    if enforce_budget:
+        fields.update(_fit_to_budget(fields, max_tokens, layout, language))
+
+    if read_set is not None:
+        read_set.update({
+            "self": (agent.id, agent.location, agent.energy, agent.influence, fields["rank"], language),
+            "agents_here": fields["agents_here"],
+            "billboard": fields["billboard_content"],
+            "support": fields["support_context"],
+            "recent_logs": fields["recent_events"],
+            "history": fields["historical_summary"],
+            "village": (
+                fields["epoch"], fields["alive_count"], fields["gini_display"],
+                fields["inequality_commentary"], fields["tax_rate"], fields["treasury"],
+                fields["crisis_alert"],
+            ),
+        })
+
+    return _render(fields, layout, language)
+
+
+class ContextBuilder:
+    """공통 조각을 캐시하며 여러 에이전트의 컨텍스트를 만드는 빌더 (Simulation이 소유)
+
+    build_context()는 에이전트마다 모두에게 같은 조각(마을 상태, 불평등 논평, 위기 알림,
+    게시판, 역사 요약, 최근 사건, 위치별 행동 목록)을 다시 만들고, 같은 위치 에이전트를
+    찾느라 생존자 전체를 훑는다. 빌더는 조각마다 그 조각이 읽는 세계 상태를 키로 캐시한다.
+
+    - 마을 상태: (에폭, 생존자 수, 지니, 세율, 공공자금, 위기 문구, 게시판)
+    - 역사 요약: (HistoryEngine.version, 에너지 구간)
+    - 최근 사건: 사건 수별로 (마지막 로그 객체, 로그 수). 로그는 덧붙이기만 하므로
+      마지막 항목이 같으면 창도 같다 (캐시가 그 객체를 잡고 있어 id가 재사용되지 않는다)
+    - 같은 위치 에이전트: (PopulationRegistry.version, 스냅샷, 위치)
+    - 위치별 행동 목록, 에너지별 상태/경고 문구: 바뀌지 않으므로 런 내내
+
+    언어가 들어가는 조각은 언어도 키에 넣는다. 레이아웃/예산은 조각을 이어 붙인 뒤에만 쓰므로
+    호출마다 넘긴다. 출력은 같은 인자의 build_context()와 글자 단위로 같다.
+    """
+
+    def __init__(
+        self,
+        env: "Environment",
+        support_tracker: "SupportTracker",
+        history_engine: "HistoryEngine",
+        influence_system: "InfluenceSystem",
+        crisis_system: "CrisisSystem",
+        population: "PopulationRegistry",
+    ):
+        self.env = env
+        self.support_tracker = support_tracker
+        self.history_engine = history_engine
+        self.influence_system = influence_system
+        self.crisis_system = crisis_system
+        self.population = population
+
+        self._village: Optional[tuple] = None
+        self._history: dict[tuple[str, str], tuple] = {}
+        self._events: dict[tuple[int, str], tuple] = {}
+        self._actions: dict[tuple[str, str], str] = {}
+        self._energy: dict[tuple[int, str], tuple[str, str]] = {}
+        self._labels_key: Optional[tuple] = None
+        self._labels_snapshot: Optional[list["Agent"]] = None
+        self._labels: dict[str, list[tuple[str, str]]] = {}
+        self.builds = 0
+        self._counts = {
+            name: {"hits": 0, "misses": 0}
+            for name in ("village", "history", "recent_events", "agents_here", "actions", "energy")
+        }
+
+    def build(
+        self,
+        agent: "Agent",
+        recent_logs: list[dict],
+        alive_agents: Optional[list["Agent"]] = None,
+        gini: Optional[float] = None,
+        language: str = "ko",
+        read_set: Optional[dict] = None,
+        layout: str = "default",
+        enforce_budget: bool = False,
+    ) -> str:
+        """build_context()와 같은 프롬프트 (alive_agents/gini가 없으면 현재 상태 기준)
+
+        alive_agents만 주면 지니 계수도 그 스냅샷으로 계산한다.
+        """
+        self.builds += 1
+        max_tokens, mode = get_context_length(agent.energy)
+        if alive_agents is not None and gini is None:
+            gini = calculate_gini_coefficient([a.energy for a in alive_agents])
+
+        fields = dict(self._village_fields(alive_agents, gini, language))
+        fields.update(_agent_fields(
+            agent, self.support_tracker, self.influence_system,
+            self._energy_texts(agent.energy, language), language,
+        ))
+        labels = self._location_labels(agent.location, alive_agents)
+        fields.update(
+            recent_events=self._recent_events(recent_logs, RECENT_EVENT_COUNT[mode], language),
+            historical_summary=self._historical_summary(mode, language),
+            agents_here=_agents_here_text([label for aid, label in labels if aid != agent.id], language),
+            available_actions=self._available_actions(agent.location, language),
+        )
+        return _finish_context(agent, fields, max_tokens, language, layout, enforce_budget, read_set)
+
+    def _count(self, name: str, hit: bool) -> None:
+        self._counts[name]["hits" if hit else "misses"] += 1
+
+    def _village_fields(
+        self, alive_agents: Optional[list["Agent"]], gini: Optional[float], language: str
+    ) -> dict:
+        if alive_agents is None:
+            alive_count = self.population.alive_count
+            if gini is None:
+                gini = self.population.gini()
+        else:
+            alive_count = len(alive_agents)
+        billboard = self.env.get_active_billboard()
+        crisis_prompt = self.crisis_system.get_agent_prompt() if self.crisis_system.is_crisis_active() else None
+        key = (
+            self.env.current_epoch, alive_count, gini, self.env.get_market_tax_rate(),
+            getattr(self.env, "treasury", 0), crisis_prompt, billboard, language,
+        )
+        hit = self._village is not None and self._village[0] == key
+        self._count("village", hit)
+        if not hit:
+            fields = _village_fields(self.env, self.crisis_system, alive_count, gini, billboard, language)
+            self._village = (key, fields)
+        return self._village[1]
+
+    def _historical_summary(self, mode: str, language: str) -> str:
+        version = self.history_engine.version
+        cached = self._history.get((mode, language))
+        hit = cached is not None and cached[0] == version
+        self._count("history", hit)
+        if not hit:
+            cached = (version, _historical_summary(self.history_engine, mode, language))
+            self._history[mode, language] = cached
+        return cached[1]
+
+    def _recent_events(self, recent_logs: list[dict], n: int, language: str) -> str:
+        last = recent_logs[-1] if recent_logs else None
+        cached = self._events.get((n, language))
+        hit = cached is not None and cached[0] is last and cached[1] == len(recent_logs)
+        self._count("recent_events", hit)
+        if not hit:
+            cached = (last, len(recent_logs), _format_recent_events(recent_logs, n=n, language=language))
+            self._events[n, language] = cached
+        return cached[2]
+
+    def _location_labels(
+        self, location: str, alive_agents: Optional[list["Agent"]]
+    ) -> list[tuple[str, str]]:
+        """위치의 (에이전트 id, "id(persona)") 목록 (설정 순서, 스냅샷이 있으면 스냅샷 기준)"""
+        key = (self.population.version, id(alive_agents) if alive_agents is not None else None)
+        if key != self._labels_key:
+            # 스냅샷 리스트를 잡아 두어 id가 재사용되지 않게 한다
+            self._labels_key, self._labels_snapshot = key, alive_agents
+            self._labels = {}
+        labels = self._labels.get(location)
+        self._count("agents_here", labels is not None)
+        if labels is None:
+            members = (
+                self.population.agents_in(location) if alive_agents is None
+                else [a for a in alive_agents if a.location == location]
+            )
+            labels = [(a.id, f"{a.id}({a.persona})") for a in members]
+            self._labels[location] = labels
+        return labels
+
+    def _available_actions(self, location: str, language: str) -> str:
+        text = self._actions.get((location, language))
+        self._count("actions", text is not None)
+        if text is None:
+            text = get_available_actions_text(location, language)
+            self._actions[location, language] = text
+        return text
+
+    def _energy_texts(self, energy: int, language: str) -> tuple[str, str]:
+        texts = self._energy.get((energy, language))
+        self._count("energy", texts is not None)
+        if texts is None:
+            texts = _energy_texts(energy, language)
+            self._energy[energy, language] = texts
+        return texts
+
+    def stats(self) -> dict:
+        """조각별 캐시 적중/미스와 적중률 (performance.json의 context_builder)"""
+        fragments = {}
+        for name, counts in self._counts.items():
+            total = counts["hits"] + counts["misses"]
+            fragments[name] = {
+                **counts,
+                "hit_rate": round(counts["hits"] / total, 4) if total else 0.0,
+            }
+        return {"builds": self.builds, "fragments": fragments}
+
+
+# 예산에 맞춰 줄일 수 있는 섹션
+_TRIMMABLE_SECTIONS = ("historical_summary", "recent_events", "support_context")
+
+
+def build_observation(
+    agent: "Agent",
+    env: "Environment",
+    crisis_system: "CrisisSystem",
+    alive_agents: list["Agent"],
+    language: str = "ko",
+    render: Optional[Callable[[], str]] = None,
+) -> Observation:
+    """에이전트 관측 생성 (프롬프트는 render로 필요할 때만 만든다)"""
+    return Observation(
+        agent_id=agent.id,
+        persona=agent.persona,
+        location=agent.location,
+        energy=agent.energy,
+        influence=agent.influence,
         epoch=env.current_epoch,
-        alive_count=len(alive_agents),
-        gini_display=f"{gini_coefficient:.2f}",
-        tax_rate=int(env.get_market_tax_rate() * 100),
-        treasury=env.treasury if hasattr(env, 'treasury') else 0,
-        inequality_commentary=inequality_commentary,
-        crisis_alert=crisis_alert,
-        recent_events=recent_events,
-        historical_summary=historical_summary,
-        billboard_content=billboard_content,
-        agents_here=agents_here_text,
-        available_actions=get_available_actions_text(agent.location, language),
+        language=language,
+        agents_here=[a.id for a in alive_agents if a.location == agent.location and a.id != agent.id],
+        available_actions=sorted(get_available_actions(agent.location)),
+        crisis_active=crisis_system.is_crisis_active(),
+        billboard=env.get_active_billboard(),
+        render=render,
     )
 
 
+def _compile_template(template: str) -> tuple[tuple[str, Optional[str]], ...]:
+    """템플릿을 (리터럴, 필드 이름) 조각 목록으로 미리 파싱 (마지막 리터럴의 필드는 None)"""
+    segments = []
+    for literal, name, spec, conversion in Formatter().parse(template):
+        if spec or conversion:
+            raise ValueError(f"format spec/conversion not supported in context templates: {name}")
+        segments.append((literal, name))
+    return tuple(segments)
+
+
+def _render_template(segments: tuple[tuple[str, Optional[str]], ...], fields: dict) -> str:
+    """미리 파싱한 템플릿 렌더링 (template.format(**fields)와 같은 결과)"""
+    return "".join([
+        literal if name is None else literal + str(fields[name])
+        for literal, name in segments
+    ])
+
+
+_COMPILED_TEMPLATES = {
+    ("default", "ko"): (_compile_template(CONTEXT_TEMPLATE_KO),),
+    ("default", "en"): (_compile_template(CONTEXT_TEMPLATE_EN),),
+    ("cache", "ko"): (_compile_template(CONTEXT_STABLE_KO), _compile_template(CONTEXT_VOLATILE_KO)),
+    ("cache", "en"): (_compile_template(CONTEXT_STABLE_EN), _compile_template(CONTEXT_VOLATILE_EN)),
+}
+
+
+def _render(fields: dict, layout: str, language: str) -> str:
+    """필드를 레이아웃/언어에 맞는 템플릿으로 렌더링"""
+    language = "en" if language == "en" else "ko"
+    if layout == "cache":
+        stable, volatile = _COMPILED_TEMPLATES["cache", language]
+        return LayeredPrompt(_render_template(stable, fields).strip(), _render_template(volatile, fields))
+
+    template, = _COMPILED_TEMPLATES["default", language]
+    return _render_template(template, fields)
+
+
+def _fit_to_budget(fields: dict, budget: int, layout: str, language: str) -> dict:
+    """고정 부분을 뺀 나머지 예산에 맞게 줄인 섹션들"""
+    empty = dict.fromkeys(_TRIMMABLE_SECTIONS, "")
+    fixed = estimate_prompt_tokens(_render({**fields, **empty}, layout, language))
+    sections = {name: fields[name] for name in _TRIMMABLE_SECTIONS}
+    none_text = "None" if language == "en" else "없음"
+    return fit_sections(sections, budget - fixed, none_text)
+
+
+def build_delta_context(
+    agent: "Agent", previous: dict, current: dict, language: str = "ko"
+) -> str:
+    """세션 모드용 델타 프롬프트 (previous/current는 build_context가 채운 read_set)
+
+    모델은 대화 기록으로 이전 상태를 이미 알고 있으므로, 바뀐 항목과 새 사건만 보낸다.
+    에너지는 생존 판단의 핵심이라 바뀌지 않아도 항상 포함한다.
+    """
+    labels = DELTA_LABELS_EN if language == "en" else DELTA_LABELS_KO
+    _, prev_location, prev_energy, prev_influence, _, _ = previous["self"]
+    _, location, energy, influence, rank, _ = current["self"]
+    prev_village = previous["village"]
+    epoch, alive_count, gini, commentary, tax_rate, treasury, crisis_alert = current["village"]
+
+    lines = [labels["header"].format(epoch=epoch)]
+
+    status = get_energy_status(energy, language)
+    if energy != prev_energy:
+        lines.append(labels["energy"].format(before=prev_energy, after=energy, status=status))
+    else:
+        lines.append(labels["energy_same"].format(after=energy, status=status))
+    if location != prev_location:
+        lines.append(labels["moved"].format(before=prev_location, after=location))
+    if influence != prev_influence:
+        lines.append(labels["influence"].format(before=prev_influence, after=influence, rank=rank))
+
+    for key, index in (("survivors", 1), ("gini", 2), ("tax", 4), ("treasury", 5)):
+        if prev_village[index] != current["village"][index]:
+            lines.append(labels[key].format(before=prev_village[index], after=current["village"][index]))
+    if commentary != prev_village[3] and commentary:
+        lines.append(commentary)
+    if crisis_alert != prev_village[6]:
+        lines.append(crisis_alert.strip() if crisis_alert else labels["crisis_over"])
+
+    new_events = _new_event_lines(previous["recent_logs"], current["recent_logs"])
+    if new_events:
+        lines.append(labels["events"].format(count=len(new_events)))
+        lines.extend(f"  {line}" for line in new_events)
+    else:
+        lines.append(labels["no_events"])
+
+    if current["billboard"] != previous["billboard"]:
+        lines.append(labels["billboard"].format(value=current["billboard"]))
+    if current["agents_here"] != previous["agents_here"]:
+        lines.append(labels["agents_here"].format(value=current["agents_here"]))
+
+    sections = ["\n".join(lines)]
+    if energy <= 50:
+        sections.append(get_energy_warning(energy, language))
+    if current["support"] != previous["support"]:
+        sections.append(current["support"])
+    if current["history"] != previous["history"]:
+        sections.append(f"{labels['history']}\n{current['history']}")
+    if location != prev_location:
+        sections.append(f"{labels['actions']}\n{get_available_actions_text(location, language)}")
+
+    sections.append(f"---\n{labels['footer']}")
+    return "\n\n".join(sections)
+
+
+def _new_event_lines(previous: str, current: str) -> list[str]:
+    """최근 사건 창에서 지난번에 없던 줄 (이전 창의 끝과 겹치는 앞부분은 제외)"""
+    prev_lines = [line for line in previous.split("\n") if line.startswith("- ")]
+    cur_lines = [line for line in current.split("\n") if line.startswith("- ")]
+    for overlap in range(min(len(prev_lines), len(cur_lines)), 0, -1):
+        if prev_lines[-overlap:] == cur_lines[:overlap]:
+            return cur_lines[overlap:]
+    return cur_lines
+
+
 def _format_recent_events(logs: list[dict], n: int = 5, language: str = "ko") -> str:
     """최근 로그를 이벤트 텍스트로 변환"""
     none_text = "None" if language == "en" else "없음"
@@ -1,5 +1,13 @@
-"""역사적 요약 엔진"""
+"""역사적 요약 엔진
 
+get_summary()는 에이전트마다 턴마다 불리므로 매번 전체 이벤트를 정렬하지 않는다.
+  - (중요도, 에폭) 내림차순 상위 TOP_K개만 정렬된 상태로 유지 (기록할 때 bisect로 삽입)
+    중요도 4 이상 요약은 이 목록의 앞부분이다 (중요도가 정렬의 첫 키)
+  - 렌더링한 요약 문자열은 이벤트 버전이 바뀔 때까지 재사용 (한 에폭의 12+ 에이전트가 공유)
+  - 타입별/에이전트별 이벤트 색인
+"""
+
+import bisect
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Optional
@@ -60,6 +68,9 @@ AUTO_RECORD_EVENTS = {
     },
 }
 
+# 정렬 상태로 유지할 상위 이벤트 수 (이보다 많이 요청하면 전체 정렬)
+TOP_K = 32
+
 
 class HistoryEngine:
     """역사적 요약 엔진"""
@@ -67,6 +78,48 @@ class HistoryEngine:
     def __init__(self):
         self.events: list[HistoricalEvent] = []
         self._first_death_recorded = False
+        self._reset_index()
+
+    def _reset_index(self) -> None:
+        # 이벤트가 바뀔 때마다 올라가는 버전 (요약 캐시 무효화)
+        self._version = 0
+        # (-중요도, -에폭, 기록 순서) 오름차순 = 기존 정렬(중요도/에폭 내림차순, 같으면 기록 순서)
+        self._top_keys: list[tuple[int, int, int]] = []
+        self._top_events: list[HistoricalEvent] = []
+        self._by_type: dict[str, list[HistoricalEvent]] = {}
+        self._by_agent: dict[str, list[HistoricalEvent]] = {}
+        self._indexed = 0
+        self._summaries: dict[tuple[bool, int], tuple[int, str]] = {}
+
+    def _index(self, event: HistoricalEvent, seq: int) -> None:
+        key = (-event.importance, -event.epoch, seq)
+        if len(self._top_keys) < TOP_K or key < self._top_keys[-1]:
+            position = bisect.bisect(self._top_keys, key)
+            self._top_keys.insert(position, key)
+            self._top_events.insert(position, event)
+            if len(self._top_keys) > TOP_K:
+                self._top_keys.pop()
+                self._top_events.pop()
+        self._by_type.setdefault(event.event_type, []).append(event)
+        for agent_id in dict.fromkeys(event.agents_involved):
+            self._by_agent.setdefault(agent_id, []).append(event)
+
+    @property
+    def version(self) -> int:
+        """이벤트가 바뀔 때마다 올라가는 버전 (events를 직접 고친 경우도 색인을 맞춘 뒤 반영)"""
+        self._sync()
+        return self._version
+
+    def _sync(self) -> None:
+        """record()를 거치지 않고 events가 바뀌었으면 색인을 다시 만든다"""
+        if self._indexed == len(self.events):
+            return
+        version = self._version
+        self._reset_index()
+        self._version = version + 1
+        for seq, event in enumerate(self.events):
+            self._index(event, seq)
+        self._indexed = len(self.events)
 
     def record(
         self,
@@ -84,7 +137,11 @@ class HistoryEngine:
             importance=importance,
             agents_involved=agents_involved or [],
         )
+        self._sync()
         self.events.append(event)
+        self._index(event, len(self.events) - 1)
+        self._indexed = len(self.events)
+        self._version += 1
         return event
 
     def record_auto(self, epoch: int, event_type: str, **kwargs) -> Optional[HistoricalEvent]:
@@ -128,18 +185,28 @@ class HistoryEngine:
         if not self.events:
             return "아직 기록된 역사가 없습니다."
 
-        # 중요도 순 정렬 (같으면 최신순)
-        sorted_events = sorted(
-            self.events,
-            key=lambda e: (e.importance, e.epoch),
-            reverse=True
-        )
+        self._sync()
+        cache_key = (detailed, max_events)
+        cached = self._summaries.get(cache_key)
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+
+        summary = self._render_summary(detailed, max_events)
+        self._summaries[cache_key] = (self._version, summary)
+        return summary
+
+    def _top(self, n: int) -> list[HistoricalEvent]:
+        """중요도 순(같으면 최신순, 그다음 기록 순) 상위 n개"""
+        if n <= TOP_K:
+            return self._top_events[:n]
+        return sorted(self.events, key=lambda e: (e.importance, e.epoch), reverse=True)[:n]
 
+    def _render_summary(self, detailed: bool, max_events: int) -> str:
         if detailed:
-            selected = sorted_events[:max_events]
+            selected = self._top(max_events)
         else:
-            # 중요도 4 이상만
-            selected = [e for e in sorted_events if e.importance >= 4][:5]
+            # 중요도 4 이상만 (정렬 첫 키가 중요도이므로 상위 5개 중에서 고르면 된다)
+            selected = [e for e in self._top(5) if e.importance >= 4]
 
         if not selected:
             return "특별히 기록할 만한 사건이 없습니다."
@@ -151,11 +218,13 @@ class HistoryEngine:
 
     def get_events_by_type(self, event_type: str) -> list[HistoricalEvent]:
         """특정 타입의 이벤트 조회"""
-        return [e for e in self.events if e.event_type == event_type]
+        self._sync()
+        return list(self._by_type.get(event_type, ()))
 
     def get_events_involving(self, agent_id: str) -> list[HistoricalEvent]:
         """특정 에이전트 관련 이벤트 조회"""
-        return [e for e in self.events if agent_id in e.agents_involved]
+        self._sync()
+        return list(self._by_agent.get(agent_id, ()))
 
     def get_recent_events(self, n: int = 5) -> list[HistoricalEvent]:
         """최근 이벤트 조회"""
@@ -179,3 +248,6 @@ class HistoryEngine:
         """기록 초기화"""
         self.events = []
         self._first_death_recorded = False
+        version = self._version
+        self._reset_index()
+        self._version = version + 1
@@ -0,0 +1,100 @@
+"""점진 지니 계수 (에너지 값 위의 펜윅 트리)
+
+calculate_gini_coefficient()는 호출마다 정렬하므로 턴마다 부르면 에폭당 O(N² log N)이다.
+에너지는 max_energy(200) 이하의 정수이므로 값별 개수/합을 펜윅 트리에 두고, 정렬 순위
+가중합 S = Σ rank·value를 값이 들어오고 나갈 때마다 O(log E)로 갱신한다.
+
+    gini = (2·S − (n+1)·total) / (n·total)
+
+S, n, total이 모두 정수라서 calculate_gini_coefficient()와 같은 float를 돌려준다.
+"""
+
+
+class _Fenwick:
+    """1-기반 누적합 트리"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index: int, delta: int) -> None:
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        """1..index 합"""
+        total = 0
+        index = min(index, self.size)
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+
+class InequalityTracker:
+    """정수 값 다중집합의 지니 계수를 점진적으로 유지"""
+
+    def __init__(self, max_value: int = 200):
+        self._counts = _Fenwick(max_value + 1)
+        self._sums = _Fenwick(max_value + 1)
+        self.n = 0
+        self.total = 0
+        # 오름차순 정렬 순위(1-기반) × 값의 합
+        self._ranked = 0
+
+    @property
+    def max_value(self) -> int:
+        return self._counts.size - 1
+
+    def _grow(self, value: int) -> None:
+        """상한을 넘는 값이 들어오면 트리를 두 배씩 키워 다시 만든다"""
+        size = self._counts.size
+        while size - 1 < value:
+            size *= 2
+        counts, sums = _Fenwick(size), _Fenwick(size)
+        for v in range(self._counts.size):
+            count = self._count_at(v)
+            if count:
+                counts.add(v + 1, count)
+                sums.add(v + 1, count * v)
+        self._counts, self._sums = counts, sums
+
+    def _count_at(self, value: int) -> int:
+        return self._counts.prefix(value + 1) - self._counts.prefix(value)
+
+    def add(self, value: int) -> None:
+        """값 하나 추가 (같은 값들 중 맨 뒤 순위로)"""
+        if value > self.max_value:
+            self._grow(value)
+        count_le = self._counts.prefix(value + 1)
+        sum_gt = self.total - self._sums.prefix(value + 1)
+        # 새 값의 순위는 count_le + 1, 더 큰 값들은 순위가 하나씩 밀린다
+        self._ranked += value * (count_le + 1) + sum_gt
+        self._counts.add(value + 1, 1)
+        self._sums.add(value + 1, value)
+        self.n += 1
+        self.total += value
+
+    def remove(self, value: int) -> None:
+        """값 하나 제거 (같은 값들 중 맨 뒤 순위의 것)"""
+        count_le = self._counts.prefix(value + 1)
+        if value > self.max_value or count_le == self._counts.prefix(value):
+            raise ValueError(f"value not tracked: {value}")
+        sum_gt = self.total - self._sums.prefix(value + 1)
+        self._ranked -= value * count_le + sum_gt
+        self._counts.add(value + 1, -1)
+        self._sums.add(value + 1, -value)
+        self.n -= 1
+        self.total -= value
+
+    def update(self, old: int, new: int) -> None:
+        if old != new:
+            self.remove(old)
+            self.add(new)
+
+    def gini(self) -> float:
+        """지니 계수 (0: 완전평등, 1: 완전불평등). calculate_gini_coefficient()와 같은 값"""
+        if self.n <= 1 or self.total == 0:
+            return 0.0
+        return (2 * self._ranked - (self.n + 1) * self.total) / (self.n * self.total)
@@ -74,6 +74,7 @@ class SimulationLogger:
         billboard_active: Optional[str],
         treasury: int,
         notable_events: list[str],
+        extra: Optional[dict] = None,
     ) -> None:
         """에폭 요약 로그 기록"""
         summary = {
@@ -87,6 +88,9 @@ class SimulationLogger:
             "notable_events": notable_events,
         }
 
+        if extra:
+            summary.update(extra)
+
         self._append_jsonl(self.summary_path, summary)
 
     def _append_jsonl(self, path: Path, data: dict) -> None:
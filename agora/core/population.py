@@ -0,0 +1,129 @@
+"""인구 색인 (생존 목록, 위치별 점유, 생존자 수/에너지 합계, 지니 계수)
+
+get_alive_agents()/get_agents_in_location()이 턴마다 여러 번 전체 에이전트를 훑지 않도록,
+Agent의 energy/influence/location/alive가 바뀔 때마다 통지를 받아 색인을 갱신한다.
+생존 여부는 Agent.is_alive와 같은 기준(alive이고 energy > 0)이고, 목록은 항상 설정 순서
+(self.agents 순서)로 돌려주므로 셔플/분배 결과가 전체 스캔과 같다.
+"""
+
+from typing import Optional
+
+from .agent import Agent
+from .inequality import InequalityTracker
+
+
+class PopulationRegistry:
+    """Simulation이 소유하는 에이전트 색인"""
+
+    def __init__(self, agents: list[Agent]):
+        self.agents = agents
+        self._index = {agent.id: i for i, agent in enumerate(agents)}
+        self._alive: set[int] = set()
+        self._by_location: dict[str, set[int]] = {}
+        # alive 플래그는 남아 있지만 에너지가 바닥난 에이전트 (다음 사망 체크 대상)
+        self._exhausted: set[int] = set()
+        self.total_energy = 0
+        self.total_influence = 0
+        # 생존자 에너지 분포 (지니 계수)
+        self.inequality = InequalityTracker(max((a.max_energy for a in agents), default=200))
+        # 멤버십이 바뀔 때만 다시 만드는 정렬된 목록 캐시
+        self._alive_list: Optional[list[Agent]] = None
+        self._location_lists: dict[str, list[Agent]] = {}
+        # 생존 멤버십이나 위치가 바뀔 때마다 증가 (위치별 목록을 캐시하는 쪽의 무효화 키)
+        self.version = 0
+
+        for i, agent in enumerate(agents):
+            if agent.is_alive:
+                self._add(i, agent.energy, agent.influence, agent.location)
+            self._update_exhausted(i, agent)
+            agent.attach_registry(self)
+
+    # ------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------
+
+    @property
+    def alive_count(self) -> int:
+        return len(self._alive)
+
+    def alive_agents(self) -> list[Agent]:
+        """생존 에이전트 목록 (설정 순서, 호출자가 섞을 수 있도록 복사본)"""
+        if self._alive_list is None:
+            self._alive_list = [self.agents[i] for i in sorted(self._alive)]
+        return list(self._alive_list)
+
+    def agents_in(self, location: str) -> list[Agent]:
+        """특정 위치의 생존 에이전트 목록 (설정 순서의 새 리스트)"""
+        cached = self._location_lists.get(location)
+        if cached is None:
+            cached = [self.agents[i] for i in sorted(self._by_location.get(location, ()))]
+            self._location_lists[location] = cached
+        return list(cached)
+
+    def count_in(self, location: str) -> int:
+        return len(self._by_location.get(location, ()))
+
+    def exhausted_agents(self) -> list[Agent]:
+        """alive 플래그가 남은 채 에너지가 0 이하인 에이전트 (설정 순서)"""
+        return [self.agents[i] for i in sorted(self._exhausted)]
+
+    # ------------------------------------------------------------
+    # 갱신
+    # ------------------------------------------------------------
+
+    def on_change(self, agent: Agent, name: str, old) -> None:
+        """Agent.__setattr__가 추적 속성을 바꾼 뒤 호출 (old는 바뀌기 전 값)"""
+        i = self._index[agent.id]
+        energy = old if name == "energy" else agent.energy
+        influence = old if name == "influence" else agent.influence
+        location = old if name == "location" else agent.location
+        alive = old if name == "alive" else agent.alive
+
+        was_alive, is_alive = alive and energy > 0, agent.is_alive
+        if was_alive:
+            self.total_energy -= energy
+            self.total_influence -= influence
+        if is_alive:
+            self.total_energy += agent.energy
+            self.total_influence += agent.influence
+        if name in ("energy", "alive"):
+            if was_alive:
+                self.inequality.remove(energy)
+            if is_alive:
+                self.inequality.add(agent.energy)
+
+        if was_alive != is_alive or name == "location":
+            self.version += 1
+        if was_alive != is_alive:
+            if is_alive:
+                self._alive.add(i)
+            else:
+                self._alive.discard(i)
+            self._alive_list = None
+        old_location = location if was_alive else None
+        new_location = agent.location if is_alive else None
+        if old_location != new_location:
+            if old_location is not None:
+                self._by_location[old_location].discard(i)
+                self._location_lists.pop(old_location, None)
+            if new_location is not None:
+                self._by_location.setdefault(new_location, set()).add(i)
+                self._location_lists.pop(new_location, None)
+        self._update_exhausted(i, agent)
+
+    def gini(self) -> float:
+        """생존자 에너지의 지니 계수 (calculate_gini_coefficient()와 같은 값)"""
+        return self.inequality.gini()
+
+    def _add(self, i: int, energy: int, influence: int, location: str) -> None:
+        self._alive.add(i)
+        self.inequality.add(energy)
+        self._by_location.setdefault(location, set()).add(i)
+        self.total_energy += energy
+        self.total_influence += influence
+
+    def _update_exhausted(self, i: int, agent: Agent) -> None:
+        if agent.alive and agent.energy <= 0:
+            self._exhausted.add(i)
+        else:
+            self._exhausted.discard(i)
@@ -1,16 +1,21 @@
 """메인 시뮬레이션 루프 (Phase 3 - LLM 통합)"""
 
+import asyncio
 import json
 import random
 import math
+import time
 import yaml
+from collections import Counter
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, TYPE_CHECKING
 
 from .agent import Agent, create_agents_from_config
+from .population import PopulationRegistry
 from .environment import Environment
-from .logger import SimulationLogger, calculate_gini_coefficient
+from .logger import SimulationLogger
 from .support import SupportTracker
 from .whisper import WhisperSystem
 from .market import MarketPool, Treasury
@@ -18,10 +23,20 @@ from .influence import InfluenceSystem, ELDER_SUPPORT_MULTIPLIER
 from .crisis import CrisisSystem, CRISIS_SUPPORT_BONUS
 from .architect import ArchitectSkills
 from .actions import get_speak_type, get_available_actions
-from .context import build_context
+from .budget import estimate_prompt_tokens
+from .context import (
+    ContextBuilder, build_delta_context, build_observation, get_output_tokens, OUTPUT_TOKEN_BUDGET,
+    PROMPT_TOKEN_BUDGET,
+)
 from .history import HistoryEngine
 
-from ..adapters import create_adapter, BaseLLMAdapter, LLMResponse
+from ..adapters import (
+    create_adapter, get_client_pool, BaseLLMAdapter, LLMResponse, CachingAdapter, ResponseCache,
+    Cassette, HedgingAdapter, LatencyTracker, Observation, OllamaRouter, RecordingAdapter,
+    RequestScheduler, RoutedAdapter, ScheduledAdapter, StreamStats, TwoPhaseAdapter, ACTION_SCHEMA,
+    EXTRA_ACTION_FIELDS,
+)
+from ..adapters.twophase import response_text
 
 
 class Simulation:
@@ -40,6 +55,70 @@ class Simulation:
         # 언어 설정 (기본값: ko)
         self.language = self.config.get("language", "ko")
 
+        # 턴 스케줄링
+        #   sequential: 한 명씩 결정/실행 (기본)
+        #   simultaneous: 같은 스냅샷으로 동시 결정 후 순차 해석
+        #   pipelined: sequential과 같은 결과, 다음 턴 LLM 호출을 투기적으로 미리 실행
+        self.scheduling = sim_config.get("scheduling", "sequential")
+        if self.scheduling not in ("sequential", "simultaneous", "pipelined"):
+            raise ValueError(f"Unknown scheduling mode: {self.scheduling}")
+        self.max_concurrency = sim_config.get("max_concurrency")
+        self.speculation_depth = sim_config.get("speculation_depth", 1)
+        # 모델 친화 순서: 턴 의미를 바꾸지 않는 범위에서 대기 중인 LLM 요청을 모델별로 묶는다
+        #   simultaneous: 요청 발송 순서를 모델별로 묶음 (해석 순서는 그대로 셔플 순서)
+        #   pipelined: 현재 턴과 다른 모델은 투기 실행하지 않음 (진행 중 호출 도중 모델 교체 방지)
+        #   sequential: 순서가 결과를 바꾸므로 재배치하지 않고 전환 횟수만 기록
+        self.model_affinity = sim_config.get("model_affinity", False)
+        # 프로바이더별 마지막으로 요청을 보낸 모델과 모델 전환 횟수 (mock 제외)
+        self._last_dispatched_model: dict[str, str] = {}
+        self._epoch_dispatches: Counter = Counter()
+        self._epoch_model_switches: Counter = Counter()
+        self._model_switch_totals: Counter = Counter()
+        self.speculation_stats = {"hits": 0, "misses": 0, "miss_reasons": Counter()}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 구조화 출력: 지원 백엔드에 행동 JSON 스키마를 넘겨 디코딩 단계에서 형식 강제
+        self.structured_output = self.config.get("structured_output", {}).get("enabled", False)
+        self._decision_kwargs = {"response_schema": ACTION_SCHEMA} if self.structured_output else {}
+        # "어댑터:모델" -> calls / parse_failures / errors
+        self.parse_stats: dict[str, Counter] = {}
+        # 세션 모드: 에이전트별 (마지막으로 보낸 프롬프트의 read_set, 보낼 때의 세션 턴 수,
+        # 그 전에 모델에 전달된 read_set) - 델타 계산용
+        self._session_read_sets: dict[str, tuple[dict, int, Optional[dict]]] = {}
+        self._session_totals_prev: dict = {}
+
+        # 프롬프트 배치: default(기존 템플릿) | cache(고정 블록 + 가변 블록, 프롬프트 캐시용)
+        context_config = self.config.get("context", {})
+        self.context_layout = context_config.get("layout", "default")
+        if self.context_layout not in ("default", "cache"):
+            raise ValueError(f"Unknown context layout: {self.context_layout}")
+        # 토큰 예산: 에너지 구간별 프롬프트 예산에 맞춰 섹션을 줄이고 출력 max_tokens도 맞춤
+        self.enforce_budget = context_config.get("enforce_budget", False)
+        self.output_token_budget = context_config.get("output_tokens")
+        # 최근 사건 지연 (opt-in): 에폭 안에서 i번째 턴은 i - event_lag번째 턴 시작 전까지의 로그만 본다.
+        # 기본 0은 기존과 같다. pipelined에서 speculation_depth 이상으로 주면 겹친 턴의 로그가
+        # 투기 실행을 무효로 만들지 않는다 (같은 event_lag의 sequential과 결과가 같음)
+        self.event_lag = context_config.get("event_lag", 0)
+
+        # 결정 모드: single(한 번에 thought/action/content) | two_phase(행동 먼저, speak/whisper만 내용 호출)
+        self.decision_config = self.config.get("decision", {}) or {}
+        self.decision_mode = self.decision_config.get("mode", "single")
+        if self.decision_mode not in ("single", "two_phase"):
+            raise ValueError(f"Unknown decision mode: {self.decision_mode}")
+        # 프롬프트를 렌더링한 결정의 단계별 호출/출력 토큰 (에폭별, 전체)
+        self._decision_stats: Counter = Counter()
+        self._decision_totals: Counter = Counter()
+        self._epoch_started: Optional[float] = None
+
+        # 지연 상한: 턴/에폭 데드라인을 넘긴 결정은 대체 정책(fallback)으로
+        self.deadline_config = self.config.get("deadline", {}) or {}
+        self.turn_deadline = self.deadline_config.get("turn_seconds")
+        self.epoch_deadline = self.deadline_config.get("epoch_seconds")
+        # 데드라인을 놓친 턴 수 (에폭별, 전체, 모델별)
+        self._deadline_stats: Counter = Counter()
+        self._deadline_totals: Counter = Counter()
+        self._deadline_models: dict[str, Counter] = {}
+
         # 에이전트 초기화
         energy_config = self.config.get("resources", {}).get("energy", {})
         initial_energy = energy_config.get("initial", 100)
@@ -68,6 +147,8 @@ class Simulation:
             language=self.language,
         )
         self.agents_by_id = {agent.id: agent for agent in self.agents}
+        # 생존 목록/위치별 점유/에너지 합계 색인 (에이전트 속성 변경 때마다 갱신)
+        self.population = PopulationRegistry(self.agents)
 
         # LLM 어댑터 초기화
         self.adapters: dict[str, BaseLLMAdapter] = {}
@@ -80,23 +161,34 @@ class Simulation:
         self.run_dir = Path("logs") / self.run_id
         self.run_dir.mkdir(parents=True, exist_ok=True)
 
+        # 녹화/재생 카세트 (run_dir가 정해진 뒤에 어댑터를 감싼다)
+        self._init_cassette()
+        self._init_decision_mode()
+        self._init_fallback_adapters()
+
         self.logger = SimulationLogger(
             log_path=str(self.run_dir / "simulation_log.jsonl"),
             summary_path=str(self.run_dir / "epoch_summary.jsonl"),
         )
 
         # 실험 메타데이터 저장 (재현성 정보 포함)
-        metadata = {
+        self.metadata = {
             "run_id": self.run_id,
             "random_seed": self.random_seed,
             "persona_assignment": self.persona_assignment,
             "persona_map": self.persona_map,
+            "scheduling": self.scheduling,
+            **({"cassette": self.cassette_mode} if self.cassette is not None else {}),
+            **({"context_layout": self.context_layout} if self.context_layout != "default" else {}),
+            **({"enforce_budget": True} if self.enforce_budget else {}),
+            **({"decision_mode": self.decision_mode} if self.decision_mode != "single" else {}),
+            **({"model_affinity": True} if self.model_affinity else {}),
+            **({"deadline": self.deadline_config} if self.fallback_adapters else {}),
             "language": self.language,
             "model": self.config.get("default_model", "unknown"),
             "total_epochs": self.config.get("simulation", {}).get("total_epochs", 100),
         }
-        with open(self.run_dir / "metadata.json", "w", encoding="utf-8") as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        self._write_metadata()
 
         # Phase 2 시스템 초기화
         self.support_tracker = SupportTracker()
@@ -130,6 +222,15 @@ class Simulation:
 
         # Phase 3: 역사 엔진
         self.history_engine = HistoryEngine()
+        # 공통 조각(마을 상태, 역사 요약, 최근 사건 등)을 캐시하는 컨텍스트 빌더
+        self.context_builder = ContextBuilder(
+            env=self.env,
+            support_tracker=self.support_tracker,
+            history_engine=self.history_engine,
+            influence_system=self.influence_system,
+            crisis_system=self.crisis_system,
+            population=self.population,
+        )
 
         # 설정값 캐싱
         decay_config = energy_config.get("decay", {})
@@ -144,6 +245,133 @@ class Simulation:
         self.transaction_count = 0
         self.notable_events: list[str] = []
         self.recent_logs: list[dict] = []  # 최근 로그 (컨텍스트용)
+        self._log_count = 0  # 지금까지 recent_logs에 추가된 로그 수 (잘라내도 줄지 않음)
+        self._turn_marks: list[int] = []  # 이번 에폭 각 턴 시작 시점의 _log_count
+        self._log_horizon: Optional[int] = None  # 진행 중인 턴이 볼 수 있는 로그 수 (None이면 전부)
+
+        # cache 레이아웃의 고정 블록 길이 기록 (프로바이더 최소 캐시 길이 확인)
+        if self.context_layout == "cache":
+            self._check_stable_blocks()
+
+        # Ollama 모델 예열 (프롬프트를 만들 수 있도록 모든 시스템 초기화 뒤에)
+        self._pinned_adapters: list[BaseLLMAdapter] = []
+        self._warm_up_models()
+
+    def _write_metadata(self) -> None:
+        """run_dir/metadata.json 저장 (초기화 중 항목이 추가되면 다시 저장)"""
+        with open(self.run_dir / "metadata.json", "w", encoding="utf-8") as f:
+            json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+
+    def _check_stable_blocks(self) -> None:
+        """cache 레이아웃 고정 블록의 추정 토큰 수를 metadata.json의 stable_block_tokens에 기록
+
+        고정 블록(정체성 + 응답 형식 + 리마인더)은 기본 페르소나로 약 200~400 토큰이라
+        Anthropic의 최소 캐시 길이(min_cache_tokens)에 못 미치고, 그러면 cache_control을
+        붙여도 캐시가 생기지 않는다. 그런 에이전트가 있으면 알린다 (Ollama의 접두사 KV 재사용은
+        길이 제한이 없어 그대로 효과가 있다).
+        """
+        tokens = {}
+        short = []
+        for agent in self.agents:
+            prompt = self._build_agent_context(agent, session=False)
+            tokens[agent.id] = estimate_prompt_tokens(prompt.system)
+            adapter = self.adapters.get(agent.id)
+            minimum = getattr(adapter.unwrap(), "min_cache_tokens", None) if adapter is not None else None
+            if minimum and tokens[agent.id] < minimum:
+                short.append(agent.id)
+
+        self.metadata["stable_block_tokens"] = {"min": min(tokens.values()), "max": max(tokens.values())}
+        self._write_metadata()
+        if short:
+            print(
+                f"[!] cache 레이아웃: 에이전트 {len(short)}명의 고정 블록(추정 {max(tokens[a] for a in short)}토큰 이하)이 "
+                f"최소 캐시 길이보다 짧아 프롬프트 캐시가 생기지 않습니다 (페르소나를 늘려야 적용)"
+            )
+
+    def _warm_up_models(self) -> None:
+        """ollama.warm_up: 서로 다른 (서버, 모델)마다 모델을 미리 올리고 keep_alive로 고정
+
+        num_ctx가 auto면 가장 긴 초기 프롬프트를 넉넉한 창(probe_num_ctx)으로 한 번 평가해
+        추정 토큰 대비 실제 토큰 비율을 재고, 이 비율로 환산한 프롬프트 예산 상한(에너지가 가장
+        높은 구간, 초기 프롬프트가 더 길면 그 토큰 수) × headroom + 최대 출력 토큰을 256 단위로
+        올린 값을 쓴다. 초기 프롬프트는 역사/사건 섹션이 비어 있어 런 중 프롬프트보다 짧다.
+        num_ctx가 바뀌면 Ollama가 모델을 다시 올리므로 최종 설정으로 한 번 더 예열해
+        런 중에는 다시 올리지 않게 한다. 세션 모드는 대화 기록이 창을 채우므로 auto를 적용하지 않는다.
+        결과(로드/프롬프트 평가 시간, num_ctx)는 metadata.json의 warm_up에 기록한다.
+        """
+        ollama_config = self.config.get("ollama", {}) or {}
+        warm_up_config = ollama_config.get("warm_up", {}) or {}
+        if not warm_up_config.get("enabled"):
+            return
+
+        groups: dict[tuple[str, str], list[tuple[Agent, BaseLLMAdapter]]] = {}
+        for agent in self.agents:
+            adapter = self.adapters.get(agent.id)
+            if adapter is None or adapter.provider != "ollama":
+                continue
+            # 라우터를 쓰면 서버별 복제본 모두
+            replicas = getattr(adapter, "replicas", None)
+            for inner in (replicas.values() if replicas else [adapter.unwrap()]):
+                groups.setdefault((inner.base_url, inner.model), []).append((agent, inner))
+
+        keep_alive = warm_up_config.get("keep_alive", -1)
+        headroom = warm_up_config.get("num_ctx_headroom", 1.5)
+        max_output = (
+            max({**OUTPUT_TOKEN_BUDGET, **(self.output_token_budget or {})}.values())
+            if self.enforce_budget else 1000
+        )
+
+        prompt_ceiling = max(PROMPT_TOKEN_BUDGET.values())
+
+        results = []
+        for (base_url, model), members in groups.items():
+            prompt = max(
+                (str(self._build_agent_context(agent)) for agent, _ in members),
+                key=estimate_prompt_tokens,
+            )
+            lead = members[0][1]
+            entry = {"model": model, "base_url": base_url, "agents": len(members), "keep_alive": keep_alive}
+
+            auto = ollama_config.get("num_ctx") == "auto"
+            if auto and lead.chat_session is not None:
+                entry["num_ctx_auto"] = "skipped (session)"
+            elif auto:
+                lead.num_ctx = warm_up_config.get("probe_num_ctx", 8192)
+                lead.keep_alive = keep_alive
+                probe = lead.warm_up(prompt)
+                entry["probe"] = probe
+                measured = probe.get("prompt_eval_count")
+                if measured:
+                    entry["prompt_tokens"] = measured
+                    ratio = measured / max(1, estimate_prompt_tokens(prompt))
+                    ceiling = max(measured, int(prompt_ceiling * ratio))
+                    entry["prompt_ceiling_tokens"] = ceiling
+                    entry["num_ctx"] = -(-int(ceiling * headroom + max_output) // 256) * 256
+                else:
+                    lead.num_ctx = None
+
+            for _, inner in members:
+                inner.keep_alive = keep_alive
+                if "num_ctx" in entry:
+                    inner.num_ctx = entry["num_ctx"]
+            entry.setdefault("num_ctx", lead.num_ctx)
+            entry.update(lead.warm_up(prompt))
+            results.append(entry)
+            self._pinned_adapters.append(lead)
+
+        # 예열용 렌더링이 남긴 세션 델타 기준 초기화
+        self._session_read_sets.clear()
+        self.metadata["warm_up"] = results
+        self._write_metadata()
+
+    def release_models(self) -> None:
+        """예열 때 고정한 모델의 keep_alive를 ollama.warm_up.release_keep_alive로 되돌림"""
+        if not self._pinned_adapters:
+            return
+        release_keep_alive = self.config["ollama"]["warm_up"].get("release_keep_alive", "5m")
+        for adapter in self._pinned_adapters:
+            adapter.release(release_keep_alive)
+        self._pinned_adapters = []
 
     def _load_config(self, config_path: str) -> dict:
         """설정 파일 로드"""
@@ -160,8 +388,45 @@ class Simulation:
         default_adapter = self.config.get("default_adapter", "mock")
         default_model = self.config.get("default_model", "mock")
 
+        # LLM 응답 캐시 (settings.yaml의 cache.enabled)
+        cache_config = self.config.get("cache", {})
+        self.response_cache: Optional[ResponseCache] = None
+        if cache_config.get("enabled"):
+            self.response_cache = ResponseCache(
+                path=cache_config.get("path", "cache/llm_responses.sqlite"),
+                max_entries=cache_config.get("max_entries", 50000),
+                max_bytes=cache_config.get("max_bytes"),
+            )
+
+        # 프로바이더별 동시성/속도 제한과 재시도 (settings.yaml의 request_scheduler)
+        scheduler_config = self.config.get("request_scheduler", {})
+        self.request_scheduler: Optional[RequestScheduler] = None
+        if scheduler_config.get("enabled"):
+            self.request_scheduler = RequestScheduler.from_config(scheduler_config)
+
+        # 헤지 요청: 최근 지연의 percentile을 넘긴 요청을 한 번 더 보내 먼저 온 응답 사용
+        hedging_config = self.config.get("hedging", {})
+        self.latency_tracker: Optional[LatencyTracker] = None
+        if hedging_config.get("enabled"):
+            self.latency_tracker = LatencyTracker(window=hedging_config.get("window", 200))
+
+        # 스트리밍 생성 + JSON 결정 객체 완성 시 조기 종료 (mock은 무시)
+        self.stream_stats: Optional[StreamStats] = None
+        if self.config.get("streaming", {}).get("enabled"):
+            self.stream_stats = StreamStats()
+
+        # 모든 어댑터가 공유하는 커넥션 풀 크기
+        pool_config = self.config.get("connection_pool", {})
+        if pool_config.get("size"):
+            get_client_pool().configure(pool_size=pool_config["size"])
+
         # 어댑터별 글로벌 설정
         ollama_config = self.config.get("ollama", {})
+
+        # 여러 Ollama 서버: 요청마다 가장 한가한 서버로 (ollama.endpoints가 있으면 base_url 대신)
+        self.ollama_router: Optional[OllamaRouter] = None
+        if ollama_config.get("endpoints"):
+            self.ollama_router = OllamaRouter.from_config(ollama_config)
         anthropic_config = self.config.get("anthropic", {})
         google_config = self.config.get("google", {})
 
@@ -177,6 +442,14 @@ class Simulation:
                     "base_url": ollama_config.get("base_url", "http://localhost:11434"),
                     "timeout": ollama_config.get("timeout", 60),
                 }
+                if ollama_config.get("keep_alive") is not None:
+                    extra_kwargs["keep_alive"] = ollama_config["keep_alive"]
+                if isinstance(ollama_config.get("num_ctx"), int):
+                    extra_kwargs["num_ctx"] = ollama_config["num_ctx"]
+                session_config = ollama_config.get("session", {})
+                if session_config.get("enabled"):
+                    extra_kwargs["session"] = True
+                    extra_kwargs["session_max_turns"] = session_config.get("max_turns", 20)
             elif adapter_type == "anthropic":
                 if anthropic_config.get("api_key"):
                     extra_kwargs["api_key"] = anthropic_config["api_key"]
@@ -186,56 +459,199 @@ class Simulation:
                 if google_config.get("api_key"):
                     extra_kwargs["api_key"] = google_config["api_key"]
 
-            self.adapters[agent_id] = create_adapter(
-                adapter_type,
-                model=model,
-                persona=agent_config.get("persona", "citizen"),
-                agent_id=agent_id,
-                **extra_kwargs,
+            if self.stream_stats is not None:
+                extra_kwargs["stream"] = True
+                extra_kwargs["stream_stats"] = self.stream_stats
+
+            if adapter_type == "ollama" and self.ollama_router is not None:
+                adapter = RoutedAdapter(
+                    self.ollama_router,
+                    model=model,
+                    persona=agent_config.get("persona", "citizen"),
+                    agent_id=agent_id,
+                    **extra_kwargs,
+                )
+            else:
+                adapter = create_adapter(
+                    adapter_type,
+                    model=model,
+                    persona=agent_config.get("persona", "citizen"),
+                    agent_id=agent_id,
+                    **extra_kwargs,
+                )
+
+            # 헤지는 중복 요청을 보낼 다른 서버가 있는 상태 없는 어댑터에만
+            # (스케줄러 안쪽: 재시도/속도 제한은 논리 요청 단위)
+            if (
+                self.latency_tracker is not None
+                and isinstance(adapter, RoutedAdapter)
+                and len(self.ollama_router.endpoints) > 1
+                and adapter.speculative_safe
+            ):
+                adapter = HedgingAdapter(
+                    adapter,
+                    self.latency_tracker,
+                    percentile=hedging_config.get("percentile", 95),
+                    min_samples=hedging_config.get("min_samples", 20),
+                    min_delay=hedging_config.get("min_delay", 0.5),
+                )
+
+            # 요청 스케줄러는 네트워크를 쓰는 어댑터에만 (캐시 hit는 제한에 걸리지 않도록 캐시 안쪽)
+            if self.request_scheduler is not None and adapter.provider != "mock":
+                adapter = ScheduledAdapter(adapter, self.request_scheduler)
+
+            # 응답 캐시: 프롬프트만으로 응답이 정해지는 어댑터에만 적용 (mock 제외)
+            if self.response_cache is not None and adapter.speculative_safe:
+                adapter = CachingAdapter(adapter, self.response_cache)
+
+            self.adapters[agent_id] = adapter
+
+    def _init_cassette(self) -> None:
+        """cassette.mode에 따라 어댑터를 녹화/재생 어댑터로 교체
+
+        record: 모든 응답(인터뷰 포함)을 run_dir/cassette.jsonl에 기록
+        replay: cassette.path의 기록으로 응답 (LLM 서버/API 키 불필요)
+        """
+        cassette_config = self.config.get("cassette", {}) or {}
+        self.cassette_mode = cassette_config.get("mode") or "off"
+        self.cassette: Optional[Cassette] = None
+        # 에이전트별 녹화 래퍼 (대체 어댑터의 응답도 같은 트랙에 기록)
+        self._recorders: dict[str, RecordingAdapter] = {}
+        if self.cassette_mode == "off":
+            return
+
+        if self.cassette_mode == "record":
+            self.cassette = Cassette(
+                cassette_config.get("path") or self.run_dir / "cassette.jsonl",
+                store_prompts=cassette_config.get("store_prompts", True),
+            )
+            for agent_id, adapter in self.adapters.items():
+                self._recorders[agent_id] = create_adapter(
+                    "record", inner=adapter, cassette=self.cassette, agent_id=agent_id,
+                )
+                self.adapters[agent_id] = self._recorders[agent_id]
+        elif self.cassette_mode == "replay":
+            if not cassette_config.get("path"):
+                raise ValueError("cassette.path is required for replay mode")
+            self.cassette = Cassette(cassette_config["path"])
+            for agent_id, adapter in self.adapters.items():
+                self.adapters[agent_id] = create_adapter(
+                    "replay",
+                    model=adapter.model,
+                    cassette=self.cassette,
+                    agent_id=agent_id,
+                    strict=cassette_config.get("strict", False),
+                )
+        else:
+            raise ValueError(f"Unknown cassette mode: {self.cassette_mode}")
+
+    def _init_decision_mode(self) -> None:
+        """two_phase면 프롬프트를 쓰는 어댑터를 2단계 결정 래퍼로 감싼다
+
+        가장 바깥에 두므로 단계별 호출이 각각 캐시/스케줄러/카세트를 거친다.
+        """
+        if self.decision_mode != "two_phase":
+            return
+        for agent_id, adapter in self.adapters.items():
+            if adapter.needs_prompt:
+                self.adapters[agent_id] = TwoPhaseAdapter(
+                    adapter,
+                    action_max_tokens=self.decision_config.get("action_max_tokens", 64),
+                    content_max_tokens=self.decision_config.get("content_max_tokens", 200),
+                    reasoning_tokens=self.decision_config.get("reasoning_tokens", 0),
+                )
+
+    def _init_fallback_adapters(self) -> None:
+        """데드라인을 놓친 턴을 결정할 에이전트별 대체 어댑터 (기본은 mock 규칙)
+
+        fallback은 "mock" 또는 {"adapter": ..., "model": ...} (작고 빠른 모델). 대체 어댑터는
+        캐시/스케줄러/2단계 래퍼 없이 바로 호출한다.
+
+        대체 여부는 타이밍에 달렸으므로 mock 대체 정책은 전역 random 대신 (시드, 에이전트)로
+        시드한 별도 RNG를 써서 이후 턴 순서/결정의 난수 흐름을 바꾸지 않는다. 녹화 중에는 대체
+        결정도 그 에이전트의 카세트 트랙에 기록하고, 재생 중에는 기록된 응답이 바로 나오므로
+        데드라인을 적용하지 않는다.
+        """
+        self.fallback_adapters: dict[str, BaseLLMAdapter] = {}
+        if not (self.turn_deadline or self.epoch_deadline) or self.cassette_mode == "replay":
+            return
+
+        fallback = self.deadline_config.get("fallback", "mock")
+        if isinstance(fallback, str):
+            fallback = {"adapter": fallback}
+        kwargs = {k: v for k, v in fallback.items() if k not in ("adapter", "model")}
+        if fallback["adapter"] == "ollama":
+            ollama_config = self.config.get("ollama", {})
+            kwargs.setdefault("base_url", ollama_config.get("base_url", "http://localhost:11434"))
+            kwargs.setdefault("timeout", ollama_config.get("timeout", 60))
+
+        for agent in self.agents:
+            if agent.id not in self.adapters:
+                continue
+            if fallback["adapter"] == "mock":
+                kwargs["rng"] = random.Random(
+                    f"{self.random_seed}:{agent.id}" if self.random_seed is not None else None
+                )
+            adapter = create_adapter(
+                fallback["adapter"],
+                model=fallback.get("model", "mock"),
+                persona=agent.persona,
+                agent_id=agent.id,
+                **kwargs,
             )
+            recorder = self._recorders.get(agent.id)
+            self.fallback_adapters[agent.id] = recorder.sibling(adapter) if recorder else adapter
 
     def get_alive_agents(self) -> list[Agent]:
-        """생존 에이전트 목록"""
-        return [agent for agent in self.agents if agent.is_alive]
+        """생존 에이전트 목록 (설정 순서의 새 리스트)"""
+        return self.population.alive_agents()
 
     def get_agents_in_location(self, location: str) -> list[Agent]:
         """특정 위치의 생존 에이전트 목록"""
-        return [agent for agent in self.get_alive_agents() if agent.location == location]
+        return self.population.agents_in(location)
 
     def calculate_decay(self, epoch: int) -> int:
         """에폭별 decay 계산"""
         acceleration = math.floor(epoch / 10) * self.decay_acceleration
         return int(self.base_decay + acceleration)
 
-    def run(self, callback=None) -> None:
-        """시뮬레이션 실행"""
+    def run(self, callback=None, release_models: bool = True) -> None:
+        """시뮬레이션 실행 (release_models=False면 인터뷰 등을 위해 예열한 모델을 계속 고정)"""
         print(f"=== Agora-12 시뮬레이션 시작 (Phase 3) ===")
         print(f"총 에폭: {self.total_epochs}")
         print(f"에이전트 수: {len(self.agents)}")
         print(f"랜덤 시드: {self.random_seed}")
         print(f"페르소나 배정: {self.persona_assignment}")
+        print(f"턴 스케줄링: {self.scheduling}")
         if self.persona_assignment == "random":
             print(f"페르소나 매핑:")
             for agent_id, persona in self.persona_map.items():
                 print(f"  {agent_id} -> {persona}")
         print()
 
-        for epoch in range(1, self.total_epochs + 1):
-            self.run_epoch(epoch)
-
-            if callback:
-                callback(epoch, self)
-
-            if not self.get_alive_agents():
-                print(f"\n[!] 모든 에이전트 사망. 시뮬레이션 종료.")
-                break
-
+        try:
+            for epoch in range(1, self.total_epochs + 1):
+                self.run_epoch(epoch)
+
+                if callback:
+                    callback(epoch, self)
+
+                if not self.population.alive_count:
+                    print(f"\n[!] 모든 에이전트 사망. 시뮬레이션 종료.")
+                    break
+        finally:
+            # 중간에 예외/중단이 나도 이벤트 루프를 닫고 고정한 모델을 풀어준다
+            self._close_loop()
+            if release_models:
+                self.release_models()
         print(f"\n=== 시뮬레이션 완료 ===")
+        self._write_performance_report()
         self._print_final_summary()
 
     def run_epoch(self, epoch: int) -> None:
         """단일 에폭 실행"""
         self.env.current_epoch = epoch
+        self._epoch_started = time.perf_counter()
         self.logger.reset_turn_counter()
         self.transaction_count = 0
         self.notable_events = []
@@ -264,8 +680,18 @@ class Simulation:
         alive_agents = self.get_alive_agents()
         random.shuffle(alive_agents)
 
-        for agent in alive_agents:
-            self._execute_agent_turn(agent, epoch)
+        self._turn_marks = []
+        try:
+            if self.scheduling == "simultaneous":
+                self._run_simultaneous_turns(alive_agents, epoch)
+            elif self.scheduling == "pipelined":
+                self._run_async(self._run_pipelined_turns(alive_agents, epoch))
+            else:
+                for index, agent in enumerate(alive_agents):
+                    self._begin_turn(index)
+                    self._execute_agent_turn(agent, epoch)
+        finally:
+            self._log_horizon = None
 
         # 4. 시장 에너지 풀 분배
         self._distribute_market_pool(epoch)
@@ -285,8 +711,8 @@ class Simulation:
         self._log_epoch_summary(epoch)
 
         # 콘솔 출력
-        alive_count = len(self.get_alive_agents())
-        total_energy = sum(a.energy for a in self.get_alive_agents())
+        alive_count = self.population.alive_count
+        total_energy = self.population.total_energy
         crisis_str = f" [CRISIS: {crisis_event.name}]" if crisis_event else ""
         print(f"Epoch {epoch:3d} | 생존: {alive_count:2d} | 에너지: {total_energy:5d} | Treasury: {self.treasury.balance:4d}{crisis_str}")
 
@@ -298,26 +724,24 @@ class Simulation:
     def _check_deaths(self, epoch: int) -> list[str]:
         """사망한 에이전트 확인 및 처리"""
         dead = []
-        for agent in self.agents:
-            if not agent.alive:  # Check alive, not is_alive (which includes energy check)
-                continue
-            if agent.energy <= 0:
-                agent.alive = False
-                dead.append(agent.id)
-                self.history_engine.record_death(epoch, agent.id)
-                self.logger.log_action(
-                    epoch=epoch,
-                    agent_id=agent.id,
-                    persona=agent.persona,
-                    location=agent.location,
-                    action_type="death",
-                    target=None,
-                    content="에너지 고갈로 사망",
-                    resources_before={"energy": 0, "influence": agent.influence},
-                    resources_after={"energy": 0, "influence": agent.influence},
-                    success=True,
-                    extra={"thought": "..."},
-                )
+        # alive 플래그가 남은 채 에너지가 바닥난 에이전트만 (설정 순서)
+        for agent in self.population.exhausted_agents():
+            agent.alive = False
+            dead.append(agent.id)
+            self.history_engine.record_death(epoch, agent.id)
+            self.logger.log_action(
+                epoch=epoch,
+                agent_id=agent.id,
+                persona=agent.persona,
+                location=agent.location,
+                action_type="death",
+                target=None,
+                content="에너지 고갈로 사망",
+                resources_before={"energy": 0, "influence": agent.influence},
+                resources_after={"energy": 0, "influence": agent.influence},
+                success=True,
+                extra={"thought": "..."},
+            )
         return dead
 
     def _distribute_market_pool(self, epoch: int) -> None:
@@ -340,28 +764,269 @@ class Simulation:
         # LLM을 통한 행동 결정
         adapter = self.adapters.get(agent.id)
         if adapter:
-            gini = calculate_gini_coefficient([a.energy for a in self.get_alive_agents()])
-            context = build_context(
-                agent=agent,
-                env=self.env,
-                support_tracker=self.support_tracker,
-                history_engine=self.history_engine,
-                influence_system=self.influence_system,
-                crisis_system=self.crisis_system,
-                alive_agents=self.get_alive_agents(),
-                recent_logs=self.recent_logs,
-                gini_coefficient=gini,
-                language=self.language,
-            )
-
-            response = adapter.generate(context)
+            observation = self._observe(agent)
+            self._note_dispatch(adapter)
+            if self._has_deadline(adapter):
+                response, source = self._run_async(self._adecide_within(agent, adapter, observation))
+            elif adapter.prefers_async:
+                # 헤지 등: 진 요청을 취소할 수 있도록 시뮬레이션 이벤트 루프에서 결정
+                response = self._run_async(adapter.adecide(observation, **self._decision_kwargs_for(agent)))
+                source = None
+            else:
+                response = adapter.decide(observation, **self._decision_kwargs_for(agent))
+                source = None
             action = response.to_action_dict()
             thought = response.thought
+            extra = self._decision_extra(agent, adapter, observation, response, source)
         else:
             action = {"type": "idle"}
             thought = "어댑터 없음"
+            extra = None
+
+        self._apply_agent_action(agent, action, thought, epoch, resources_before, extra)
 
-        # 행동 실행
+    def _decision_kwargs_for(self, agent: Agent) -> dict:
+        """결정 호출 인자 (토큰 예산 모드면 에너지 구간별 출력 max_tokens 포함)"""
+        if not self.enforce_budget:
+            return self._decision_kwargs
+        return {
+            **self._decision_kwargs,
+            "max_tokens": get_output_tokens(agent.energy, self.output_token_budget),
+        }
+
+    def _decision_extra(
+        self,
+        agent: Agent,
+        adapter: BaseLLMAdapter,
+        observation: Observation,
+        response: LLMResponse,
+        source: Optional[dict],
+    ) -> dict:
+        """결정 집계 후 로그에 붙일 값 (토큰 사용량 + 데드라인 모드면 decision_source)"""
+        fallback = source is not None and source["decision_source"] == "fallback"
+        self._record_decision(self.fallback_adapters[agent.id] if fallback else adapter, response)
+        return {**self._token_usage(observation, response), **(source or {})}
+
+    # ------------------------------------------------------------
+    # 턴/에폭 데드라인과 대체 정책
+    # ------------------------------------------------------------
+
+    def _has_deadline(self, adapter: BaseLLMAdapter) -> bool:
+        """데드라인을 적용할 어댑터인지 (I/O 없는 규칙 기반 어댑터는 제외)"""
+        return bool(self.fallback_adapters) and adapter.needs_prompt
+
+    def _deadline_remaining(self) -> tuple[Optional[float], str]:
+        """이번 결정에 남은 시간과 더 빠듯한 쪽 (turn | epoch)"""
+        remaining, kind = self.turn_deadline, "turn"
+        if self.epoch_deadline and self._epoch_started is not None:
+            epoch_left = self._epoch_started + self.epoch_deadline - time.perf_counter()
+            if remaining is None or epoch_left < remaining:
+                remaining, kind = max(0.0, epoch_left), "epoch"
+        return remaining, kind
+
+    async def _adecide_within(
+        self,
+        agent: Agent,
+        adapter: BaseLLMAdapter,
+        observation: Observation,
+        task: Optional[asyncio.Future] = None,
+    ) -> tuple[LLMResponse, dict]:
+        """데드라인 안에 결정. 놓치면 요청을 취소하고 대체 어댑터로 결정
+
+        task를 주면(파이프라인 모드의 투기 실행, 동시 모드의 세마포어 대기) 그 결과를 기다린다.
+        에폭 예산이 이미 바닥났으면 요청을 보내지 않고 바로 대체 정책을 쓴다.
+        """
+        timeout, kind = self._deadline_remaining()
+        if task is None and (timeout is None or timeout > 0):
+            task = asyncio.ensure_future(adapter.adecide(observation, **self._decision_kwargs_for(agent)))
+        if task is not None:
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if done:
+                return task.result(), {"decision_source": "primary"}
+            task.cancel()
+
+        self._count_deadline_miss(adapter, kind)
+        response = await self._afallback_decide(agent, adapter, observation)
+        return response, {"decision_source": "fallback", "deadline_missed": kind}
+
+    async def _afallback_decide(
+        self, agent: Agent, adapter: BaseLLMAdapter, observation: Observation
+    ) -> LLMResponse:
+        """대체 어댑터로 결정 (세션 모드는 취소된 턴이 기록에 없으므로 다음 턴을 전체 컨텍스트로)"""
+        chat_session = getattr(adapter, "chat_session", None)
+        if chat_session is not None:
+            chat_session.reset()
+            self._session_read_sets.pop(agent.id, None)
+
+        fallback = self.fallback_adapters[agent.id]
+        if not fallback.needs_prompt:
+            return fallback.decide(observation)
+        if chat_session is not None:
+            # 세션 델타 프롬프트 대신 전체 컨텍스트
+            observation = replace(
+                observation, render=lambda: self._build_agent_context(agent, session=False)
+            )
+        return await fallback.adecide(observation, **self._decision_kwargs_for(agent))
+
+    def _count_deadline_miss(self, adapter: BaseLLMAdapter, kind: str) -> None:
+        """데드라인을 놓친 턴 집계 (에폭 요약과 performance.json의 deadline)"""
+        counts = Counter({"fallbacks": 1, f"{kind}_misses": 1})
+        self._deadline_stats.update(counts)
+        self._deadline_totals.update(counts)
+        self._deadline_models.setdefault(f"{adapter.name}:{adapter.model}", Counter()).update(counts)
+
+    def get_deadline_report(self) -> dict:
+        """데드라인 설정과 놓친 턴 수 (전체, 모델별)"""
+        return {
+            "turn_seconds": self.turn_deadline,
+            "epoch_seconds": self.epoch_deadline,
+            "fallback": self.deadline_config.get("fallback", "mock"),
+            "fallbacks": self._deadline_totals["fallbacks"],
+            "turn_misses": self._deadline_totals["turn_misses"],
+            "epoch_misses": self._deadline_totals["epoch_misses"],
+            "models": {key: dict(counts) for key, counts in self._deadline_models.items()},
+        }
+
+    def _token_usage(self, observation: Observation, response: LLMResponse) -> dict:
+        """턴별 프롬프트/응답 크기 (프로바이더와 무관하게 비교하도록 같은 추정기 사용)
+
+        프롬프트를 렌더링하지 않은 결정(규칙 기반 어댑터)은 prompt_tokens를 남기지 않는다.
+        2단계 결정은 단계별 출력 토큰(phase_tokens)과 소요 시간(phase_ms)도 남긴다.
+        """
+        usage = {}
+        if observation.rendered:
+            usage["prompt_tokens"] = estimate_prompt_tokens(observation.prompt)
+
+        phases = (response.raw_response or {}).get("phases")
+        if phases:
+            phase_tokens = {name: estimate_prompt_tokens(p["text"]) for name, p in phases.items()}
+            usage["completion_tokens"] = sum(phase_tokens.values())
+            usage["phase_tokens"] = phase_tokens
+            usage["phase_ms"] = {name: p["ms"] for name, p in phases.items()}
+        else:
+            phase_tokens = None
+            usage["completion_tokens"] = estimate_prompt_tokens(response_text(response))
+
+        if observation.rendered:
+            self._count_decision(phase_tokens or {"single": usage["completion_tokens"]})
+        return usage
+
+    def _count_decision(self, phase_tokens: dict[str, int]) -> None:
+        """단계별 호출 수/출력 토큰 집계 (에폭 요약과 performance.json의 decisions)"""
+        counts = Counter({"decisions": 1})
+        for phase, tokens in phase_tokens.items():
+            counts[f"{phase}_calls"] += 1
+            counts[f"{phase}_completion_tokens"] += tokens
+        self._decision_stats.update(counts)
+        self._decision_totals.update(counts)
+
+    def _observe(
+        self,
+        agent: Agent,
+        alive_agents: Optional[list[Agent]] = None,
+        gini: Optional[float] = None,
+        read_set: Optional[dict] = None,
+        log_horizon: Optional[int] = None,
+    ) -> Observation:
+        """에이전트 관측 생성
+
+        프롬프트가 필요한 어댑터는 지금 상태로 바로 렌더링한다 (파이프라인 모드의 read_set,
+        세션 델타, 동시 모드의 스냅샷이 렌더링 시점에 고정되어야 하므로). needs_prompt가
+        False인 어댑터는 구조화된 필드만 읽으므로 렌더링을 건너뛴다.
+        log_horizon을 주지 않으면 진행 중인 턴의 최근 사건 범위를 쓴다.
+        """
+        # 스냅샷이 없으면 같은 위치의 생존자만 색인에서 꺼낸다 (전체 목록은 렌더링할 때만)
+        observation = build_observation(
+            agent=agent,
+            env=self.env,
+            crisis_system=self.crisis_system,
+            alive_agents=alive_agents if alive_agents is not None else self.get_agents_in_location(agent.location),
+            language=self.language,
+            render=lambda: self._build_agent_context(agent, alive_agents, gini, read_set, log_horizon=log_horizon),
+        )
+        adapter = self.adapters.get(agent.id)
+        if adapter is None or adapter.needs_prompt:
+            observation.prompt  # 지금 렌더링해 캐시
+        return observation
+
+    def _build_agent_context(
+        self,
+        agent: Agent,
+        alive_agents: Optional[list[Agent]] = None,
+        gini: Optional[float] = None,
+        read_set: Optional[dict] = None,
+        session: bool = True,
+        log_horizon: Optional[int] = None,
+    ) -> str:
+        """에이전트 프롬프트 생성 (alive_agents/gini를 주면 해당 스냅샷 기준, session=False면 델타 없이 전체)"""
+        chat_session = getattr(self.adapters.get(agent.id), "chat_session", None) if session else None
+        if chat_session is not None and read_set is None:
+            read_set = {}
+
+        context = self.context_builder.build(
+            agent,
+            self._visible_logs(log_horizon if log_horizon is not None else self._log_horizon),
+            alive_agents=alive_agents,
+            gini=gini,
+            language=self.language,
+            read_set=read_set,
+            layout=self.context_layout,
+            enforce_budget=self.enforce_budget,
+        )
+        if chat_session is not None:
+            return self._session_prompt(agent, chat_session, context, read_set)
+        return context
+
+    def _begin_turn(self, index: int) -> Optional[int]:
+        """에폭의 index번째 턴 시작: 시작 시점 로그 수를 기록하고 이 턴의 최근 사건 범위를 정함"""
+        self._turn_marks.append(self._log_count)
+        self._log_horizon = self._turn_horizon(index)
+        return self._log_horizon
+
+    def _turn_horizon(self, index: int) -> Optional[int]:
+        """index번째 턴이 볼 수 있는 로그 수 (event_lag 턴 전 시작 시점, 지연이 없으면 None)
+
+        기준 턴이 아직 시작하지 않았으면(투기 실행) 지금까지의 로그 전부로 본다.
+        """
+        if not self.event_lag or index - self.event_lag >= len(self._turn_marks):
+            return None
+        return self._turn_marks[max(0, index - self.event_lag)]
+
+    def _visible_logs(self, horizon: Optional[int]) -> list[dict]:
+        """horizon 이후에 추가된 로그를 뺀 recent_logs"""
+        if horizon is None or horizon >= self._log_count:
+            return self.recent_logs
+        return self.recent_logs[:max(0, len(self.recent_logs) - (self._log_count - horizon))]
+
+    def _session_prompt(self, agent: Agent, chat_session, context: str, read_set: dict) -> str:
+        """세션 모드: 새 세션이면 전체 컨텍스트, 아니면 모델이 마지막으로 받은 read_set 대비 델타
+
+        지난 요청이 (재시도 끝에) 실패했으면 세션 턴 수가 그대로이고 기록에도 없으므로,
+        그 요청의 read_set이 아니라 그 전에 전달된 read_set을 기준으로 한다.
+        """
+        previous = None
+        entry = self._session_read_sets.get(agent.id)
+        if entry is not None:
+            sent, turns, delivered = entry
+            previous = sent if chat_session.turns > turns else delivered
+        if previous is None or chat_session.needs_full_context:
+            chat_session.reset()
+            previous = None
+        else:
+            context = build_delta_context(agent, previous, read_set, self.language)
+        self._session_read_sets[agent.id] = (read_set, chat_session.turns, previous)
+        return context
+
+    def _apply_agent_action(
+        self,
+        agent: Agent,
+        action: dict,
+        thought: str,
+        epoch: int,
+        resources_before: dict,
+        extra: Optional[dict] = None,
+    ) -> None:
+        """결정된 행동 실행 및 로깅"""
         success, extra_info = self._execute_action(agent, action, epoch)
 
         resources_after = agent.get_resources()
@@ -380,6 +1045,7 @@ class Simulation:
             "success": success,
         }
         self.recent_logs.append(log_entry)
+        self._log_count += 1
         if len(self.recent_logs) > 50:
             self.recent_logs = self.recent_logs[-50:]
 
@@ -394,9 +1060,330 @@ class Simulation:
             resources_before=resources_before,
             resources_after=resources_after,
             success=success,
-            extra={"thought": thought, **extra_info},
+            extra={
+                "thought": thought,
+                # 건축가 스킬 인자 (카세트를 로그에서 다시 만들 때 필요)
+                **{key: action[key] for key in EXTRA_ACTION_FIELDS if key in action},
+                **extra_info,
+                **(extra or {}),
+            },
         )
 
+    # ------------------------------------------------------------
+    # 동시 결정 모드 (simultaneous)
+    # ------------------------------------------------------------
+
+    def _run_simultaneous_turns(self, ordered_agents: list[Agent], epoch: int) -> None:
+        """동시 결정 모드: 같은 스냅샷에서 모든 결정을 병렬 요청한 뒤 순서대로 해석
+
+        1. 모든 생존 에이전트의 컨텍스트를 에폭 시작 시점의 같은 스냅샷으로 생성
+        2. LLM 호출을 한꺼번에 보내고 모두 응답할 때까지 대기
+        3. ordered_agents(시드 셔플 순서)대로 행동을 해석. 충돌 규칙:
+           - 해석 시점에 행위자가 죽어 있으면 행동 무효 (actor_dead)
+           - 대상 사망/위치 변경/에너지 부족은 기존 행동 검증이 그대로 실패 처리
+             (target_dead, different_location, target_not_available, insufficient_energy)
+        """
+        alive_agents = list(ordered_agents)
+        gini = self.population.gini()
+        observations = {
+            agent.id: self._observe(agent, alive_agents, gini)
+            for agent in alive_agents
+            if agent.id in self.adapters
+        }
+
+        responses = self._run_async(self._gather_decisions(alive_agents, observations))
+
+        for order, agent in enumerate(ordered_agents, 1):
+            resources_before = agent.get_resources()
+            response, source = responses.get(agent.id, (None, None))
+            extra = {"resolution_order": order}
+            if response is not None:
+                action = response.to_action_dict()
+                thought = response.thought
+                extra.update(self._decision_extra(
+                    agent, self.adapters[agent.id], observations[agent.id], response, source,
+                ))
+            else:
+                action = {"type": "idle"}
+                thought = "어댑터 없음"
+
+            if not agent.is_alive:
+                extra["error"] = "actor_dead"
+                action = {"type": "idle"}
+
+            self._apply_agent_action(agent, action, thought, epoch, resources_before, extra)
+
+    async def _gather_decisions(
+        self, agents: list[Agent], observations: dict[str, Observation]
+    ) -> dict[str, tuple[LLMResponse, Optional[dict]]]:
+        """관측이 있는 에이전트들의 LLM 호출을 동시에 실행 (에이전트별 (응답, decision_source))"""
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+
+        async def call(agent: Agent) -> LLMResponse:
+            adapter = self.adapters[agent.id]
+            if semaphore:
+                async with semaphore:
+                    return await adapter.adecide(observations[agent.id], **self._decision_kwargs_for(agent))
+            return await adapter.adecide(observations[agent.id], **self._decision_kwargs_for(agent))
+
+        async def decide(agent: Agent) -> tuple[LLMResponse, Optional[dict]]:
+            adapter = self.adapters[agent.id]
+            try:
+                if self._has_deadline(adapter):
+                    # 세마포어 대기도 데드라인에 포함
+                    return await self._adecide_within(
+                        agent, adapter, observations[agent.id], asyncio.ensure_future(call(agent)),
+                    )
+                return await call(agent), None
+            except Exception as e:
+                return LLMResponse(
+                    thought=f"어댑터 오류: {str(e)}",
+                    action="idle",
+                    raw_response={"error": str(e)},
+                    success=False,
+                    error=str(e),
+                ), None
+
+        targets = [agent for agent in agents if agent.id in observations]
+        if self.model_affinity:
+            targets = self._affinity_order(targets)
+        for agent in targets:
+            self._note_dispatch(self.adapters[agent.id])
+        results = await asyncio.gather(*[decide(agent) for agent in targets])
+        return {agent.id: result for agent, result in zip(targets, results)}
+
+    @staticmethod
+    def _model_key(adapter: BaseLLMAdapter) -> tuple[str, str]:
+        return adapter.provider, adapter.model
+
+    def _affinity_order(self, agents: list[Agent]) -> list[Agent]:
+        """요청 발송 순서를 모델별로 묶음 (묶음 안은 기존 순서 유지)
+
+        직전에 요청을 보낸 모델(아직 올라가 있을 가능성이 큰 모델)의 묶음을 먼저,
+        나머지는 처음 등장한 순서대로 보낸다. 프롬프트를 쓰지 않는 어댑터(mock)는 I/O가 없고
+        전역 random을 쓰므로 맨 앞에서 기존 순서 그대로 결정한다.
+        """
+        def key(agent: Agent) -> tuple[str, str]:
+            adapter = self.adapters[agent.id]
+            return self._model_key(adapter) if adapter.needs_prompt else ("", "")
+
+        rank: dict[tuple[str, str], int] = {("", ""): -2}
+        for agent in agents:
+            rank.setdefault(key(agent), len(rank))
+        for provider, model in self._last_dispatched_model.items():
+            if (provider, model) in rank:
+                rank[(provider, model)] = -1
+        return sorted(agents, key=lambda agent: rank[key(agent)])
+
+    def _note_dispatch(self, adapter: BaseLLMAdapter) -> None:
+        """요청 발송 순서대로 프로바이더별 모델 전환 횟수 집계 (프롬프트를 쓰지 않는 mock 제외)"""
+        if not adapter.needs_prompt:
+            return
+        provider, model = self._model_key(adapter)
+        previous = self._last_dispatched_model.get(provider)
+        self._last_dispatched_model[provider] = model
+        self._epoch_dispatches[provider] += 1
+        if previous is not None and previous != model:
+            self._epoch_model_switches[provider] += 1
+            self._model_switch_totals[provider] += 1
+
+    def get_model_switch_report(self) -> dict:
+        """프로바이더별 누적 모델 전환 횟수"""
+        return {
+            provider: self._model_switch_totals[provider]
+            for provider in sorted(self._last_dispatched_model)
+        }
+
+    # ------------------------------------------------------------
+    # 투기적 파이프라인 모드 (pipelined)
+    # ------------------------------------------------------------
+
+    async def _run_pipelined_turns(self, ordered_agents: list[Agent], epoch: int) -> None:
+        """sequential과 같은 순서/결과를 유지하면서 다음 턴 LLM 호출을 미리 실행
+
+        현재 턴의 LLM 호출이 진행되는 동안 뒤따르는 speculation_depth명의 프롬프트를
+        현재 상태로 만들어 호출을 시작한다. 실제 차례가 되면 프롬프트를 다시 만들고,
+        build_context가 기록한 read_set(자기 자원, 같은 위치 에이전트, 게시판, 지지 기록,
+        최근 로그 구간, 역사 요약, 마을 현황)이 투기 시점과 같을 때만 결과를 재사용한다.
+        겹친 턴이 남긴 로그가 보이면 read_set의 recent_logs가 달라져 그 턴만 다시 호출한다.
+        event_lag >= speculation_depth를 설정하면 그 로그가 양쪽 프롬프트에서 모두 빠져 hit이 늘어난다.
+        speculative_safe가 아닌 어댑터(mock 등)는 투기 실행하지 않는다.
+        """
+        pending: dict[int, tuple[dict, asyncio.Task]] = {}
+
+        try:
+            for index, agent in enumerate(ordered_agents):
+                self._begin_turn(index)
+                resources_before = agent.get_resources()
+                adapter = self.adapters.get(agent.id)
+
+                if adapter is None:
+                    self._apply_agent_action(
+                        agent, {"type": "idle"}, "어댑터 없음", epoch, resources_before
+                    )
+                    continue
+
+                read_set: dict = {}
+                observation = self._observe(agent, read_set=read_set)
+                task = self._take_speculation(pending.pop(index, None), read_set)
+                if task is None:
+                    self._note_dispatch(adapter)
+                    task = asyncio.ensure_future(
+                        adapter.adecide(observation, **self._decision_kwargs_for(agent))
+                    )
+
+                # 현재 호출이 진행되는 동안 다음 턴들을 미리 시작
+                for ahead in range(index + 1, min(index + 1 + self.speculation_depth, len(ordered_agents))):
+                    if ahead in pending:
+                        continue
+                    next_agent = ordered_agents[ahead]
+                    next_adapter = self.adapters.get(next_agent.id)
+                    if next_adapter is None or not next_adapter.speculative_safe:
+                        continue
+                    if self.model_affinity and self._model_key(next_adapter) != self._model_key(adapter):
+                        continue
+                    spec_read_set: dict = {}
+                    spec_observation = self._observe(
+                        next_agent, read_set=spec_read_set, log_horizon=self._turn_horizon(ahead)
+                    )
+                    self._note_dispatch(next_adapter)
+                    pending[ahead] = (
+                        spec_read_set,
+                        asyncio.ensure_future(
+                            next_adapter.adecide(spec_observation, **self._decision_kwargs_for(next_agent))
+                        ),
+                    )
+
+                if self._has_deadline(adapter):
+                    response, source = await self._adecide_within(agent, adapter, observation, task)
+                else:
+                    response, source = await task, None
+                self._apply_agent_action(
+                    agent, response.to_action_dict(), response.thought, epoch, resources_before,
+                    self._decision_extra(agent, adapter, observation, response, source),
+                )
+        finally:
+            for _, task in pending.values():
+                task.cancel()
+
+    def _take_speculation(
+        self, speculation: Optional[tuple[dict, asyncio.Task]], read_set: dict
+    ) -> Optional[asyncio.Task]:
+        """투기 실행 결과 채택 여부 판단 (read_set이 같으면 hit)"""
+        if speculation is None:
+            return None
+
+        spec_read_set, task = speculation
+        if spec_read_set == read_set:
+            self.speculation_stats["hits"] += 1
+            return task
+
+        self.speculation_stats["misses"] += 1
+        for key, value in read_set.items():
+            if spec_read_set.get(key) != value:
+                self.speculation_stats["miss_reasons"][key] += 1
+        task.cancel()
+        return None
+
+    def get_speculation_report(self) -> dict:
+        """투기 실행 hit/miss 통계"""
+        hits = self.speculation_stats["hits"]
+        misses = self.speculation_stats["misses"]
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "miss_reasons": dict(self.speculation_stats["miss_reasons"]),
+        }
+
+    def _record_decision(self, adapter: BaseLLMAdapter, response: LLMResponse) -> None:
+        """모델별 호출/파싱 실패/기타 오류 집계 (구조화 출력 효과 측정용)"""
+        stats = self.parse_stats.setdefault(f"{adapter.name}:{adapter.model}", Counter())
+        stats["calls"] += 1
+        if response.parse_failed:
+            stats["parse_failures"] += 1
+        elif not response.success:
+            stats["errors"] += 1
+
+    def get_parse_report(self) -> dict:
+        """모델별 파싱 실패율"""
+        report = {}
+        for key, stats in self.parse_stats.items():
+            calls = stats["calls"]
+            report[key] = {
+                "calls": calls,
+                "parse_failures": stats["parse_failures"],
+                "parse_failure_rate": round(stats["parse_failures"] / calls, 4) if calls else 0.0,
+                "errors": stats["errors"],
+            }
+        return report
+
+    def get_prompt_cache_report(self) -> dict:
+        """에이전트별 프롬프트 캐시 usage (Anthropic처럼 usage를 주는 어댑터만)"""
+        report = {}
+        for agent_id, adapter in self.adapters.items():
+            prompt_cache = getattr(adapter, "prompt_cache", None)
+            if prompt_cache is not None and prompt_cache.calls:
+                report[agent_id] = prompt_cache.stats()
+        return report
+
+    def _write_performance_report(self) -> None:
+        """실행 성능 통계를 run_dir/performance.json에 저장"""
+        report = {
+            "scheduling": self.scheduling,
+            "client_pool": get_client_pool().stats(),
+            "structured_output": self.structured_output,
+            "parse": self.get_parse_report(),
+        }
+        if self.scheduling == "pipelined":
+            report["speculation"] = self.get_speculation_report()
+        if self.response_cache is not None:
+            report["response_cache"] = self.response_cache.stats()
+        if self.stream_stats is not None:
+            report["streaming"] = self.stream_stats.stats()
+        if self.request_scheduler is not None:
+            report["request_scheduler"] = self.request_scheduler.stats()
+        if self.ollama_router is not None:
+            report["ollama_router"] = self.ollama_router.stats()
+        if self.latency_tracker is not None:
+            report["hedging"] = self.latency_tracker.stats()
+        model_switches = self.get_model_switch_report()
+        if model_switches:
+            report["model_switches"] = {"model_affinity": self.model_affinity, **model_switches}
+        if self.cassette is not None:
+            report["cassette"] = {"mode": self.cassette_mode, **self.cassette.stats()}
+        chat_session = self.get_chat_session_report()
+        if chat_session:
+            report["chat_session"] = chat_session
+        prompt_cache = self.get_prompt_cache_report()
+        if prompt_cache:
+            report["prompt_cache"] = prompt_cache
+        if self._decision_totals:
+            report["decisions"] = {"mode": self.decision_mode, **self._decision_totals}
+        if self.fallback_adapters:
+            report["deadline"] = self.get_deadline_report()
+        if self.context_builder.builds:
+            report["context_builder"] = self.context_builder.stats()
+
+        with open(self.run_dir / "performance.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    def _run_async(self, coro):
+        """시뮬레이션 전용 이벤트 루프에서 코루틴 실행 (런 동안 루프 재사용)"""
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+
+    def _close_loop(self) -> None:
+        """이벤트 루프 정리 (이 루프에 묶인 풀의 async 클라이언트를 먼저 닫음)"""
+        if self._loop is not None and not self._loop.is_closed():
+            try:
+                self._loop.run_until_complete(get_client_pool().aclose_loop_clients())
+            finally:
+                self._loop.close()
+        self._loop = None
+
     def _execute_action(self, agent: Agent, action: dict, epoch: int) -> tuple[bool, dict]:
         """행동 실행"""
         action_type = action["type"]
@@ -509,8 +1496,8 @@ class Simulation:
 
         self.support_tracker.add(epoch, agent.id, target.id)
 
-        # 상호 지지 체크 및 기록
-        if agent.id in self.support_tracker.get_supporters(target.id):
+        # 상호 지지 체크 및 기록 (상대가 이전에 나를 지지한 적이 있을 때)
+        if self.support_tracker.has_supported(target.id, agent.id):
             self.history_engine.record_auto(
                 epoch, "mutual_support",
                 agent_a=agent.id, agent_b=target.id
@@ -598,20 +1585,68 @@ class Simulation:
 
     def _log_epoch_summary(self, epoch: int) -> None:
         """에폭 요약 로그"""
-        alive = self.get_alive_agents()
-        energies = [a.energy for a in alive]
-
         self.logger.log_epoch_summary(
             epoch=epoch,
-            alive_agents=len(alive),
-            total_energy=sum(energies),
-            gini_coefficient=calculate_gini_coefficient(energies),
+            alive_agents=self.population.alive_count,
+            total_energy=self.population.total_energy,
+            gini_coefficient=self.population.gini(),
             transaction_count=self.transaction_count,
             billboard_active=self.env.get_active_billboard(),
             treasury=self.treasury.balance,
             notable_events=self.notable_events,
+            extra=self._epoch_performance_extra(),
         )
 
+    def _epoch_performance_extra(self) -> Optional[dict]:
+        """에폭 요약에 붙일 성능 지표 (speculation은 누적값, chat_session은 이번 에폭 값)"""
+        extra = {}
+        if self.scheduling == "pipelined":
+            report = self.get_speculation_report()
+            extra["speculation"] = {k: report[k] for k in ("hits", "misses", "hit_rate")}
+
+        totals = self.get_chat_session_report().get("total")
+        if totals:
+            previous = self._session_totals_prev
+            extra["chat_session"] = {
+                key: round(value - previous.get(key, 0), 1) for key, value in totals.items()
+            }
+            self._session_totals_prev = totals
+
+        if self._epoch_dispatches:
+            extra["model_switches"] = {
+                provider: self._epoch_model_switches[provider] for provider in sorted(self._epoch_dispatches)
+            }
+            self._epoch_dispatches = Counter()
+            self._epoch_model_switches = Counter()
+
+        if self._decision_stats:
+            extra["decisions"] = {
+                **self._decision_stats,
+                "wall_clock_s": round(time.perf_counter() - self._epoch_started, 3),
+            }
+            self._decision_stats = Counter()
+
+        if self.fallback_adapters:
+            extra["deadline"] = {
+                key: self._deadline_stats[key] for key in ("fallbacks", "turn_misses", "epoch_misses")
+            }
+            self._deadline_stats = Counter()
+        return extra or None
+
+    def get_chat_session_report(self) -> dict:
+        """세션 모드 어댑터의 에이전트별/전체 프롬프트 평가 통계"""
+        per_agent = {}
+        for agent_id, adapter in self.adapters.items():
+            chat_session = getattr(adapter, "chat_session", None)
+            if chat_session is not None:
+                per_agent[agent_id] = chat_session.stats()
+        if not per_agent:
+            return {}
+        total = Counter()
+        for stats in per_agent.values():
+            total.update(stats)
+        return {"total": dict(total), "agents": per_agent}
+
     def _print_final_summary(self) -> None:
         """최종 결과 출력"""
         alive = self.get_alive_agents()
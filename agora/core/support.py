@@ -1,5 +1,12 @@
-"""Support 추적 시스템"""
+"""Support 추적 시스템
 
+기록은 계속 쌓이므로 조회가 전체 기록을 훑지 않도록 에이전트별 색인을 함께 갱신한다.
+  - 받은/준 지지 목록 (기록 순서, last_n은 끝에서 자르기)
+  - 받은/준 상대 집합 (상호 지지/미보답 계산, 지지 여부 O(1) 확인)
+  - 받은 지지의 지지자별 횟수 Counter (top supporters)
+"""
+
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Optional
@@ -21,6 +28,13 @@ class SupportTracker:
         self.records: list[SupportRecord] = []
         self._epoch_supports: dict[int, list[SupportRecord]] = {}  # epoch별 캐시
 
+        # 에이전트별 색인 (add()에서만 갱신)
+        self._supporters: dict[str, list[str]] = {}       # receiver -> giver 목록
+        self._supported: dict[str, list[str]] = {}        # giver -> receiver 목록
+        self._supporter_set: dict[str, set[str]] = {}
+        self._supported_set: dict[str, set[str]] = {}
+        self._supporter_counts: dict[str, Counter] = {}
+
     def add(self, epoch: int, giver_id: str, receiver_id: str) -> SupportRecord:
         """지지 기록 추가"""
         record = SupportRecord(
@@ -34,21 +48,31 @@ class SupportTracker:
             self._epoch_supports[epoch] = []
         self._epoch_supports[epoch].append(record)
 
+        self._supporters.setdefault(receiver_id, []).append(giver_id)
+        self._supported.setdefault(giver_id, []).append(receiver_id)
+        self._supporter_set.setdefault(receiver_id, set()).add(giver_id)
+        self._supported_set.setdefault(giver_id, set()).add(receiver_id)
+        self._supporter_counts.setdefault(receiver_id, Counter())[giver_id] += 1
+
         return record
 
+    def has_supported(self, giver_id: str, receiver_id: str) -> bool:
+        """giver가 receiver를 한 번이라도 지지했는지"""
+        return receiver_id in self._supported_set.get(giver_id, ())
+
     def get_supporters(self, agent_id: str, last_n: Optional[int] = None) -> list[str]:
         """해당 에이전트를 지지한 에이전트 목록"""
-        supporters = [r.giver_id for r in self.records if r.receiver_id == agent_id]
+        supporters = self._supporters.get(agent_id, [])
         if last_n:
             return supporters[-last_n:]
-        return supporters
+        return list(supporters)
 
     def get_supported(self, agent_id: str, last_n: Optional[int] = None) -> list[str]:
         """해당 에이전트가 지지한 에이전트 목록"""
-        supported = [r.receiver_id for r in self.records if r.giver_id == agent_id]
+        supported = self._supported.get(agent_id, [])
         if last_n:
             return supported[-last_n:]
-        return supported
+        return list(supported)
 
     def get_epoch_supports(self, epoch: int) -> list[SupportRecord]:
         """특정 에폭의 모든 지지 기록"""
@@ -59,33 +83,29 @@ class SupportTracker:
         if epoch is not None:
             return len([r for r in self.get_epoch_supports(epoch)
                        if r.receiver_id == agent_id])
-        return len([r for r in self.records if r.receiver_id == agent_id])
+        return len(self._supporters.get(agent_id, ()))
 
     def count_supports_given(self, agent_id: str, epoch: Optional[int] = None) -> int:
         """준 지지 횟수"""
         if epoch is not None:
             return len([r for r in self.get_epoch_supports(epoch)
                        if r.giver_id == agent_id])
-        return len([r for r in self.records if r.giver_id == agent_id])
+        return len(self._supported.get(agent_id, ()))
 
     def get_mutual_supporters(self, agent_id: str) -> list[str]:
         """상호 지지 관계인 에이전트 목록"""
-        my_supporters = set(self.get_supporters(agent_id))
-        i_supported = set(self.get_supported(agent_id))
-        return list(my_supporters & i_supported)
+        return list(self._supporter_set.get(agent_id, set()) & self._supported_set.get(agent_id, set()))
 
     def get_top_supporters(self, agent_id: str, limit: int = 3) -> list[str]:
         """나를 가장 많이 지지한 에이전트 (지지 횟수 기준)"""
-        from collections import Counter
-        supporters = [r.giver_id for r in self.records if r.receiver_id == agent_id]
-        counter = Counter(supporters)
+        counter = self._supporter_counts.get(agent_id)
+        if not counter:
+            return []
         return [agent for agent, _ in counter.most_common(limit)]
 
     def get_unreturned_support(self, agent_id: str) -> list[str]:
         """내가 지지했지만 아직 보답받지 못한 에이전트"""
-        i_supported = set(self.get_supported(agent_id))
-        my_supporters = set(self.get_supporters(agent_id))
-        return list(i_supported - my_supporters)
+        return list(self._supported_set.get(agent_id, set()) - self._supporter_set.get(agent_id, set()))
 
     def get_support_context(self, agent_id: str, last_n: int = 5, language: str = "ko") -> str:
         """프롬프트용 지지 관계 컨텍스트 (확장)"""
@@ -103,7 +103,8 @@ def main():
             sys.exit(1)
 
     else:  # spectator mode
-        sim.run()
+        # 인터뷰까지 예열한 모델을 고정해 두고 끝난 뒤 되돌린다
+        sim.run(release_models=args.no_interview)
 
     # 사후 인터뷰 (기본: 자동 실행, --no-interview로 생략 가능)
     if not args.no_interview:
@@ -124,6 +125,8 @@ def main():
         generate_report(results, str(report_path))
         print(f"📄 리포트 생성: {report_path}")
 
+    sim.release_models()
+
 
 if __name__ == "__main__":
     main()
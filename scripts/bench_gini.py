@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+지니 계수 벤치마크: calculate_gini_coefficient(매번 정렬) vs InequalityTracker(펜윅 트리).
+
+시뮬레이션은 턴마다 에너지 몇 개를 바꾸고 지니 계수를 한 번 읽는다. 턴 하나(에너지 1개 변경 +
+지니 계산)의 비용을 N = 12, 1k, 100k에서 재고, 에폭(N턴) 비용으로 환산한다.
+
+    python scripts/bench_gini.py
+    python scripts/bench_gini.py --sizes 12 1000 10000 100000 --turns 200
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.core.inequality import InequalityTracker
+from agora.core.logger import calculate_gini_coefficient
+
+
+MAX_ENERGY = 200
+
+
+def bench_sorted(energies: list[int], changes: list[tuple[int, int]]) -> tuple[float, float]:
+    energies = list(energies)
+    started = time.perf_counter()
+    gini = 0.0
+    for index, value in changes:
+        energies[index] = value
+        gini = calculate_gini_coefficient(energies)
+    return (time.perf_counter() - started) / len(changes), gini
+
+
+def bench_tracker(energies: list[int], changes: list[tuple[int, int]]) -> tuple[float, float]:
+    energies = list(energies)
+    tracker = InequalityTracker(MAX_ENERGY)
+    for value in energies:
+        tracker.add(value)
+    started = time.perf_counter()
+    gini = 0.0
+    for index, value in changes:
+        tracker.update(energies[index], value)
+        energies[index] = value
+        gini = tracker.gini()
+    return (time.perf_counter() - started) / len(changes), gini
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental Gini against sorting")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 1000, 100000])
+    parser.add_argument("--turns", type=int, default=500, help="턴 수 (큰 N의 정렬 방식은 자동으로 줄임)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'agents':>8}{'sort µs/turn':>15}{'tracker µs/turn':>17}{'speedup':>10}{'sort s/epoch':>15}{'tracker s/epoch':>17}")
+    for n in args.sizes:
+        energies = [rng.randint(0, MAX_ENERGY) for _ in range(n)]
+        turns = max(5, min(args.turns, 2_000_000 // n))
+        changes = [(rng.randrange(n), rng.randint(0, MAX_ENERGY)) for _ in range(turns)]
+
+        sorted_s, sorted_gini = bench_sorted(energies, changes[:turns])
+        tracker_s, tracker_gini = bench_tracker(energies, changes[:turns])
+        assert sorted_gini == tracker_gini, (sorted_gini, tracker_gini)
+
+        print(
+            f"{n:>8}{sorted_s * 1e6:>15.1f}{tracker_s * 1e6:>17.2f}{sorted_s / tracker_s:>9.1f}x"
+            f"{sorted_s * n:>15.3f}{tracker_s * n:>17.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
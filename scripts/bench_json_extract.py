@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+JSON 추출기 벤치마크: 예전 정규식 vs 단일 패스 스캐너 + 국소 수리.
+
+data/*_simulation_log.jsonl의 실제 thought/content 문자열로 모델 출력을 재구성하고
+(깨끗한 JSON, 코드 펜스+산문, 값 안의 중괄호, 후행 쉼표, 작은따옴표, 잘린 출력)
+변형별 파싱 성공률과 호출당 시간을 비교한다.
+
+    python scripts/bench_json_extract.py
+    python scripts/bench_json_extract.py --limit 2000 --repeat 3
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.adapters.jsonparse import extract_json_object
+
+
+def regex_extract(text: str):
+    """parse_response가 예전에 쓰던 방식"""
+    match = re.search(r'\{[^{}]*\}', text, re.DOTALL)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group())
+    except json.JSONDecodeError:
+        return None
+
+
+def load_entries(data_dir: Path, limit: int) -> list[dict]:
+    entries = []
+    for path in sorted(data_dir.glob("*_simulation_log.jsonl")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry.get("thought") and entry.get("action_type"):
+                    entries.append(entry)
+                if len(entries) >= limit:
+                    return entries
+    return entries
+
+
+def decision(entry: dict) -> dict:
+    return {
+        "thought": entry["thought"],
+        "action": entry["action_type"],
+        "target": entry.get("target"),
+        "content": entry.get("content"),
+    }
+
+
+def variants(entry: dict) -> dict[str, str]:
+    data = decision(entry)
+    clean = json.dumps(data, ensure_ascii=False)
+    braced = dict(data, thought=data["thought"] + " {plan: trade first}")
+    single = "{" + ", ".join(
+        f"'{k}': " + ("None" if v is None else "'" + str(v).replace("'", "\\'") + "'")
+        for k, v in data.items()
+    ) + "}"
+    return {
+        "clean": clean,
+        "fenced": f"Here is my decision:\n```json\n{json.dumps(data, ensure_ascii=False, indent=2)}\n```\nI hope this helps.",
+        "nested_braces": json.dumps(braced, ensure_ascii=False),
+        "trailing_comma": clean[:-1] + ",}",
+        "single_quotes": single,
+        "truncated": clean[: max(len(clean) - 12, clean.index('"action"') + 20)],
+    }
+
+
+def bench(fn, texts: list[str], expected: list[str], repeat: int) -> tuple[float, float]:
+    ok = 0
+    for text, action in zip(texts, expected):
+        result = fn(text)
+        if isinstance(result, tuple):
+            result = result[0]
+        if result is not None and result.get("action") == action:
+            ok += 1
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    elapsed = time.perf_counter() - started
+    return ok / len(texts), elapsed / (repeat * len(texts)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON extraction on logged outputs")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    entries = load_entries(Path(args.data_dir), args.limit)
+    if not entries:
+        print(f"{args.data_dir}에 simulation_log가 없습니다")
+        return
+
+    samples = [variants(e) for e in entries]
+    expected = [e["action_type"] for e in entries]
+    print(f"샘플 {len(entries)}개 (data/*_simulation_log.jsonl)\n")
+    print(f"{'variant':<16}{'regex ok':>10}{'regex µs':>10}{'new ok':>10}{'new µs':>10}")
+
+    for name in samples[0]:
+        texts = [s[name] for s in samples]
+        regex_ok, regex_us = bench(regex_extract, texts, expected, args.repeat)
+        new_ok, new_us = bench(extract_json_object, texts, expected, args.repeat)
+        print(f"{name:<16}{regex_ok:>10.1%}{regex_us:>10.1f}{new_ok:>10.1%}{new_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+카세트 없이 남은 예전 런(logs/<run_id>/simulation_log.jsonl)으로 재생용 카세트를 만드는 스크립트.
+
+    python scripts/make_cassette_from_logs.py logs/mistral-7b_en_20260203-190004
+    python scripts/make_cassette_from_logs.py --all
+
+생성된 cassette.jsonl을 settings.yaml의 cassette.path로 지정하고 mode: replay로 실행하면
+LLM 서버 없이 런을 다시 돌릴 수 있다. 로그에는 프롬프트가 없으므로 divergence 검사는 생략된다.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.adapters.cassette import cassette_from_simulation_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build replay cassettes from simulation logs")
+    parser.add_argument("run_dirs", nargs="*", help="Run directories under logs/")
+    parser.add_argument("--all", action="store_true", help="Process every run under logs/")
+    parser.add_argument("--overwrite", action="store_true", help="Replace existing cassette.jsonl")
+    args = parser.parse_args()
+
+    run_dirs = [Path(d) for d in args.run_dirs]
+    if args.all:
+        run_dirs = sorted(p.parent for p in Path("logs").glob("*/simulation_log.jsonl"))
+
+    if not run_dirs:
+        parser.error("run directory or --all required")
+
+    for run_dir in run_dirs:
+        log_path = run_dir / "simulation_log.jsonl"
+        cassette_path = run_dir / "cassette.jsonl"
+        if not log_path.exists():
+            print(f"[skip] {run_dir}: simulation_log.jsonl 없음")
+            continue
+        if cassette_path.exists() and not args.overwrite:
+            print(f"[skip] {run_dir}: cassette.jsonl 이미 존재 (--overwrite로 재생성)")
+            continue
+
+        count = cassette_from_simulation_log(log_path, cassette_path)
+        print(f"[ok] {cassette_path}: {count} responses")
+
+
+if __name__ == "__main__":
+    main()
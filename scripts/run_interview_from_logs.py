@@ -16,6 +16,8 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from agora.adapters.ollama import OllamaAdapter
+from agora.adapters.cache import CachingAdapter, ResponseCache
+from agora.adapters.cassette import Cassette, RecordingAdapter, ReplayAdapter
 from agora.core.personas import get_persona_prompt
 
 
@@ -164,6 +166,9 @@ def main():
     parser.add_argument("--output", default="reports", help="Output directory")
     parser.add_argument("--survivors-only", action="store_true", help="Interview only survivors")
     parser.add_argument("--model", default="mistral:latest", help="Ollama model to use")
+    parser.add_argument("--cache", help="LLM response cache (SQLite) path to reuse answers")
+    parser.add_argument("--record", help="Record every answer to this cassette (JSONL)")
+    parser.add_argument("--replay", help="Answer from this cassette instead of calling Ollama")
     args = parser.parse_args()
 
     print("=== Agora-12 Post-Game Interview (from logs) ===\n")
@@ -186,6 +191,11 @@ def main():
     # 어댑터 생성
     print(f"Initializing Ollama adapter ({args.model})...")
     adapter = OllamaAdapter(model=args.model)
+    if args.cache:
+        adapter = CachingAdapter(adapter, ResponseCache(path=args.cache))
+    cassette = None
+    if args.record or args.replay:
+        cassette = Cassette(args.record or args.replay)
 
     # 에이전트 복원 및 인터뷰
     results = {
@@ -216,7 +226,13 @@ def main():
         )
 
         print(f"\nInterviewing {agent_id} ({agent.persona})...")
-        interview = run_interview(agent, history, adapter, total_epochs)
+        # 카세트 트랙은 에이전트별로 나뉜다
+        agent_adapter = adapter
+        if args.replay:
+            agent_adapter = ReplayAdapter(model=args.model, cassette=cassette, agent_id=agent_id)
+        elif args.record:
+            agent_adapter = RecordingAdapter(adapter, cassette, agent_id=agent_id)
+        interview = run_interview(agent, history, agent_adapter, total_epochs)
 
         results["agents"].append({
             "agent_id": agent_id,
@@ -239,6 +255,11 @@ def main():
     print(f"\n=== Interview Complete ===")
     print(f"Results saved to: {output_path}")
     print(f"Interviewed {len(results['agents'])} agents")
+    if args.cache:
+        print(f"Cache: {adapter.cache.stats()}")
+    if cassette is not None:
+        cassette.close()
+        print(f"Cassette: {cassette.stats()}")
 
     # 요약 출력
     print("\n=== Quick Summary ===")
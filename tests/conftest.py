@@ -0,0 +1,161 @@
+"""테스트 공용 픽스처: 설정 기반 시뮬레이션 생성, 결정론적 어댑터, Ollama 서버 대역"""
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import yaml
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agora.adapters import BaseLLMAdapter, LLMResponse
+from agora.core.simulation import Simulation
+
+
+class HashAdapter(BaseLLMAdapter):
+    """프롬프트 해시로만 행동을 정하는 결정론적 어댑터 (speculative_safe)"""
+
+    ACTIONS = ["trade", "move", "support", "speak", "idle", "idle"]
+    TARGETS = ["plaza", "market", "alley_a", "citizen_01", "merchant_01", "influencer_01"]
+
+    def generate(self, prompt: str, max_tokens: int = 1000, response_schema=None) -> LLMResponse:
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        return LLMResponse(
+            thought="hash",
+            action=self.ACTIONS[digest[0] % len(self.ACTIONS)],
+            target=self.TARGETS[digest[1] % len(self.TARGETS)],
+            content="...",
+        )
+
+
+class OllamaServer:
+    """Ollama 대역: /api/tags, /api/ps, /api/generate
+
+    생성은 OLLAMA_NUM_PARALLEL=1처럼 한 번에 하나씩 delay초 걸린다. failing이면 500.
+    """
+
+    def __init__(self, models=("mock:latest",), running=(), delay=0.0):
+        self.models = list(models)
+        self.running = list(running)
+        self.delay = delay
+        self.failing = False
+        self.generated = 0
+        self._lock = threading.Lock()
+        self._slot = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status, body=None):
+                data = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._reply(200, {"models": [{"name": m} for m in server.models]})
+                elif self.path == "/api/ps":
+                    self._reply(200, {"models": [{"name": m} for m in server.running]})
+                else:
+                    self._reply(404)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if server.failing:
+                    self._reply(500)
+                    return
+                with server._slot:
+                    time.sleep(server.delay)
+                with server._lock:
+                    server.generated += 1
+                self._reply(200, {"response": '{"thought": "ok", "action": "idle"}', "done": True})
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True,
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def make_simulation(monkeypatch):
+    """기본 설정(mock 어댑터) + simulation 섹션/최상위 설정 덮어쓰기로 시뮬레이션을 만드는 함수
+
+    make_simulation(path, config_overrides=None, **sim_overrides): path에 설정을 쓰고 cwd를 옮긴다.
+    """
+    def make(tmp_path, config_overrides=None, **sim_overrides) -> Simulation:
+        with open(ROOT / "config" / "settings.yaml", encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+        config["simulation"].update({"random_seed": 42, "total_epochs": 5})
+        config["simulation"].update(sim_overrides)
+        config.update(config_overrides or {})
+
+        tmp_path.mkdir(parents=True, exist_ok=True)
+        config_path = tmp_path / "settings.yaml"
+        with open(config_path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(config, f, allow_unicode=True)
+
+        monkeypatch.chdir(tmp_path)
+        sim = Simulation(config_path=str(config_path))
+        # 여러 시뮬레이션을 만들며 cwd가 바뀌어도 로그를 읽을 수 있도록 절대 경로로 고정
+        sim.run_dir = tmp_path / sim.run_dir
+        return sim
+
+    return make
+
+
+@pytest.fixture
+def read_actions():
+    """로그에서 (epoch, agent, action, target, success, energy) 목록을 뽑는 함수"""
+    def read(sim: Simulation) -> list[tuple]:
+        rows = []
+        with open(sim.run_dir / "simulation_log.jsonl", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                rows.append((
+                    entry["epoch"], entry["agent_id"], entry["action_type"],
+                    entry["target"], entry["success"], entry["resources_after"]["energy"],
+                ))
+        return rows
+
+    return read
+
+
+@pytest.fixture
+def hash_adapter():
+    """HashAdapter 클래스 (테스트에서 상속해 호출을 기록)"""
+    return HashAdapter
+
+
+@pytest.fixture
+def use_hash_adapters():
+    """시뮬레이션의 모든 어댑터를 HashAdapter로 바꾸는 함수"""
+    def use(sim: Simulation) -> None:
+        sim.adapters = {agent.id: HashAdapter(model="hash") for agent in sim.agents}
+
+    return use
+
+
+@pytest.fixture
+def ollama_server():
+    """OllamaServer 클래스 (with 문으로 띄우는 Ollama 대역)"""
+    return OllamaServer
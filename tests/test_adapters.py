@@ -0,0 +1,658 @@
+"""LLM 어댑터 테스트"""
+
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.adapters import (
+    BaseLLMAdapter, LLMResponse, MockAdapter, OllamaAdapter, ClientPool,
+    CachingAdapter, ResponseCache, make_cache_key, StreamingJSONExtractor, StreamStats,
+    AnthropicAdapter, ACTION_SCHEMA, extract_json_object, LayeredPrompt, Observation,
+    TwoPhaseAdapter, ACTION_ONLY_SCHEMA, CONTENT_SCHEMA, get_client_pool, OpenAIAdapter,
+    Cassette, RecordingAdapter, GoogleAdapter,
+)
+from agora.adapters import google as google_adapter
+from agora.core.budget import estimate_prompt_tokens
+from agora.adapters.schema import to_gemini_schema, to_openai_schema
+
+
+class EchoAdapter(BaseLLMAdapter):
+    """동기 generate만 구현한 테스트용 어댑터"""
+
+    def __init__(self, model: str = "echo", **kwargs):
+        super().__init__(model, **kwargs)
+        self.calls = 0
+
+    def generate(self, prompt: str, max_tokens: int = 1000, response_schema=None) -> LLMResponse:
+        self.calls += 1
+        return LLMResponse(thought=prompt, action="idle", raw_response={"max_tokens": max_tokens})
+
+
+class TestAsyncGenerate:
+    """agenerate() 테스트"""
+
+    def test_base_falls_back_to_thread(self):
+        adapter = EchoAdapter(model="echo")
+        response = asyncio.run(adapter.agenerate("hello", max_tokens=7))
+        assert response.thought == "hello"
+        assert response.raw_response["max_tokens"] == 7
+
+    def test_concurrent_calls(self):
+        adapter = EchoAdapter(model="echo")
+
+        async def run_all():
+            return await asyncio.gather(*[adapter.agenerate(f"p{i}") for i in range(5)])
+
+        responses = asyncio.run(run_all())
+        assert [r.thought for r in responses] == [f"p{i}" for i in range(5)]
+
+    def test_mock_async_matches_sync(self):
+        adapter = MockAdapter(persona="citizen", agent_id="citizen_01")
+        prompt = "에너지: 120/200\n위치: plaza\nspeak trade support move"
+
+        random.seed(7)
+        sync_result = [adapter.generate(prompt).to_action_dict() for _ in range(5)]
+        random.seed(7)
+        async_result = [asyncio.run(adapter.agenerate(prompt)).to_action_dict() for _ in range(5)]
+        assert sync_result == async_result
+
+    def test_ollama_async_connection_error(self):
+        adapter = OllamaAdapter(base_url="http://127.0.0.1:9", timeout=2)
+        response = asyncio.run(adapter.agenerate("hello"))
+        assert not response.success
+        assert response.action == "idle"
+
+
+class TestClientPool:
+    """클라이언트 풀 테스트"""
+
+    def test_same_key_reuses_client(self):
+        pool = ClientPool()
+        first = pool.get("anthropic", object, api_key="k1")
+        assert pool.get("anthropic", object, api_key="k1") is first
+        assert pool.get("anthropic", object, api_key="k2") is not first
+        assert pool.stats()["created"] == 2
+        assert pool.stats()["reused"] == 1
+
+    def test_session_per_base_url(self):
+        pool = ClientPool(pool_size=4)
+        session = pool.session("http://localhost:11434")
+        assert pool.session("http://localhost:11434") is session
+        assert pool.session("http://other:11434") is not session
+        assert session.get_adapter("http://localhost:11434")._pool_maxsize == 4
+
+    def test_ollama_adapters_share_session(self):
+        first = OllamaAdapter(base_url="http://127.0.0.1:9")
+        second = OllamaAdapter(base_url="http://127.0.0.1:9")
+        assert first._session() is second._session()
+
+    def test_async_clients_are_per_loop(self):
+        pool = ClientPool()
+
+        async def fetch():
+            return pool.get_async("ollama", object, base_url="http://x")
+
+        async def fetch_twice():
+            return await fetch(), await fetch()
+
+        first, again = asyncio.run(fetch_twice())
+        assert first is again
+        assert asyncio.run(fetch()) is not first
+
+    def test_loop_clients_closed(self):
+        pool = ClientPool()
+        closed = []
+
+        class AsyncClosing:
+            async def aclose(self):
+                closed.append("aclose")
+
+        class SyncClosing:
+            def close(self):
+                closed.append("close")
+
+        class GrpcLike:
+            class transport:
+                @staticmethod
+                async def close():
+                    closed.append("transport")
+
+        async def run():
+            first = pool.get_async("ollama", AsyncClosing, base_url="http://x")
+            pool.get_async("anthropic", SyncClosing, api_key="k")
+            pool.get_async("google", GrpcLike, api_key="k")
+            assert await pool.aclose_loop_clients() == 3
+            return first, pool.get_async("ollama", AsyncClosing, base_url="http://x")
+
+        first, recreated = asyncio.run(run())
+        assert sorted(closed) == ["aclose", "close", "transport"]
+        assert recreated is not first
+
+    @pytest.fixture
+    def fake_genai(self, monkeypatch):
+        """google-generativeai 대역 (has_client_slot=False면 SDK 내부 속성이 없는 버전)"""
+        glm = SimpleNamespace(
+            GenerativeServiceClient=lambda client_options: ("sync", client_options["api_key"]),
+            GenerativeServiceAsyncClient=lambda client_options: ("async", client_options["api_key"]),
+        )
+        google = types.ModuleType("google")
+        google_ai = types.ModuleType("google.ai")
+        google_ai.generativelanguage = glm
+        monkeypatch.setitem(sys.modules, "google", google)
+        monkeypatch.setitem(sys.modules, "google.ai", google_ai)
+
+        def make(has_client_slot: bool):
+            configured = []
+
+            class GenerativeModel:
+                def __init__(self, name):
+                    if has_client_slot:
+                        self._client = None
+                        self._async_client = None
+
+            return SimpleNamespace(
+                GenerativeModel=GenerativeModel,
+                configure=lambda **kwargs: configured.append(kwargs),
+                configured=configured,
+            )
+
+        return make
+
+    def test_google_pooled_client_attached(self, fake_genai):
+        genai = fake_genai(has_client_slot=True)
+        adapter = GoogleAdapter(api_key="pool-test-key")
+        first = adapter._get_model(genai)
+        assert first._client == ("sync", "pool-test-key")
+        assert adapter._get_model(genai)._client is first._client
+        assert genai.configured == []
+
+    def test_google_without_client_slot_falls_back(self, fake_genai, caplog, monkeypatch):
+        monkeypatch.setattr(google_adapter, "_fallback_warned", set())
+        genai = fake_genai(has_client_slot=False)
+        with caplog.at_level("WARNING", logger="agora.adapters.google"):
+            model = GoogleAdapter(api_key="k")._get_model(genai)
+        assert not hasattr(model, "_client")
+        assert genai.configured == [{"api_key": "k"}]
+        assert "_client" in caplog.text
+
+    def test_simulation_closes_loop_clients(self, tmp_path, make_simulation):
+        sim = make_simulation(tmp_path, total_epochs=1)
+        closed = []
+
+        class Client:
+            async def aclose(self):
+                closed.append(self)
+
+        async def open_client():
+            return get_client_pool().get_async("test", Client)
+
+        client = sim._run_async(open_client())
+        sim.run()
+        assert closed == [client]
+
+    def test_httpx_client_without_sdk_default(self):
+        httpx = pytest.importorskip("httpx")
+        pool = ClientPool(pool_size=3)
+
+        old_sdk = SimpleNamespace(DEFAULT_TIMEOUT=123.0)
+        client = pool.httpx_client(old_sdk)
+        assert isinstance(client, httpx.Client) and client.timeout.read == 123.0
+        assert isinstance(pool.httpx_client(old_sdk, asynchronous=True), httpx.AsyncClient)
+
+        new_sdk = SimpleNamespace(DefaultHttpxClient=lambda limits: ("sdk", limits.max_connections))
+        assert pool.httpx_client(new_sdk) == ("sdk", 3)
+
+
+class TestResponseCache:
+    """응답 캐시 테스트"""
+
+    def test_key_depends_on_all_inputs(self):
+        base = make_cache_key("OllamaAdapter", "mistral", "p", 1000, {"temperature": 0.7})
+        assert base == make_cache_key("OllamaAdapter", "mistral", "p", 1000, {"temperature": 0.7})
+        assert base != make_cache_key("OllamaAdapter", "mistral", "p", 500, {"temperature": 0.7})
+        assert base != make_cache_key("OllamaAdapter", "exaone", "p", 1000, {"temperature": 0.7})
+        assert base != make_cache_key("OllamaAdapter", "mistral", "p", 1000, {"temperature": 0.2})
+
+    def test_hit_skips_inner_call(self, tmp_path):
+        inner = EchoAdapter()
+        adapter = CachingAdapter(inner, ResponseCache(path=str(tmp_path / "c.sqlite")))
+
+        first = adapter.generate("hello", max_tokens=10)
+        second = adapter.generate("hello", max_tokens=10)
+        third = asyncio.run(adapter.agenerate("hello", max_tokens=10))
+
+        assert inner.calls == 1
+        assert first == second == third
+        assert adapter.cache.stats()["hits"] == 2
+        assert adapter.name == "EchoAdapter"
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "c.sqlite")
+        CachingAdapter(EchoAdapter(), ResponseCache(path=path)).generate("hello")
+
+        inner = EchoAdapter()
+        CachingAdapter(inner, ResponseCache(path=path)).generate("hello")
+        assert inner.calls == 0
+
+    def test_lru_eviction(self, tmp_path, monkeypatch):
+        # 접근 순서는 벽시계 해상도와 무관하다
+        monkeypatch.setattr(time, "time", lambda: 1000.0)
+        cache = ResponseCache(path=str(tmp_path / "c.sqlite"), max_entries=2)
+        cache.put("a", {"v": 1})
+        cache.put("b", {"v": 2})
+        cache.get("a")  # a가 최근 사용
+        cache.put("c", {"v": 3})
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert cache.stats()["evictions"] == 1
+
+    def test_lru_order_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "c.sqlite")
+        cache = ResponseCache(path=path, max_entries=2)
+        cache.put("a", {"v": 1})
+        cache.put("b", {"v": 2})
+        cache.get("a")
+        cache.close()
+
+        cache = ResponseCache(path=path, max_entries=2)
+        cache.put("c", {"v": 3})
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+
+    def test_errors_are_not_cached(self, tmp_path):
+        adapter = CachingAdapter(
+            OllamaAdapter(base_url="http://127.0.0.1:9", timeout=2),
+            ResponseCache(path=str(tmp_path / "c.sqlite")),
+        )
+        adapter.generate("hello")
+        assert len(adapter.cache) == 0
+
+
+class TestStreamingJSONExtractor:
+    """증분 JSON 추출기 테스트"""
+
+    def test_object_split_across_chunks(self):
+        extractor = StreamingJSONExtractor()
+        text = 'Sure! {"thought": "a {b} \\"c\\"", "action": "trade", "x": {"y": 1}} and more'
+        result = None
+        for i in range(0, len(text), 3):
+            result = extractor.feed(text[i:i + 3])
+            if result:
+                break
+        assert result == {"thought": 'a {b} "c"', "action": "trade", "x": {"y": 1}}
+        assert not extractor.text.endswith("more")
+
+    def test_skips_prose_braces_and_objects_without_action(self):
+        extractor = StreamingJSONExtractor()
+        assert extractor.feed('I think {maybe} ') is None
+        assert extractor.feed('{"note": 1} ') is None
+        assert extractor.feed('{"action": "idle"}') == {"action": "idle"}
+
+    def test_incomplete_object(self):
+        extractor = StreamingJSONExtractor()
+        assert extractor.feed('{"action": "trade", "thought": "{') is None
+        assert not extractor.done
+
+
+class StreamingServer:
+    """토큰 단위로 NDJSON을 천천히 흘려보내는 Ollama 대역 서버"""
+
+    def __init__(self, tokens, delay=0.02):
+        self.tokens = tokens
+        self.delay = delay
+        self.sent = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                try:
+                    for token in server.tokens:
+                        self.wfile.write((json.dumps({"response": token, "done": False}) + "\n").encode())
+                        self.wfile.flush()
+                        server.sent += 1
+                        time.sleep(server.delay)
+                    self.wfile.write((json.dumps({"response": "", "done": True}) + "\n").encode())
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True,
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestStreamingGeneration:
+    """스트리밍 생성 + 조기 종료 테스트"""
+
+    TOKENS = ['{"thought": "', "hungry", '", "action": ', '"trade"', "}"] + [" blah"] * 40
+
+    def test_ollama_stops_after_object(self):
+        stats = StreamStats()
+        with StreamingServer(self.TOKENS) as server:
+            adapter = OllamaAdapter(base_url=server.url, timeout=5, stream=True, stream_stats=stats)
+            response = adapter.generate("hi", max_tokens=200)
+            time.sleep(0.1)
+            sent = server.sent
+
+        assert response.success and response.action == "trade"
+        assert response.raw_response["stream"]["early_stop"]
+        assert sent < len(self.TOKENS)
+        assert stats.stats()["early_stops"] == 1
+        assert stats.stats()["unused_budget_tokens"] > 0
+        # 토큰 예산과 같은 추정기로 센다
+        assert stats.stats()["tokens_received"] == estimate_prompt_tokens(response.raw_response["text"])
+
+    def test_async_streaming(self):
+        with StreamingServer(self.TOKENS, delay=0.001) as server:
+            adapter = OllamaAdapter(base_url=server.url, timeout=5, stream=True)
+            response = asyncio.run(adapter.agenerate("hi", max_tokens=200))
+
+        assert response.action == "trade"
+        assert response.raw_response["stream"]["early_stop"]
+
+    def test_stream_only_on_supporting_adapters(self):
+        assert OllamaAdapter(stream=True).stream
+        mock = MockAdapter(stream=True)
+        assert not mock.supports_streaming and not mock.stream
+        assert mock.generate("Energy: 10/200").success
+
+    def test_no_object_falls_back_to_parse(self):
+        with StreamingServer(["no ", "json ", "here"], delay=0) as server:
+            adapter = OllamaAdapter(base_url=server.url, timeout=5, stream=True)
+            response = adapter.generate("hi")
+
+        assert not response.success
+        assert response.raw_response["text"] == "no json here"
+        assert not response.raw_response["stream"]["early_stop"]
+
+
+class TestJSONExtraction:
+    """중첩/펜스 인식 JSON 추출과 국소 수리 테스트"""
+
+    def test_fenced_with_prose(self):
+        raw = 'Sure {ok}!\n```json\n{"thought": "a", "action": "trade"}\n```\nDone.'
+        data, repaired = extract_json_object(raw)
+        assert data == {"thought": "a", "action": "trade"}
+        assert not repaired
+
+    def test_prefers_object_with_action(self):
+        raw = '{"note": 1} then {"thought": "x", "action": "move", "target": "market"}'
+        assert extract_json_object(raw)[0]["action"] == "move"
+        assert extract_json_object('{"response": {"action": "idle"}}')[0] == {"action": "idle"}
+
+    def test_trailing_comma_and_single_quotes(self):
+        data, repaired = extract_json_object("{'thought': \"I'm ok\", 'action': 'speak', 'content': 'hi',}")
+        assert data == {"thought": "I'm ok", "action": "speak", "content": "hi"}
+        assert repaired
+
+    def test_truncated_output(self):
+        data, _ = extract_json_object('{"thought": "abc", "action": "speak", "content": "hel')
+        assert data == {"thought": "abc", "action": "speak", "content": "hel"}
+        data, _ = extract_json_object('{"thought": "abc", "action": "speak", "target":')
+        assert data["action"] == "speak" and data["target"] is None
+
+    def test_repaired_flag_in_response(self):
+        response = EchoAdapter().parse_response('{"thought": "t", "action": "trade",}')
+        assert response.success and response.action == "trade"
+        assert response.raw_response["repaired"] is True
+        assert "repaired" not in EchoAdapter().parse_response('{"action": "idle"}').raw_response
+
+    def test_unrecoverable(self):
+        assert extract_json_object("no json at all") == (None, False)
+        assert EchoAdapter().parse_response("{not json}").parse_failed
+
+
+class TestStructuredOutput:
+    """구조화 출력(스키마) 테스트"""
+
+    def test_nested_braces_parse(self):
+        raw = '{"thought": "use {braces}", "action": "architect_skill", "skill": "adjust_tax", "new_rate": 0.2}'
+        adapter = EchoAdapter()
+
+        for response in (adapter.parse_structured(raw), adapter.parse_response(raw)):
+            assert response.success
+            assert response.to_action_dict() == {
+                "type": "architect_skill", "skill": "adjust_tax", "new_rate": 0.2,
+            }
+
+    def test_parse_failure_flag(self):
+        response = EchoAdapter().parse_response("no json")
+        assert response.parse_failed
+
+    def test_ollama_payload_format(self):
+        adapter = OllamaAdapter()
+        assert "format" not in adapter._build_payload("p", 10)
+        assert adapter._build_payload("p", 10, ACTION_SCHEMA)["format"] == ACTION_SCHEMA
+
+    def test_gemini_schema_has_no_type_lists(self):
+        schema = to_gemini_schema(ACTION_SCHEMA)
+        target = schema["properties"]["target"]
+        assert target == {"type": "string", "nullable": True}
+        assert None not in schema["properties"]["skill"]["enum"]
+        assert isinstance(ACTION_SCHEMA["properties"]["target"]["type"], list)  # 원본 불변
+
+    @pytest.mark.parametrize("schema", [ACTION_SCHEMA, ACTION_ONLY_SCHEMA, CONTENT_SCHEMA])
+    def test_openai_schema_is_strict(self, schema):
+        strict = to_openai_schema(schema)
+        assert strict["additionalProperties"] is False
+        assert set(strict["required"]) == set(schema["properties"])
+        # 선택 속성은 생략 대신 null로 답한다
+        for name in set(schema["properties"]) - set(schema["required"]):
+            assert "null" in strict["properties"][name]["type"]
+        assert "additionalProperties" not in schema  # 원본 불변
+
+    def test_openai_response_format_strict(self):
+        response_format = OpenAIAdapter._response_format(ACTION_SCHEMA)["response_format"]
+        assert response_format["json_schema"]["strict"] is True
+        assert response_format["json_schema"]["schema"]["additionalProperties"] is False
+        assert None in response_format["json_schema"]["schema"]["properties"]["skill"]["enum"]
+
+    def test_null_optional_fields_parse(self):
+        response = EchoAdapter().parse_response('{"thought": null, "content": "hi"}')
+        assert response.thought == "" and response.content == "hi"
+
+    def test_anthropic_tool_use_parse(self):
+        adapter = AnthropicAdapter(api_key="test")
+        message = SimpleNamespace(content=[
+            SimpleNamespace(type="tool_use", input={"thought": "t", "action": "trade"}),
+        ])
+        response = adapter._parse_message(message, ACTION_SCHEMA)
+        assert response.success and response.action == "trade"
+
+    def test_cache_key_includes_schema(self):
+        plain = make_cache_key("A", "m", "p", 10, {})
+        assert plain != make_cache_key("A", "m", "p", 10, {}, ACTION_SCHEMA)
+        assert plain == make_cache_key("A", "m", "p", 10, {}, None)
+
+
+class TestPromptCaching:
+    """고정/가변 블록 프롬프트와 Anthropic 프롬프트 캐시 테스트"""
+
+    def test_layered_prompt_is_plain_string(self):
+        prompt = LayeredPrompt("stable", "volatile")
+        assert prompt == "stable\n\nvolatile"
+        assert make_cache_key("A", "m", prompt, 10) == make_cache_key("A", "m", "stable\n\nvolatile", 10)
+        assert json.loads(json.dumps(prompt)) == str(prompt)
+
+    def test_anthropic_system_block_marked_for_cache(self):
+        kwargs = AnthropicAdapter._prompt_kwargs(LayeredPrompt("rules", "state"))
+        assert kwargs["system"] == [
+            {"type": "text", "text": "rules", "cache_control": {"type": "ephemeral"}},
+        ]
+        assert kwargs["messages"] == [{"role": "user", "content": "state"}]
+        assert "system" not in AnthropicAdapter._prompt_kwargs("plain")
+
+    def test_usage_reported_per_call(self):
+        adapter = AnthropicAdapter(api_key="test")
+        usage = SimpleNamespace(
+            input_tokens=50, output_tokens=20,
+            cache_creation_input_tokens=0, cache_read_input_tokens=150,
+        )
+        message = SimpleNamespace(
+            content=[SimpleNamespace(type="text", text='{"thought": "t", "action": "idle"}')],
+            usage=usage,
+        )
+        response = adapter._parse_message(message, None)
+        assert response.raw_response["usage"]["cache_read_input_tokens"] == 150
+
+        stats = adapter.prompt_cache.stats()
+        assert stats["calls"] == 1
+        assert stats["cache_read_ratio"] == 0.75
+
+
+class TestObservation:
+    """구조화된 관측 채널"""
+
+    def make_observation(self, render=None, **fields):
+        values = dict(agent_id="a", persona="merchant", location="market", energy=40, influence=0, epoch=1)
+        values.update(fields)
+        return Observation(render=render, **values)
+
+    def test_mock_skips_rendering(self):
+        def render():
+            raise AssertionError("mock은 프롬프트를 렌더링하지 않아야 한다")
+
+        observation = self.make_observation(render=render)
+        random.seed(0)
+        response = MockAdapter(persona="merchant").decide(observation)
+        assert response.success and not observation.rendered
+
+        # 같은 상태의 텍스트 프롬프트와 같은 결정
+        random.seed(0)
+        legacy = MockAdapter(persona="merchant").generate(
+            "위치: market\n에너지: 40/200\n{\"action\": \"speak|trade|support|whisper|move|idle\"}"
+        )
+        assert (legacy.action, legacy.target, legacy.content) == (response.action, response.target, response.content)
+
+    def test_mock_reads_english_prompt(self):
+        adapter = MockAdapter()
+        assert adapter._extract_energy("Location: plaza\nEnergy: 35/200") == 35
+        assert adapter._extract_location("Location: plaza\nEnergy: 35/200") == "plaza"
+
+    def test_prompt_adapters_render_once(self):
+        renders = []
+
+        def render():
+            renders.append(1)
+            return "prompt text"
+
+        observation = self.make_observation(render=render)
+        adapter = EchoAdapter()
+        assert adapter.needs_prompt
+        assert adapter.decide(observation).thought == "prompt text"
+        assert asyncio.run(adapter.adecide(observation)).thought == "prompt text"
+        assert len(renders) == 1
+
+    def test_wrapped_mock_skips_rendering(self, tmp_path):
+        def render():
+            raise AssertionError("감싼 mock도 프롬프트를 렌더링하지 않아야 한다")
+
+        wrappers = [
+            RecordingAdapter(MockAdapter(persona="merchant"), Cassette(tmp_path / "c.jsonl")),
+            CachingAdapter(MockAdapter(persona="merchant"), ResponseCache(path=str(tmp_path / "c.sqlite"))),
+        ]
+        for wrapper in wrappers:
+            assert not wrapper.needs_prompt
+            observation = self.make_observation(render=render)
+            random.seed(0)
+            response = wrapper.decide(observation)
+            random.seed(0)
+            assert response == MockAdapter(persona="merchant").decide(observation)
+            assert asyncio.run(wrapper.adecide(observation)).success
+            assert not observation.rendered
+
+    def test_wrapped_prompt_adapter_uses_wrapper(self, tmp_path):
+        # 프롬프트 기반 어댑터는 래퍼의 generate()를 거친다 (캐시 적중)
+        adapter = CachingAdapter(EchoAdapter(), ResponseCache(path=str(tmp_path / "c.sqlite")))
+        assert adapter.needs_prompt
+        adapter.decide(self.make_observation(render=lambda: "p"))
+        asyncio.run(adapter.adecide(self.make_observation(render=lambda: "p")))
+        assert adapter.cache.stats()["hits"] == 1
+
+    def test_recorded_mock_simulation_builds_no_prompt(self, tmp_path, make_simulation):
+        sim = make_simulation(tmp_path, total_epochs=2, config_overrides={"cassette": {"mode": "record"}})
+        assert all(not adapter.needs_prompt for adapter in sim.adapters.values())
+
+        def build(*args, **kwargs):
+            raise AssertionError("mock 런은 프롬프트를 만들지 않아야 한다")
+
+        sim._build_agent_context = build
+        sim.run()
+        assert sim.cassette.recorded > 0
+
+
+class TestTwoPhaseAdapter:
+    """2단계 결정 래퍼"""
+
+    class Scripted(BaseLLMAdapter):
+        def __init__(self, replies, **kwargs):
+            super().__init__("scripted", **kwargs)
+            self.replies = list(replies)
+            self.calls = []
+
+        def generate(self, prompt, max_tokens=1000, response_schema=None):
+            self.calls.append((prompt, max_tokens, response_schema))
+            return self.parse_response(self.replies.pop(0))
+
+    def observation(self, prompt):
+        return Observation(
+            agent_id="a", persona="citizen", location="plaza", energy=100, influence=0, epoch=1,
+            render=lambda: prompt,
+        )
+
+    def test_layered_prompt_and_schemas(self):
+        inner = self.Scripted(['{"action": "whisper", "target": "b"}', '{"thought": "t", "content": "secret"}'])
+        adapter = TwoPhaseAdapter(inner, action_max_tokens=40, content_max_tokens=100, reasoning_tokens=50)
+        response = adapter.decide(self.observation(LayeredPrompt("stable", "state")), 500, ACTION_SCHEMA)
+
+        assert (response.action, response.target, response.content, response.thought) == ("whisper", "b", "secret", "t")
+        (first, first_max, first_schema), (second, second_max, second_schema) = inner.calls
+        assert isinstance(first, LayeredPrompt) and first.system == "stable"
+        assert isinstance(second, LayeredPrompt) and "(대상: b)" in second.user
+        assert (first_max, first_schema) == (40, ACTION_ONLY_SCHEMA)
+        assert (second_max, second_schema) == (150, CONTENT_SCHEMA)
+        assert set(response.raw_response["phases"]) == {"action", "content"}
+
+    def test_single_phase_and_plain_text_content(self):
+        inner = self.Scripted(['{"action": "trade"}', '{"action": "speak"}', "```\nHello everyone\n```"])
+        adapter = TwoPhaseAdapter(inner)
+        assert adapter.decide(self.observation("p")).action == "trade"
+        assert len(inner.calls) == 1
+
+        response = asyncio.run(adapter.adecide(self.observation("p")))
+        assert response.success and response.content == "Hello everyone"
+        assert inner.calls[-1][2] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
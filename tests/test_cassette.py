@@ -0,0 +1,182 @@
+"""녹화/재생 카세트 테스트"""
+
+import asyncio
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.adapters import (
+    LLMResponse, Cassette, CassetteDivergence, RecordingAdapter, ReplayAdapter,
+    cassette_from_simulation_log, create_adapter, MockAdapter, Observation,
+)
+
+
+class TestCassette:
+    """어댑터 단위 녹화/재생 테스트"""
+
+    def test_round_trip(self, tmp_path, hash_adapter):
+        path = tmp_path / "cassette.jsonl"
+        recorder = RecordingAdapter(hash_adapter(model="hash"), Cassette(path), agent_id="a")
+        recorded = [recorder.generate(f"prompt {i}") for i in range(3)]
+        recorder.cassette.close()
+
+        replay = create_adapter("replay", cassette=str(path), agent_id="a")
+        replayed = [replay.generate(f"prompt {i}") for i in range(3)]
+
+        assert replayed == recorded
+        assert replay.cassette.stats()["divergences"] == 0
+
+    def test_records_observation_decisions(self, tmp_path):
+        # 관측으로 결정하는 어댑터는 감싸도 decide()로 결정하고 프롬프트를 렌더링하지 않는다
+        def observation(epoch):
+            return Observation(
+                agent_id="a", persona="citizen", location="market", energy=30, influence=0, epoch=epoch,
+                render=lambda: pytest.fail("프롬프트를 렌더링하면 안 됨"),
+            )
+
+        plain = MockAdapter(agent_id="a", rng=random.Random(7))
+        recorder = RecordingAdapter(
+            MockAdapter(agent_id="a", rng=random.Random(7)), Cassette(tmp_path / "c.jsonl"), agent_id="a",
+        )
+        expected = [plain.decide(observation(i)) for i in range(4)]
+        recorded = [recorder.decide(observation(i)) for i in range(2)]
+        recorded += [asyncio.run(recorder.adecide(observation(i))) for i in range(2, 4)]
+        recorder.cassette.close()
+
+        assert recorded == expected
+        entries = [json.loads(line) for line in (tmp_path / "c.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert [e["seq"] for e in entries] == [0, 1, 2, 3]
+        assert all(e["prompt_hash"] is None for e in entries)
+
+    def test_raw_text_restored(self, tmp_path):
+        path = tmp_path / "cassette.jsonl"
+        cassette = Cassette(path)
+        response = LLMResponse(thought="", action="idle", raw_response={"text": "free text"}, success=False)
+        cassette.record("a", 0, "q", 300, response)
+        cassette.close()
+
+        replayed = ReplayAdapter(cassette=path, agent_id="a").generate("q")
+        assert replayed.raw_response["text"] == "free text"
+        assert "free text" in path.read_text(encoding="utf-8")
+
+    def test_divergence_and_exhaustion(self, tmp_path, hash_adapter):
+        path = tmp_path / "cassette.jsonl"
+        recorder = RecordingAdapter(hash_adapter(model="hash"), path, agent_id="a")
+        recorder.generate("original")
+        recorder.cassette.close()
+
+        replay = ReplayAdapter(cassette=path, agent_id="a")
+        replay.generate("changed")
+        exhausted = replay.generate("more")
+
+        stats = replay.cassette.stats()
+        assert stats["divergences"] == 1
+        assert stats["exhausted"] == 1
+        assert not exhausted.success
+
+        with pytest.raises(CassetteDivergence):
+            ReplayAdapter(cassette=path, agent_id="a", strict=True).generate("changed")
+
+    def test_from_simulation_log(self, tmp_path):
+        log_path = tmp_path / "simulation_log.jsonl"
+        entries = [
+            {"agent_id": "a", "action_type": "trade", "target": None, "content": None, "thought": "t1"},
+            {"agent_id": "b", "action_type": "death"},
+            {"agent_id": "a", "action_type": "speak", "target": None, "content": "hi", "thought": "t2"},
+            {
+                "agent_id": "a", "action_type": "architect_skill", "target": "b", "content": None,
+                "thought": "t3", "skill": "grant_subsidy", "amount": 5, "skill_result": "ok",
+            },
+        ]
+        log_path.write_text("\n".join(json.dumps(e) for e in entries), encoding="utf-8")
+
+        count = cassette_from_simulation_log(log_path, tmp_path / "cassette.jsonl")
+        assert count == 3
+
+        replay = ReplayAdapter(cassette=tmp_path / "cassette.jsonl", agent_id="a")
+        assert replay.generate("x").action == "trade"
+        assert replay.generate("y").content == "hi"
+        assert replay.generate("z").to_action_dict() == {
+            "type": "architect_skill", "target": "b", "skill": "grant_subsidy", "amount": 5,
+        }
+        assert replay.cassette.stats()["divergences"] == 0
+
+    def test_log_cassette_replays_architect_skills(self, tmp_path, make_simulation, read_actions, hash_adapter):
+        class Architect(hash_adapter):
+            def generate(self, prompt, max_tokens=1000, response_schema=None):
+                if self.config.get("persona") != "architect":
+                    return super().generate(prompt, max_tokens, response_schema)
+                return LLMResponse(
+                    thought="tax", action="architect_skill", extra={"skill": "adjust_tax", "new_rate": 0.25},
+                )
+
+        recorded = make_simulation(tmp_path / "rec", total_epochs=3)
+        recorded.adapters = {
+            agent.id: Architect(model="hash", persona=agent.persona) for agent in recorded.agents
+        }
+        recorded.run()
+        assert recorded.env.get_market_tax_rate() == 0.25
+
+        cassette_path = tmp_path / "cassette.jsonl"
+        cassette_from_simulation_log(recorded.run_dir / "simulation_log.jsonl", cassette_path)
+        replayed = make_simulation(
+            tmp_path / "rep", total_epochs=3,
+            config_overrides={"cassette": {"mode": "replay", "path": str(cassette_path)}},
+        )
+        replayed.run()
+
+        assert replayed.env.get_market_tax_rate() == 0.25
+        assert read_actions(replayed) == read_actions(recorded)
+
+
+class TestSimulationReplay:
+    """시뮬레이션 녹화 후 오프라인 재생"""
+
+    def test_replay_reproduces_run(self, tmp_path, make_simulation, read_actions, hash_adapter):
+        recorded = make_simulation(tmp_path / "rec", total_epochs=6)
+        assert recorded.cassette is None
+
+        recorded.cassette = Cassette(tmp_path / "cassette.jsonl")
+        recorded.adapters = {
+            agent.id: RecordingAdapter(hash_adapter(model="hash"), recorded.cassette, agent_id=agent.id)
+            for agent in recorded.agents
+        }
+        recorded.run()
+        recorded.cassette.close()
+
+        replayed = make_simulation(
+            tmp_path / "rep", total_epochs=6,
+            config_overrides={"cassette": {"mode": "replay", "path": str(tmp_path / "cassette.jsonl")}},
+        )
+        assert all(isinstance(a, ReplayAdapter) for a in replayed.adapters.values())
+        replayed.run()
+
+        assert read_actions(replayed) == read_actions(recorded)
+        with open(replayed.run_dir / "performance.json", encoding="utf-8") as f:
+            cassette_report = json.load(f)["cassette"]
+        assert cassette_report["divergences"] == 0
+        assert cassette_report["replayed"] == recorded.cassette.recorded
+
+
+    def test_recording_keeps_mock_decisions(self, tmp_path, make_simulation, read_actions):
+        # 녹화 래퍼를 씌워도 mock은 관측으로 결정하고, 그 결정도 카세트에 남는다
+        plain = make_simulation(tmp_path / "plain", total_epochs=4)
+        plain.run()
+
+        recorded = make_simulation(
+            tmp_path / "rec", total_epochs=4, config_overrides={"cassette": {"mode": "record"}},
+        )
+        assert all(isinstance(a, RecordingAdapter) for a in recorded.adapters.values())
+        recorded.run()
+
+        assert read_actions(recorded) == read_actions(plain)
+        assert recorded.cassette.recorded == len(read_actions(plain))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,121 @@
+"""에이전트 컨텍스트 빌더 테스트"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.core.context import build_context
+from agora.core.history import HistoricalEvent
+from agora.core.logger import calculate_gini_coefficient
+from agora.core.simulation import Simulation
+
+
+class TestContextBuilder:
+    """공통 조각 캐시와 미리 파싱한 템플릿 (build_context와 같은 출력)"""
+
+    @staticmethod
+    def build(sim: Simulation, agent, **kwargs):
+        read_set: dict = {}
+        prompt = sim.context_builder.build(agent, sim.recent_logs, read_set=read_set, **kwargs)
+        return prompt, read_set
+
+    @staticmethod
+    def direct(sim: Simulation, agent, alive_agents, gini, **kwargs):
+        read_set: dict = {}
+        prompt = build_context(
+            agent, sim.env, sim.support_tracker, sim.history_engine, sim.influence_system,
+            sim.crisis_system, alive_agents, sim.recent_logs, gini, read_set=read_set, **kwargs,
+        )
+        return prompt, read_set
+
+    def test_matches_build_context(self, tmp_path, make_simulation, use_hash_adapters):
+        sim = make_simulation(tmp_path, total_epochs=6)
+        use_hash_adapters(sim)
+        for epoch in range(1, 7):
+            sim.run_epoch(epoch)
+            alive = sim.get_alive_agents()
+            snapshot = alive[::2]
+            snapshot_gini = calculate_gini_coefficient([a.energy for a in snapshot])
+            for language, layout, budget in (("ko", "default", False), ("en", "cache", True)):
+                options = {"language": language, "layout": layout, "enforce_budget": budget}
+                for agent in sim.agents:
+                    # (빌더 인자, build_context에 넘길 생존자/지니)
+                    cases = (
+                        ((None, None), (alive, sim.population.gini())),
+                        ((snapshot, 0.42), (snapshot, 0.42)),
+                        ((snapshot, None), (snapshot, snapshot_gini)),
+                    )
+                    for (agents, gini), (expected_agents, expected_gini) in cases:
+                        prompt, reads = self.build(sim, agent, alive_agents=agents, gini=gini, **options)
+                        expected, expected_reads = self.direct(
+                            sim, agent, expected_agents, expected_gini, **options,
+                        )
+                        assert prompt == expected
+                        assert type(prompt) is type(expected)
+                        assert reads == expected_reads
+
+    def test_shared_fragments_cached(self, tmp_path, make_simulation):
+        sim = make_simulation(tmp_path)
+        builder = sim.context_builder
+        for _ in range(2):
+            for agent in sim.agents:
+                self.build(sim, agent)
+
+        fragments = builder.stats()["fragments"]
+        assert builder.builds == 2 * len(sim.agents)
+        assert fragments["village"]["misses"] == 1
+        assert fragments["actions"]["misses"] == len({a.location for a in sim.agents})
+        assert fragments["history"]["misses"] <= 3
+
+        # 새 로그, 이동은 해당 조각만 다시 만든다
+        mover, other = sim.agents[0], sim.agents[1]
+        sim.recent_logs.append({"action_type": "speak", "agent_id": mover.id, "content": "hello"})
+        mover.location = other.location
+        prompt, _ = self.build(sim, other)
+        assert "hello" in prompt
+        assert f"{mover.id}({mover.persona})" in prompt
+        fragments = builder.stats()["fragments"]
+        assert fragments["village"]["misses"] == 1
+        assert fragments["recent_events"]["misses"] >= 2
+
+    def test_history_edited_without_record(self, tmp_path, make_simulation):
+        # record()를 거치지 않고 events를 고쳐도 캐시된 역사 요약을 다시 만든다
+        sim = make_simulation(tmp_path)
+        agent = sim.agents[0]
+        self.build(sim, agent)
+
+        sim.history_engine.events.append(HistoricalEvent(
+            epoch=1, event_type="crisis", description="직접 추가한 사건", importance=5,
+        ))
+        prompt, _ = self.build(sim, agent)
+        assert "직접 추가한 사건" in prompt
+        assert prompt == self.direct(sim, agent, sim.get_alive_agents(), sim.population.gini())[0]
+
+    @pytest.mark.parametrize("language", ["en", "ko"])
+    def test_braces_in_values_rendered_verbatim(self, tmp_path, make_simulation, language):
+        # 필드 값 안의 중괄호는 다시 치환하지 않는다 (str.format과 같은 한 번 치환)
+        sim = make_simulation(tmp_path)
+        agent = sim.agents[0]
+        content = "{energy} {{agent_id}} }{"
+        sim.recent_logs.append({"action_type": "speak", "agent_id": agent.id, "content": content})
+
+        prompt, _ = self.build(sim, agent, language=language)
+        assert content in prompt
+
+    def test_performance_report(self, tmp_path, make_simulation, use_hash_adapters):
+        sim = make_simulation(tmp_path, total_epochs=2)
+        use_hash_adapters(sim)
+        sim.run()
+
+        with open(sim.run_dir / "performance.json", encoding="utf-8") as f:
+            report = json.load(f)["context_builder"]
+        assert report["builds"] > 0
+        assert report["fragments"]["actions"]["hit_rate"] > 0.5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
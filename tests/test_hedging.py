@@ -0,0 +1,251 @@
+"""헤지 요청 테스트"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.adapters import (
+    BaseLLMAdapter, HedgingAdapter, LatencyTracker, LLMResponse, OllamaRouter, RoutedAdapter,
+)
+from agora.adapters.hedging import percentile
+
+
+class ScriptedAdapter(BaseLLMAdapter):
+    """호출 순서대로 (지연 초, 성공 여부)를 따르는 어댑터"""
+
+    def __init__(self, script, model="scripted"):
+        super().__init__(model)
+        self.script = list(script)
+        self.calls = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+
+    def _next(self) -> tuple[int, float, bool]:
+        with self._lock:
+            index = self.calls
+            self.calls += 1
+        delay, success = self.script[min(index, len(self.script) - 1)]
+        return index, delay, success
+
+    @staticmethod
+    def _response(index: int, success: bool) -> LLMResponse:
+        return LLMResponse(
+            thought=str(index), action="idle", target=None, content=None,
+            raw_response={} if success else {"error": "boom"}, success=success,
+        )
+
+    def generate(self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None):
+        index, delay, success = self._next()
+        time.sleep(delay)
+        return self._response(index, success)
+
+    async def agenerate(self, prompt: str, max_tokens: int = 1000, response_schema: Optional[dict] = None):
+        index, delay, success = self._next()
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self._response(index, success)
+
+
+def seeded_tracker(adapter: HedgingAdapter, latency: float = 0.01, count: int = 5) -> None:
+    for _ in range(count):
+        adapter.tracker.record(adapter.latency_key, latency, hedged=False, hedge_won=False)
+
+
+class TestLatencyTracker:
+    """백분위수와 모델별 통계"""
+
+    def test_percentile_interpolates(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == pytest.approx(50.5)
+        assert percentile(values, 99) == pytest.approx(99.01)
+        assert percentile([], 95) == 0.0
+
+    def test_min_samples_and_window(self):
+        tracker = LatencyTracker(window=3)
+        tracker.record("m", 1.0, hedged=False, hedge_won=False)
+        assert tracker.percentile("m", 50, min_samples=2) is None
+
+        for latency in (2.0, 3.0, 4.0):
+            tracker.record("m", latency, hedged=True, hedge_won=False)
+        tracker.record("m", None, hedged=False, hedge_won=False)
+
+        # 창 밖으로 밀려난 1.0은 빠지고, 실패(None)는 지연에 넣지 않는다
+        assert tracker.percentile("m", 50, min_samples=2) == 3.0
+        stats = tracker.stats()["m"]
+        assert (stats["requests"], stats["hedged"], stats["hedge_rate"]) == (5, 3, 0.6)
+        assert (stats["p50_s"], stats["p99_s"]) == (3.0, 3.98)
+
+
+class TestHedgingAdapter:
+    """느린 요청의 중복 전송과 먼저 온 응답 선택"""
+
+    def make(self, script, **kwargs) -> HedgingAdapter:
+        kwargs.setdefault("min_samples", 5)
+        kwargs.setdefault("min_delay", 0.05)
+        return HedgingAdapter(ScriptedAdapter(script), LatencyTracker(), **kwargs)
+
+    def test_no_hedge_until_enough_samples(self):
+        adapter = self.make([(0.0, True)])
+        for _ in range(5):
+            adapter.generate("p")
+
+        assert adapter.inner.calls == 5
+        assert adapter.tracker.stats()[adapter.latency_key]["hedged"] == 0
+        assert adapter.hedge_delay() == 0.05
+
+    def test_hedge_wins(self):
+        adapter = self.make([(1.0, True), (0.0, True)])
+        seeded_tracker(adapter)
+
+        started = time.perf_counter()
+        response = asyncio.run(adapter.agenerate("p"))
+
+        assert time.perf_counter() - started < 0.5
+        assert response.thought == "1"
+        stats = adapter.tracker.stats()[adapter.latency_key]
+        assert (stats["hedged"], stats["hedge_wins"]) == (1, 1)
+
+    def test_sync_call_is_not_hedged(self):
+        # 동기 경로는 진 요청을 취소할 수 없으므로 중복 요청을 보내지 않는다
+        adapter = self.make([(0.2, True), (0.0, True)])
+        seeded_tracker(adapter)
+
+        assert adapter.prefers_async
+        assert adapter.generate("p").thought == "0"
+        assert adapter.inner.calls == 1
+        assert adapter.tracker.stats()[adapter.latency_key]["hedged"] == 0
+
+    def test_fast_primary_is_not_hedged(self):
+        adapter = self.make([(0.0, True)])
+        seeded_tracker(adapter)
+
+        assert asyncio.run(adapter.agenerate("p")).thought == "0"
+        assert adapter.inner.calls == 1
+
+    def test_async_loser_cancelled(self):
+        adapter = self.make([(1.0, True), (0.0, True)])
+        seeded_tracker(adapter)
+
+        response = asyncio.run(adapter.agenerate("p"))
+
+        assert response.thought == "1"
+        assert adapter.inner.cancelled == 1
+
+    def test_failed_answer_waits_for_other(self):
+        # 헤지 쪽이 먼저 실패하면 원래 요청의 성공 응답을 기다린다
+        adapter = self.make([(0.2, True), (0.0, False)])
+        seeded_tracker(adapter)
+
+        response = asyncio.run(adapter.agenerate("p"))
+        assert response.success and response.thought == "0"
+        assert adapter.tracker.stats()[adapter.latency_key]["hedge_wins"] == 0
+
+    def test_hedge_goes_to_other_endpoint(self, ollama_server):
+        with ollama_server(delay=1.0) as slow, ollama_server() as fast:
+            router = OllamaRouter([slow.url, fast.url])
+            adapter = HedgingAdapter(
+                RoutedAdapter(router, model="mock"), LatencyTracker(), min_samples=5, min_delay=0.05,
+            )
+            seeded_tracker(adapter)
+
+            async def timed():
+                # httpx가 없으면 스레드로 보내므로 asyncio.run 종료 대기는 빼고 잰다
+                started = time.perf_counter()
+                response = await adapter.agenerate("p")
+                return response, time.perf_counter() - started
+
+            response, elapsed = asyncio.run(timed())
+
+        assert response.success
+        assert elapsed < 0.8
+        assert fast.generated == 1
+        assert adapter.tracker.stats()[adapter.latency_key]["hedge_wins"] == 1
+
+    def test_cancelled_loser_releases_endpoint(self, ollama_server):
+        # 진 요청이 취소돼도 라우터의 진행 중 수가 돌아오고, 느린 서버는 배제되지 않는다
+        with ollama_server(delay=0.5) as slow, ollama_server() as fast:
+            router = OllamaRouter([slow.url, fast.url])
+            adapter = HedgingAdapter(
+                RoutedAdapter(router, model="mock"), LatencyTracker(), min_samples=5, min_delay=0.05,
+            )
+            seeded_tracker(adapter)
+
+            async def hedged():
+                response = await adapter.agenerate("p")
+                await asyncio.sleep(0)  # 취소된 태스크가 정리될 차례
+                return response
+
+            assert asyncio.run(hedged()).success
+
+        assert adapter.tracker.stats()[adapter.latency_key]["hedge_wins"] == 1
+        stats = router.stats()
+        assert [endpoint["in_flight"] for endpoint in stats.values()] == [0, 0]
+        assert stats[slow.url]["failures"] == 0 and not stats[slow.url]["ejected"]
+
+
+class TestHedgingSimulation:
+    """설정으로 켜고 performance.json에 모델별 통계 기록"""
+
+    def test_report(self, tmp_path, make_simulation, ollama_server):
+        with ollama_server() as first, ollama_server() as second:
+            sim = make_simulation(
+                tmp_path, total_epochs=2,
+                config_overrides={
+                    "default_adapter": "ollama",
+                    "ollama": {"endpoints": [first.url, second.url]},
+                    "hedging": {"enabled": True, "min_samples": 5},
+                },
+            )
+            assert all(isinstance(a, HedgingAdapter) for a in sim.adapters.values())
+            sim.run()
+
+        with open(sim.run_dir / "performance.json", encoding="utf-8") as f:
+            report = json.load(f)["hedging"]
+        stats = next(iter(report.values()))
+        assert stats["requests"] == first.generated + second.generated
+        assert {"hedge_rate", "p50_s", "p95_s", "p99_s"} <= set(stats)
+
+    def test_single_endpoint_not_hedged(self, tmp_path, make_simulation, ollama_server):
+        # 중복 요청을 보낼 다른 서버가 없으면 헤지하지 않는다
+        with ollama_server() as server:
+            sim = make_simulation(
+                tmp_path, total_epochs=1,
+                config_overrides={
+                    "default_adapter": "ollama",
+                    "ollama": {"base_url": server.url},
+                    "hedging": {"enabled": True},
+                },
+            )
+        assert not any(isinstance(a, HedgingAdapter) for a in sim.adapters.values())
+
+    def test_sequential_turn_cancels_loser(self, tmp_path, make_simulation):
+        # 순차 턴도 이벤트 루프에서 결정하므로 진 요청이 실제로 취소된다
+        sim = make_simulation(tmp_path, total_epochs=1)
+        tracker = LatencyTracker()
+        inners = []
+        for agent in sim.agents:
+            adapter = HedgingAdapter(ScriptedAdapter([(1.0, True), (0.0, True)]), tracker, min_delay=0.01)
+            seeded_tracker(adapter)
+            inners.append(adapter.inner)
+            sim.adapters[agent.id] = adapter
+
+        started = time.perf_counter()
+        sim.run()
+
+        assert time.perf_counter() - started < len(sim.agents) * 0.5
+        assert all(inner.calls == 2 and inner.cancelled == 1 for inner in inners)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -47,6 +47,41 @@ class TestSupportTracker:
         mutual = tracker.get_mutual_supporters("a")
         assert "b" in mutual
 
+    def test_has_supported(self):
+        tracker = SupportTracker()
+        tracker.add(1, "a", "b")
+        assert tracker.has_supported("a", "b")
+        assert not tracker.has_supported("b", "a")
+
+    def test_index_matches_record_scan(self):
+        """색인 조회가 전체 기록을 훑은 결과와 같은지"""
+        import random
+        from collections import Counter
+
+        rng = random.Random(5)
+        ids = [f"agent_{i}" for i in range(8)]
+        tracker = SupportTracker()
+        for epoch in range(300):
+            giver, receiver = rng.sample(ids, 2)
+            tracker.add(epoch // 10, giver, receiver)
+
+        for agent_id in ids + ["nobody"]:
+            supporters = [r.giver_id for r in tracker.records if r.receiver_id == agent_id]
+            supported = [r.receiver_id for r in tracker.records if r.giver_id == agent_id]
+            assert tracker.get_supporters(agent_id) == supporters
+            assert tracker.get_supporters(agent_id, last_n=5) == supporters[-5:]
+            assert tracker.get_supported(agent_id, last_n=5) == supported[-5:]
+            assert tracker.count_supports_received(agent_id) == len(supporters)
+            assert tracker.count_supports_given(agent_id) == len(supported)
+            assert tracker.get_top_supporters(agent_id) == [a for a, _ in Counter(supporters).most_common(3)]
+            assert tracker.get_mutual_supporters(agent_id) == list(set(supporters) & set(supported))
+            assert tracker.get_unreturned_support(agent_id) == list(set(supported) - set(supporters))
+
+        # 반환 목록을 고쳐도 색인은 그대로
+        tracker.get_supporters(ids[0]).append("x")
+        assert "x" not in tracker.get_supporters(ids[0])
+        assert len(tracker.to_list()) == 300
+
 
 class TestWhisperSystem:
     """Whisper 누출 시스템 테스트"""
@@ -0,0 +1,125 @@
+"""여러 Ollama 서버 라우터 테스트"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.adapters import OllamaRouter, RoutedAdapter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestOllamaRouter:
+    """서버 선택, 배제, 통계"""
+
+    def test_prefers_resident_then_least_loaded(self, ollama_server):
+        with ollama_server() as cold, ollama_server(running=["mock:latest"]) as warm:
+            router = OllamaRouter([cold.url, warm.url])
+            router.check()
+
+            first = router.acquire("mock")
+            second = router.acquire("mock")
+            third = router.acquire("mock")
+
+        # 상주 서버가 먼저, 진행 중 요청이 load_penalty만큼 쌓이면 다른 서버로
+        assert (first, second, third) == (warm.url, cold.url, warm.url)
+
+    def test_skips_endpoint_without_model(self, ollama_server):
+        with ollama_server(models=["other:latest"]) as a, ollama_server() as b:
+            router = OllamaRouter([a.url, b.url])
+            router.check()
+            assert {router.acquire("mock") for _ in range(3)} == {b.url}
+
+    def test_failover_and_ejection(self, ollama_server):
+        clock = FakeClock()
+        with ollama_server() as bad, ollama_server() as good:
+            bad.failing = True
+            router = OllamaRouter([bad.url, good.url], eject_seconds=30, clock=clock)
+            adapter = RoutedAdapter(router, model="mock")
+
+            assert adapter.generate("hi").success
+            assert adapter.generate("hi").success
+            assert (bad.generated, good.generated) == (0, 2)
+
+            stats = router.stats()
+            assert stats[bad.url]["ejected"] and stats[bad.url]["ejections"] == 1
+            assert stats[good.url]["completed"] == 2
+
+            # 배제 기간이 지나면 다시 확인해서 쓴다
+            bad.failing = False
+            clock.now = 31
+            router.acquire("mock")
+            assert router.acquire("mock") == bad.url
+            assert not router.stats()[bad.url]["ejected"]
+
+    def test_cancelled_request_released(self, ollama_server):
+        async def cancel_midway(adapter):
+            task = asyncio.ensure_future(adapter.agenerate("hi"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        with ollama_server(delay=0.5) as server:
+            router = OllamaRouter([server.url])
+            adapter = RoutedAdapter(router, model="mock")
+            asyncio.run(cancel_midway(adapter))
+
+            stats = router.stats()[server.url]
+            assert stats["in_flight"] == 0
+            assert stats["failures"] == 0 and not stats["ejected"]
+
+    def test_shared_chat_session(self):
+        router = OllamaRouter(["http://127.0.0.1:9", "http://127.0.0.1:10"])
+        adapter = RoutedAdapter(router, model="mock", session=True)
+        sessions = {id(r.chat_session) for r in adapter.replicas.values()}
+        assert len(sessions) == 1 and adapter.chat_session is not None
+
+
+class TestRoutedSimulation:
+    """동시 결정 모드에서 서버 수만큼 처리량 증가"""
+
+    @staticmethod
+    def run_epoch_seconds(make_simulation, tmp_path, servers) -> float:
+        sim = make_simulation(
+            tmp_path, scheduling="simultaneous", total_epochs=2,
+            config_overrides={
+                "default_adapter": "ollama",
+                "ollama": {"endpoints": [s.url for s in servers]},
+            },
+        )
+        started = time.perf_counter()
+        sim.run()
+        return time.perf_counter() - started, sim
+
+    def test_scales_with_endpoints(self, tmp_path, make_simulation, ollama_server):
+        with ollama_server(delay=0.05) as single:
+            one, _ = self.run_epoch_seconds(make_simulation, tmp_path / "one", [single])
+
+        with ollama_server(delay=0.05) as a, ollama_server(delay=0.05) as b, ollama_server(delay=0.05) as c:
+            three, sim = self.run_epoch_seconds(make_simulation, tmp_path / "three", [a, b, c])
+            counts = [s.generated for s in (a, b, c)]
+
+        assert max(counts) - min(counts) <= 2
+        assert one / three > 2.0
+
+        with open(sim.run_dir / "performance.json", encoding="utf-8") as f:
+            report = json.load(f)["ollama_router"]
+        assert sum(e["completed"] for e in report.values()) == sum(counts)
+        assert all(e["throughput_rps"] > 0 for e in report.values())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
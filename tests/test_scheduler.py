@@ -0,0 +1,181 @@
+"""요청 스케줄러 테스트 (429/지연을 주입하는 로컬 대역 서버)"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.adapters import (
+    OllamaAdapter, ProviderLimits, RequestScheduler, RetryPolicy, ScheduledAdapter, TokenBucket,
+)
+from agora.adapters.scheduler import estimate_request_tokens
+from agora.core.budget import estimate_prompt_tokens
+
+
+class StandInServer:
+    """Ollama /api/generate 대역: 정해진 상태 코드 목록을 차례로 돌려주고 이후엔 200"""
+
+    def __init__(self, statuses=(), retry_after=None, latency=0.0):
+        self.statuses = list(statuses)
+        self.retry_after = retry_after
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with server._lock:
+                    server.calls += 1
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    status = server.statuses.pop(0) if server.statuses else 200
+                time.sleep(server.latency)
+
+                body = json.dumps({"response": '{"thought": "ok", "action": "trade"}'}).encode()
+                self.send_response(status)
+                if status == 429 and server.retry_after is not None:
+                    self.send_header("Retry-After", str(server.retry_after))
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True,
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def fast_retry(max_retries=3) -> RetryPolicy:
+    return RetryPolicy(max_retries=max_retries, base_delay=0.01, max_delay=0.05)
+
+
+class TestTokenBucket:
+    """토큰 버킷 테스트"""
+
+    def test_refill_over_time(self):
+        now = [0.0]
+        bucket = TokenBucket(rate_per_minute=60, capacity=2, clock=lambda: now[0])
+        assert bucket.wait_time(1) == 0
+        bucket.consume(1)
+        bucket.consume(1)
+        assert bucket.wait_time(1) == pytest.approx(1.0)
+
+        now[0] = 0.5
+        assert bucket.wait_time(1) == pytest.approx(0.5)
+        now[0] = 10.0
+        assert bucket.wait_time(2) == 0  # capacity까지만 채워짐
+        assert bucket.tokens == 2
+
+
+class TestRequestScheduler:
+    """재시도/제한 테스트"""
+
+    def test_retries_429_with_retry_after(self):
+        with StandInServer(statuses=[429, 429], retry_after=0.1) as server:
+            scheduler = RequestScheduler(retry=fast_retry())
+            adapter = ScheduledAdapter(OllamaAdapter(base_url=server.url, timeout=5), scheduler)
+
+            started = time.monotonic()
+            response = adapter.generate("hello")
+            elapsed = time.monotonic() - started
+
+        assert response.success and response.action == "trade"
+        assert server.calls == 3
+        assert elapsed >= 0.2
+        stats = scheduler.stats()["ollama"]
+        assert stats["rate_limited"] == 2
+        assert stats["retries"] == 2
+
+    def test_gives_up_after_max_retries(self):
+        with StandInServer(statuses=[503] * 5) as server:
+            scheduler = RequestScheduler(retry=fast_retry(max_retries=2))
+            response = scheduler.call(OllamaAdapter(base_url=server.url, timeout=5), "hello")
+
+        assert not response.success
+        assert response.raw_response["status_code"] == 503
+        assert server.calls == 3
+        assert scheduler.stats()["ollama"]["gave_up"] == 1
+
+    def test_client_errors_not_retried(self):
+        with StandInServer(statuses=[400]) as server:
+            scheduler = RequestScheduler(retry=fast_retry())
+            response = scheduler.call(OllamaAdapter(base_url=server.url, timeout=5), "hello")
+
+        assert not response.success
+        assert server.calls == 1
+
+    def test_async_concurrency_limit(self):
+        with StandInServer(latency=0.05) as server:
+            scheduler = RequestScheduler(limits={"ollama": ProviderLimits(max_concurrency=2)})
+            adapter = ScheduledAdapter(OllamaAdapter(base_url=server.url, timeout=5), scheduler)
+
+            async def run_all():
+                return await asyncio.gather(*(adapter.agenerate(f"p{i}") for i in range(6)))
+
+            responses = asyncio.run(run_all())
+
+        assert all(r.success for r in responses)
+        assert server.max_in_flight <= 2
+        stats = scheduler.stats()["ollama"]
+        assert stats["max_queue_depth"] >= 3
+        assert stats["total_wait_s"] > 0
+
+    def test_requests_per_minute(self):
+        with StandInServer() as server:
+            # 분당 600회 = 초당 10회, 버스트 600 → 버스트를 다 쓴 뒤부터 대기
+            scheduler = RequestScheduler(limits={"ollama": ProviderLimits(requests_per_minute=600)})
+            state = scheduler._state("ollama")
+            state.request_bucket.tokens = 0
+            adapter = OllamaAdapter(base_url=server.url, timeout=5)
+
+            started = time.monotonic()
+            scheduler.call(adapter, "a")
+            scheduler.call(adapter, "b")
+            elapsed = time.monotonic() - started
+
+        assert elapsed >= 0.15
+        assert scheduler.stats()["ollama"]["max_wait_s"] > 0
+
+    def test_tokens_per_minute_uses_budget_estimate(self):
+        # 한글 프롬프트도 토큰 예산과 같은 추정기로 차감 (문자 수 // 4가 아니라)
+        prompt = "에너지가 부족합니다. 시장으로 이동할까요?"
+        with StandInServer() as server:
+            scheduler = RequestScheduler(limits={"ollama": ProviderLimits(tokens_per_minute=100000)})
+            bucket = scheduler._state("ollama").token_bucket
+            before = bucket.tokens
+            scheduler.call(OllamaAdapter(base_url=server.url, timeout=5), prompt, max_tokens=50)
+
+        consumed = before - bucket.tokens
+        assert estimate_request_tokens(prompt, 50) == estimate_prompt_tokens(prompt) + 50
+        assert consumed == pytest.approx(estimate_request_tokens(prompt, 50))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,545 @@
+"""턴 스케줄링 모드 테스트"""
+
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agora.adapters import BaseLLMAdapter, LayeredPrompt, LLMResponse
+from agora.core.budget import estimate_prompt_tokens
+from agora.core.simulation import Simulation
+
+
+class TestSimultaneousScheduling:
+    """동시 결정 모드 테스트"""
+
+    def test_unknown_mode_rejected(self, tmp_path, make_simulation):
+        with pytest.raises(ValueError):
+            make_simulation(tmp_path, scheduling="bogus")
+
+    def test_runs_and_logs_resolution_order(self, tmp_path, make_simulation):
+        sim = make_simulation(tmp_path, scheduling="simultaneous")
+        sim.run()
+
+        with open(sim.run_dir / "simulation_log.jsonl", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        turns = [e for e in entries if e["action_type"] != "death"]
+        assert turns
+        first_epoch = [e for e in turns if e["epoch"] == 1]
+        assert [e["resolution_order"] for e in first_epoch] == list(range(1, len(first_epoch) + 1))
+
+    def test_contexts_share_snapshot(self, tmp_path, make_simulation):
+        sim = make_simulation(tmp_path, scheduling="simultaneous")
+        prompts = []
+
+        class Recorder(BaseLLMAdapter):
+            def generate(self, prompt, max_tokens=1000, response_schema=None):
+                prompts.append(prompt)
+                return LLMResponse(thought="", action="trade")
+
+        sim.adapters = {agent.id: Recorder(model="recorder") for agent in sim.agents}
+        sim.run_epoch(1)
+
+        # 거래로 에너지가 바뀌어도 모든 프롬프트는 같은 생존자/빈부격차 스냅샷을 본다
+        gini_lines = {line for p in prompts for line in p.splitlines() if "빈부격차:" in line}
+        assert len(prompts) == len(sim.agents)
+        assert len(gini_lines) == 1
+
+    def test_seed_determinism(self, tmp_path, make_simulation, read_actions):
+        first = make_simulation(tmp_path / "a", scheduling="simultaneous")
+        first.run()
+        second = make_simulation(tmp_path / "b", scheduling="simultaneous")
+        second.run()
+        assert read_actions(first) == read_actions(second)
+
+
+class TestPipelinedScheduling:
+    """투기적 파이프라인 모드 테스트"""
+
+    @pytest.mark.parametrize("depth", [1, 2])
+    def test_matches_sequential(self, tmp_path, depth, make_simulation, read_actions, use_hash_adapters):
+        sequential = make_simulation(tmp_path / "seq", total_epochs=8)
+        use_hash_adapters(sequential)
+        sequential.run()
+
+        pipelined = make_simulation(
+            tmp_path / "pipe", total_epochs=8,
+            scheduling="pipelined", speculation_depth=depth,
+        )
+        use_hash_adapters(pipelined)
+        pipelined.run()
+
+        assert pipelined.event_lag == 0
+        assert read_actions(pipelined) == read_actions(sequential)
+        # 겹친 턴의 로그로 무효가 된 투기 실행은 버리고 다시 호출한다
+        report = pipelined.get_speculation_report()
+        assert report["misses"] > 0
+        assert report["miss_reasons"]["recent_logs"] > 0
+
+        with open(pipelined.run_dir / "performance.json", encoding="utf-8") as f:
+            assert json.load(f)["speculation"]["hits"] == report["hits"]
+
+    @pytest.mark.parametrize("depth", [1, 2])
+    def test_event_lag_keeps_speculations_valid(
+        self, tmp_path, depth, make_simulation, read_actions, use_hash_adapters,
+    ):
+        # event_lag >= speculation_depth면 겹친 턴의 로그가 투기/실제 프롬프트 모두에서 빠진다
+        lagged = {"context": {"event_lag": depth}}
+        sequential = make_simulation(tmp_path / "seq", total_epochs=10, config_overrides=lagged)
+        use_hash_adapters(sequential)
+        sequential.run()
+
+        sim = make_simulation(
+            tmp_path / "pipe", total_epochs=10, config_overrides=lagged,
+            scheduling="pipelined", speculation_depth=depth,
+        )
+        use_hash_adapters(sim)
+        sim.run()
+
+        assert read_actions(sim) == read_actions(sequential)
+
+        report = sim.get_speculation_report()
+        assert report["hits"] + report["misses"] > 50
+        assert report["hit_rate"] > 0.6
+        assert "recent_logs" not in report["miss_reasons"]
+
+    def test_event_lag_shorter_than_depth(self, tmp_path, make_simulation, read_actions, use_hash_adapters):
+        # 기준 턴이 아직 시작하지 않은 투기 실행은 지금까지의 로그로 만들고, 다르면 다시 호출
+        lagged = {"context": {"event_lag": 1}}
+        sequential = make_simulation(tmp_path / "seq", total_epochs=6, config_overrides=lagged)
+        use_hash_adapters(sequential)
+        sequential.run()
+
+        pipelined = make_simulation(
+            tmp_path / "pipe", total_epochs=6, config_overrides=lagged,
+            scheduling="pipelined", speculation_depth=2,
+        )
+        use_hash_adapters(pipelined)
+        pipelined.run()
+
+        assert read_actions(pipelined) == read_actions(sequential)
+
+    def test_event_lag_hides_latest_turns(self, tmp_path, make_simulation, hash_adapter):
+        sim = make_simulation(
+            tmp_path, total_epochs=1, config_overrides={"context": {"event_lag": 2}},
+        )
+        seen = []
+
+        class Recorder(hash_adapter):
+            def generate(self, prompt, max_tokens=1000, response_schema=None):
+                seen.append(len(sim._visible_logs(sim._log_horizon)))
+                return super().generate(prompt, max_tokens, response_schema)
+
+        sim.adapters = {agent.id: Recorder(model="hash", agent_id=agent.id) for agent in sim.agents}
+        sim.run()
+
+        # 처음 세 턴은 에폭 시작 시점, 그 뒤로는 두 턴 전 시작 시점까지의 로그만 보임
+        assert seen[:3] == [0, 0, 0]
+        assert seen[3:] == list(range(1, len(seen) - 2))
+
+    def test_mock_is_not_speculated(self, tmp_path, make_simulation, read_actions):
+        sequential = make_simulation(tmp_path / "seq")
+        sequential.run()
+        pipelined = make_simulation(tmp_path / "pipe", scheduling="pipelined")
+        pipelined.run()
+
+        assert read_actions(pipelined) == read_actions(sequential)
+        assert pipelined.get_speculation_report()["hits"] == 0
+        assert pipelined.get_speculation_report()["misses"] == 0
+
+
+class TestStructuredOutputDecisions:
+    """구조화 출력 모드에서 스키마 전달과 파싱 실패 집계"""
+
+    def test_schema_passed_and_parse_stats(self, tmp_path, make_simulation):
+        sim = make_simulation(
+            tmp_path, total_epochs=2, config_overrides={"structured_output": {"enabled": True}},
+        )
+        schemas = []
+
+        class SchemaAdapter(BaseLLMAdapter):
+            def generate(self, prompt, max_tokens=1000, response_schema=None):
+                schemas.append(response_schema)
+                if len(schemas) % 2:
+                    return self.parse_structured('{"thought": "{nested}", "action": "idle"}')
+                return self.parse_response("not json")
+
+        sim.adapters = {agent.id: SchemaAdapter(model="schema") for agent in sim.agents}
+        sim.run()
+
+        assert schemas and all(s is not None and "action" in s["properties"] for s in schemas)
+        report = sim.get_parse_report()["SchemaAdapter:schema"]
+        assert report["calls"] == len(schemas)
+        assert report["parse_failures"] == len(schemas) // 2
+
+        with open(sim.run_dir / "performance.json", encoding="utf-8") as f:
+            performance = json.load(f)
+        assert performance["structured_output"] is True
+        assert performance["parse"]["SchemaAdapter:schema"]["calls"] == len(schemas)
+
+
+class TestCacheLayout:
+    """프롬프트 캐시용 고정/가변 블록 배치"""
+
+    @pytest.mark.parametrize("language", ["en", "ko"])
+    def test_stable_block_per_agent(self, tmp_path, language, make_simulation, hash_adapter):
+        sim = make_simulation(
+            tmp_path, total_epochs=3,
+            config_overrides={"context": {"layout": "cache"}, "language": language},
+        )
+        prompts: dict[str, list] = {}
+
+        class Recorder(hash_adapter):
+            def generate(self, prompt, max_tokens=1000, response_schema=None):
+                prompts.setdefault(self.config["agent_id"], []).append(prompt)
+                return super().generate(prompt, max_tokens, response_schema)
+
+        sim.adapters = {agent.id: Recorder(model="hash", agent_id=agent.id) for agent in sim.agents}
+        sim.run()
+
+        for agent_id, agent_prompts in prompts.items():
+            assert all(isinstance(p, LayeredPrompt) for p in agent_prompts)
+            assert len({p.system for p in agent_prompts}) == 1
+            assert agent_id in agent_prompts[0].system
+            assert "energy" not in agent_prompts[0].system.split("\n")[-1].lower()
+
+        with open(sim.run_dir / "metadata.json", encoding="utf-8") as f:
+            assert json.load(f)["context_layout"] == "cache"
+
+    def test_stable_block_tokens_recorded(self, tmp_path, make_simulation, capsys):
+        sim = make_simulation(tmp_path, config_overrides={"context": {"layout": "cache"}})
+        with open(sim.run_dir / "metadata.json", encoding="utf-8") as f:
+            tokens = json.load(f)["stable_block_tokens"]
+        assert 0 < tokens["min"] <= tokens["max"]
+        # mock 어댑터에는 최소 캐시 길이가 없다
+        assert "최소 캐시 길이" not in capsys.readouterr().out
+
+    def test_short_stable_block_warned_for_anthropic(self, tmp_path, make_simulation, capsys):
+        # 기본 페르소나의 고정 블록은 Anthropic 최소 캐시 길이보다 짧다
+        sim = make_simulation(
+            tmp_path, config_overrides={"context": {"layout": "cache"}, "default_adapter": "anthropic"},
+        )
+        assert sim.metadata["stable_block_tokens"]["max"] < 1024
+        assert "최소 캐시 길이" in capsys.readouterr().out
+
+    def test_default_layout_unchanged(self, tmp_path, make_simulation):
+        sim = make_simulation(tmp_path, total_epochs=1)
+        prompt = sim._build_agent_context(sim.agents[0])
+        assert not isinstance(prompt, LayeredPrompt)
+
+
+class TestTokenBudgetDecisions:
+    """토큰 예산 모드에서 출력 max_tokens 전달과 턴별 토큰 기록"""
+
+    def test_budget_end_to_end(self, tmp_path, make_simulation, hash_adapter):
+        sim = make_simulation(
+            tmp_path, total_epochs=12,
+            config_overrides={"context": {"enforce_budget": True}},
+        )
+        calls = []
+
+        class BudgetAdapter(hash_adapter):
+            def generate(self, prompt, max_tokens=1000, response_schema=None):
+                agent = sim.agents_by_id[self.config["agent_id"]]
+                calls.append((agent.energy, max_tokens))
+                return super().generate(prompt, max_tokens, response_schema)
+
+        sim.adapters = {agent.id: BudgetAdapter(model="hash", agent_id=agent.id) for agent in sim.agents}
+        sim.run()
+
+        assert {max_tokens for _, max_tokens in calls} >= {500, 250}
+        for energy, max_tokens in calls:
+            assert max_tokens == (1000 if energy >= 100 else 500 if energy >= 50 else 250)
+
+        with open(sim.run_dir / "simulation_log.jsonl", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        decisions = [e for e in entries if "prompt_tokens" in e]
+        assert len(decisions) == len(calls)
+        assert all(e["prompt_tokens"] > 0 and e["completion_tokens"] > 0 for e in decisions)
+
+    def test_long_sections_trimmed_to_budget(self, tmp_path, make_simulation):
+        sim = make_simulation(tmp_path, config_overrides={"context": {"enforce_budget": True}})
+        agent = sim.agents[0]
+        agent.energy = 150
+        sim.recent_logs = [
+            {"action_type": "speak", "agent_id": "citizen_01", "content": "word " * 200}
+            for _ in range(10)
+        ]
+
+        read_set: dict = {}
+        prompt = sim._build_agent_context(agent, read_set=read_set)
+        assert estimate_prompt_tokens(prompt) <= 2000
+        assert 0 < read_set["recent_logs"].count("\n") < 9  # 오래된 사건부터 제거
+
+        sim.enforce_budget = False
+        assert estimate_prompt_tokens(sim._build_agent_context(agent)) > 2000
+
+
+class TestObservationDecisions:
+    """규칙 기반 어댑터는 모든 스케줄링 모드에서 프롬프트를 렌더링하지 않는다"""
+
+    @pytest.mark.parametrize("scheduling", ["sequential", "simultaneous", "pipelined"])
+    def test_mock_never_renders(self, tmp_path, monkeypatch, scheduling, make_simulation):
+        sim = make_simulation(tmp_path, scheduling=scheduling, total_epochs=3)
+
+        def render(*args, **kwargs):
+            raise AssertionError("mock 턴에서 프롬프트 렌더링")
+
+        monkeypatch.setattr(sim, "_build_agent_context", render)
+        sim.run()
+
+        with open(sim.run_dir / "simulation_log.jsonl", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        decisions = [e for e in entries if "completion_tokens" in e]
+        assert decisions and not any("prompt_tokens" in e for e in decisions)
+
+
+class TestTwoPhaseDecisions:
+    """2단계 결정: 행동 단계는 항상, 내용 단계는 speak/whisper만"""
+
+    @pytest.mark.parametrize("scheduling", ["sequential", "simultaneous"])
+    def test_content_only_for_speech(self, tmp_path, scheduling, make_simulation):
+        sim = make_simulation(
+            tmp_path, scheduling=scheduling, total_epochs=3,
+            config_overrides={"decision": {"mode": "two_phase", "action_max_tokens": 32}, "language": "en"},
+        )
+        calls = []
+
+        class PhaseAdapter(BaseLLMAdapter):
+            def generate(self, prompt, max_tokens=1000, response_schema=None):
+                agent_id = self.config["agent_id"]
+                if "Decide only your action" in prompt:
+                    calls.append(("action", agent_id, max_tokens))
+                    action = "speak" if agent_id.startswith("citizen") else "trade"
+                    return self.parse_response(f'{{"action": "{action}"}}')
+                calls.append(("content", agent_id, max_tokens))
+                assert "You decided to 'speak'" in prompt
+                return self.parse_response("Friends, let us share our energy.")
+
+        sim.adapters = {agent.id: PhaseAdapter(model="phase", agent_id=agent.id) for agent in sim.agents}
+        sim._init_decision_mode()
+        sim.run()
+
+        action_calls = [c for c in calls if c[0] == "action"]
+        content_calls = [c for c in calls if c[0] == "content"]
+        assert all(max_tokens == 32 for _, _, max_tokens in action_calls)
+        assert content_calls and all(agent_id.startswith("citizen") for _, agent_id, _ in content_calls)
+
+        with open(sim.run_dir / "simulation_log.jsonl", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        speeches = [e for e in entries if e.get("action_type") == "speak"]
+        assert speeches and all(e["content"] == "Friends, let us share our energy." for e in speeches)
+        assert all(set(e["phase_tokens"]) == {"action", "content"} for e in speeches)
+        trades = [e for e in entries if e.get("action_type") == "trade"]
+        assert trades and all(set(e["phase_tokens"]) == {"action"} for e in trades)
+
+        with open(sim.run_dir / "epoch_summary.jsonl", encoding="utf-8") as f:
+            summary = json.loads(f.readline())
+        assert summary["decisions"]["wall_clock_s"] >= 0
+        with open(sim.run_dir / "performance.json", encoding="utf-8") as f:
+            report = json.load(f)["decisions"]
+        assert report["mode"] == "two_phase"
+        assert report["action_calls"] == len(action_calls)
+        assert report["content_calls"] == len(content_calls)
+
+
+class TestModelAffinity:
+    """모델 친화 순서: 요청을 모델별로 묶고 에폭별 모델 전환 횟수 기록"""
+
+    @pytest.fixture
+    def use_mixed_models(self, hash_adapter):
+        """상인은 mistral, 나머지는 exaone 모델로 요청 순서를 기록하는 어댑터로 바꾸는 함수"""
+        def use(sim: Simulation, dispatched: list) -> None:
+            class Recorder(hash_adapter):
+                async def agenerate(self, prompt, max_tokens=1000, response_schema=None):
+                    dispatched.append(self.model)
+                    return self.generate(prompt, max_tokens, response_schema)
+
+            sim.adapters = {
+                agent.id: Recorder(model="mistral" if agent.persona == "merchant" else "exaone")
+                for agent in sim.agents
+            }
+
+        return use
+
+    @staticmethod
+    def switches(models: list) -> int:
+        return sum(1 for a, b in zip(models, models[1:]) if a != b)
+
+    def test_simultaneous_groups_requests(self, tmp_path, make_simulation, read_actions, use_mixed_models):
+        runs = {}
+        for affinity in (False, True):
+            sim = make_simulation(
+                tmp_path / str(affinity), total_epochs=4,
+                scheduling="simultaneous", model_affinity=affinity,
+            )
+            dispatched: list = []
+            use_mixed_models(sim, dispatched)
+            sim.run()
+            runs[affinity] = (sim, dispatched)
+
+        grouped_sim, grouped = runs[True]
+        shuffled_sim, shuffled = runs[False]
+        # 직전 모델 묶음부터 보내므로 런 전체에서 에폭당 최대 한 번만 바뀐다
+        assert self.switches(grouped) <= 4 < self.switches(shuffled)
+        assert read_actions(grouped_sim) == read_actions(shuffled_sim)
+
+        with open(grouped_sim.run_dir / "epoch_summary.jsonl", encoding="utf-8") as f:
+            per_epoch = [json.loads(line)["model_switches"]["unknown"] for line in f]
+        assert sum(per_epoch) == self.switches(grouped)
+        with open(grouped_sim.run_dir / "performance.json", encoding="utf-8") as f:
+            assert json.load(f)["model_switches"] == {"model_affinity": True, "unknown": sum(per_epoch)}
+
+    def test_pipelined_keeps_sequential_results(self, tmp_path, make_simulation, read_actions, use_mixed_models):
+        sequential = make_simulation(tmp_path / "seq", total_epochs=6)
+        use_mixed_models(sequential, [])
+        sequential.run()
+
+        pipelined = make_simulation(
+            tmp_path / "pipe", total_epochs=6,
+            scheduling="pipelined", speculation_depth=2, model_affinity=True,
+        )
+        dispatched: list = []
+        use_mixed_models(pipelined, dispatched)
+        pipelined.run()
+
+        assert read_actions(pipelined) == read_actions(sequential)
+        # 투기 실행은 현재 턴과 같은 모델만이라 (hit이면 같은 모델 요청이 앞당겨져) 전환이 순차 실행보다 많지 않다
+        assert self.switches(dispatched) == sum(pipelined.get_model_switch_report().values())
+        assert self.switches(dispatched) <= sum(sequential.get_model_switch_report().values())
+
+
+class TestDeadlines:
+    """턴/에폭 데드라인을 넘긴 결정은 mock 규칙으로 대체하고 로그에 표시"""
+
+    @pytest.fixture
+    def use_stalling_adapters(self, hash_adapter):
+        """stalled_personas(생략시 전원)의 비동기 호출이 delay초 멈추는 어댑터로 바꾸는 함수"""
+        def use(sim: Simulation, delay, stalled_personas=None) -> None:
+            class Stalling(hash_adapter):
+                async def agenerate(self, prompt, max_tokens=1000, response_schema=None):
+                    if stalled_personas is None or self.config.get("persona") in stalled_personas:
+                        await asyncio.sleep(delay)
+                    return self.generate(prompt, max_tokens, response_schema)
+
+            sim.adapters = {
+                agent.id: Stalling(model="hash", persona=agent.persona, agent_id=agent.id)
+                for agent in sim.agents
+            }
+
+        return use
+
+    @staticmethod
+    def read_sources(sim: Simulation) -> list[tuple]:
+        with open(sim.run_dir / "simulation_log.jsonl", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        return [
+            (e["persona"], e.get("decision_source"), e.get("deadline_missed"))
+            for e in entries if e["action_type"] != "death"
+        ]
+
+    @pytest.mark.parametrize("scheduling", ["sequential", "simultaneous", "pipelined"])
+    def test_turn_deadline_falls_back(self, tmp_path, scheduling, make_simulation, use_stalling_adapters):
+        sim = make_simulation(
+            tmp_path, total_epochs=2, scheduling=scheduling,
+            config_overrides={"deadline": {"turn_seconds": 0.05}},
+        )
+        use_stalling_adapters(sim, delay=5.0, stalled_personas={"merchant"})
+
+        started = time.perf_counter()
+        sim.run()
+        assert time.perf_counter() - started < 3.0
+
+        sources = self.read_sources(sim)
+        fallbacks = [s for s in sources if s[1] == "fallback"]
+        assert fallbacks and all(s == ("merchant", "fallback", "turn") for s in fallbacks)
+        assert all(s[1] == "primary" for s in sources if s[0] != "merchant")
+
+        with open(sim.run_dir / "performance.json", encoding="utf-8") as f:
+            report = json.load(f)["deadline"]
+        assert report["fallbacks"] == report["turn_misses"] == len(fallbacks)
+        assert report["models"] == {"Stalling:hash": {"fallbacks": len(fallbacks), "turn_misses": len(fallbacks)}}
+        assert report["fallback"] == "mock"
+        # 대체 결정은 mock 어댑터 몫으로 집계
+        assert sim.get_parse_report()["MockAdapter:mock"]["calls"] == len(fallbacks)
+
+    def test_epoch_budget_caps_epoch_time(self, tmp_path, make_simulation, use_stalling_adapters):
+        sim = make_simulation(
+            tmp_path, total_epochs=3,
+            config_overrides={"deadline": {"turn_seconds": 1.0, "epoch_seconds": 0.1}},
+        )
+        use_stalling_adapters(sim, delay=0.04)
+        sim.run()
+
+        with open(sim.run_dir / "epoch_summary.jsonl", encoding="utf-8") as f:
+            summaries = [json.loads(line) for line in f]
+        for summary in summaries:
+            assert summary["decisions"]["wall_clock_s"] < 0.5
+            assert summary["deadline"]["epoch_misses"] > 0
+            assert summary["deadline"]["turn_misses"] == 0
+
+        sources = self.read_sources(sim)
+        assert {s[2] for s in sources} == {None, "epoch"}
+        with open(sim.run_dir / "metadata.json", encoding="utf-8") as f:
+            assert json.load(f)["deadline"]["epoch_seconds"] == 0.1
+
+    def test_no_deadline_keeps_log_unchanged(self, tmp_path, make_simulation, use_hash_adapters):
+        sim = make_simulation(tmp_path, total_epochs=2)
+        use_hash_adapters(sim)
+        sim.run()
+
+        assert sim.fallback_adapters == {}
+        assert {s[1] for s in self.read_sources(sim)} == {None}
+
+    def test_fallback_keeps_global_random(self, tmp_path, make_simulation):
+        # 대체 여부는 타이밍에 달렸으므로 전역 난수 흐름(턴 순서 셔플 등)을 건드리면 안 된다
+        sim = make_simulation(tmp_path, config_overrides={"deadline": {"turn_seconds": 0.05}})
+        decisions = []
+        for agent in sim.agents:
+            observation = sim._observe(agent)
+            state = random.getstate()
+            decisions.append(sim.fallback_adapters[agent.id].decide(observation).action)
+            assert random.getstate() == state
+
+        other = make_simulation(tmp_path / "other", config_overrides={"deadline": {"turn_seconds": 0.05}})
+        assert decisions == [
+            other.fallback_adapters[agent.id].decide(other._observe(agent)).action
+            for agent in other.agents
+        ]
+
+    def test_fallback_turns_recorded_and_replayed(self, tmp_path, make_simulation, read_actions, use_stalling_adapters):
+        deadline = {"turn_seconds": 0.05}
+        sim = make_simulation(
+            tmp_path / "record", total_epochs=3,
+            config_overrides={"deadline": deadline, "cassette": {"mode": "record"}},
+        )
+        use_stalling_adapters(sim, delay=5.0, stalled_personas={"merchant"})
+        for agent_id, adapter in sim.adapters.items():
+            sim._recorders[agent_id].inner = adapter
+            sim.adapters[agent_id] = sim._recorders[agent_id]
+        sim.run()
+        assert any(s[1] == "fallback" for s in self.read_sources(sim))
+
+        replay = make_simulation(
+            tmp_path / "replay", total_epochs=3,
+            config_overrides={
+                "deadline": deadline,
+                "cassette": {"mode": "replay", "path": str(sim.run_dir / "cassette.jsonl")},
+            },
+        )
+        assert replay.fallback_adapters == {}
+        replay.run()
+
+        assert read_actions(replay) == read_actions(sim)
+        assert replay.cassette.stats()["exhausted"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
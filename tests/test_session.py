@@ -0,0 +1,208 @@
+"""Ollama 세션 모드(/api/chat + 델타 프롬프트) 테스트"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.adapters import (
+    ChatSession, OllamaAdapter, OllamaRouter, RequestScheduler, RetryPolicy, RoutedAdapter, ScheduledAdapter,
+)
+
+
+class ChatServer:
+    """Ollama /api/chat 대역: 이전 대화가 KV 캐시에 있다고 보고 마지막 user 메시지만 평가
+
+    prompt_eval_count는 평가한 문자 수 // 4, prompt_eval_duration은 토큰당 1ms.
+    fail_at에 든 순번(1부터)의 요청은 500으로 실패한다.
+    """
+
+    def __init__(self, fail_first=0, fail_at=()):
+        self.requests: list[dict] = []
+        self.fail_at = set(range(1, fail_first + 1)) | set(fail_at)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                # 라우터 상태 확인 (/api/tags, /api/ps)
+                body = json.dumps({"models": [{"name": "mock:latest"}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with server._lock:
+                    server.requests.append(payload)
+                    failing = len(server.requests) in server.fail_at
+
+                if failing:
+                    self.send_response(500)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                tokens = len(payload["messages"][-1]["content"]) // 4
+                body = json.dumps({
+                    "message": {"role": "assistant", "content": '{"thought": "ok", "action": "idle"}'},
+                    "prompt_eval_count": tokens,
+                    "prompt_eval_duration": tokens * 1_000_000,
+                    "done": True,
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True,
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestChatSession:
+    """어댑터 단위 세션 테스트"""
+
+    def test_history_and_savings(self):
+        with ChatServer() as server:
+            adapter = OllamaAdapter(base_url=server.url, session=True, keep_alive="30m")
+            assert not adapter.speculative_safe
+
+            adapter.generate("full context " * 40)
+            adapter.generate("delta")
+
+        first, second = server.requests
+        assert len(first["messages"]) == 1 and first["keep_alive"] == "30m"
+        assert [m["role"] for m in second["messages"]] == ["user", "assistant", "user"]
+        assert second["messages"][-1]["content"] == "delta"
+
+        stats = adapter.chat_session.stats()
+        assert stats["full_turns"] == 1 and stats["delta_turns"] == 1
+        assert stats["saved_tokens_estimate"] == 130 - 1
+        assert stats["saved_ms_estimate"] == pytest.approx(129.0)
+
+    def test_failure_keeps_history(self):
+        with ChatServer(fail_first=1) as server:
+            adapter = OllamaAdapter(base_url=server.url, session=True)
+            adapter.chat_session.commit("old", "reply")
+            response = adapter.generate("delta")
+
+        assert not response.success
+        assert adapter.chat_session.turns == 1
+        assert not adapter.chat_session.needs_full_context
+
+    def test_retry_after_5xx_resends_history(self):
+        with ChatServer(fail_at={2}) as server:
+            adapter = OllamaAdapter(base_url=server.url, session=True)
+            scheduled = ScheduledAdapter(adapter, RequestScheduler(retry=RetryPolicy(base_delay=0.0)))
+            scheduled.generate("full context " * 40)
+            response = scheduled.generate("delta")
+
+        assert response.success
+        failed, retried = server.requests[1:]
+        assert retried["messages"] == failed["messages"]
+        assert [m["role"] for m in retried["messages"]] == ["user", "assistant", "user"]
+        stats = adapter.chat_session.stats()
+        assert (stats["full_turns"], stats["delta_turns"]) == (1, 1)
+        assert stats["saved_tokens_estimate"] == 130 - 1
+
+    def test_router_resends_to_other_server(self):
+        # 첫 요청을 받은 서버가 다음(델타) 요청도 받아 실패하면 다른 서버가 같은 메시지를 받는다
+        with ChatServer(fail_at={2}) as a, ChatServer(fail_at={2}) as b:
+            adapter = RoutedAdapter(OllamaRouter([a.url, b.url]), model="mock", session=True)
+            adapter.generate("full context " * 40)
+            response = adapter.generate("delta")
+
+        assert response.success
+        first, other = (a, b) if len(a.requests) == 2 else (b, a)
+        assert len(other.requests) == 1
+        assert other.requests[0]["messages"] == first.requests[1]["messages"]
+        assert len(other.requests[0]["messages"]) == 3
+        stats = adapter.chat_session.stats()
+        assert (stats["full_turns"], stats["delta_turns"]) == (1, 1)
+
+    def test_max_turns(self):
+        session = ChatSession(max_turns=2)
+        session.commit("a", "b")
+        assert not session.needs_full_context
+        session.commit("c", "d")
+        assert session.needs_full_context
+
+
+class TestSessionSimulation:
+    """시뮬레이션에서 첫 턴은 전체 컨텍스트, 이후는 델타"""
+
+    def test_delta_after_failed_turn(self, tmp_path, make_simulation):
+        # 실패한 턴의 델타는 모델에 전달되지 않았으므로 다음 델타는 그 전 상태 기준
+        sim = make_simulation(
+            tmp_path,
+            config_overrides={"default_adapter": "ollama", "language": "en", "ollama": {"session": {"enabled": True}}},
+        )
+        agent = sim.agents[0]
+        chat_session = sim.adapters[agent.id].chat_session
+        start = agent.energy
+
+        chat_session.commit(sim._build_agent_context(agent), "reply")
+        agent.energy = start - 7
+        assert f"{start} → {start - 7}" in sim._build_agent_context(agent)  # 실패해 commit 없음
+        agent.energy = start - 9
+        assert f"{start} → {start - 9}" in sim._build_agent_context(agent)
+        chat_session.commit("delta", "reply")
+        agent.energy = start - 10
+        assert f"{start - 9} → {start - 10}" in sim._build_agent_context(agent)
+
+    @pytest.mark.parametrize("language, header", [("en", "[SINCE YOUR LAST TURN"), ("ko", "[지난 턴 이후 변화")])
+    def test_delta_prompts(self, tmp_path, language, header, make_simulation):
+        with ChatServer() as server:
+            sim = make_simulation(
+                tmp_path, total_epochs=3,
+                config_overrides={
+                    "default_adapter": "ollama",
+                    "language": language,
+                    "ollama": {"base_url": server.url, "session": {"enabled": True}},
+                },
+            )
+            sim.run()
+
+        first_turns = [r for r in server.requests if len(r["messages"]) == 1]
+        later_turns = [r for r in server.requests if len(r["messages"]) > 1]
+        assert len(first_turns) == len(sim.agents)
+        assert later_turns
+        for request in later_turns:
+            delta = request["messages"][-1]["content"]
+            assert delta.startswith(header)
+            assert len(delta) < len(request["messages"][0]["content"])
+
+        with open(sim.run_dir / "epoch_summary.jsonl", encoding="utf-8") as f:
+            summaries = [json.loads(line) for line in f]
+        assert summaries[0]["chat_session"]["delta_turns"] == 0
+        assert summaries[1]["chat_session"]["saved_ms_estimate"] > 0
+
+        with open(sim.run_dir / "performance.json", encoding="utf-8") as f:
+            report = json.load(f)["chat_session"]
+        assert report["total"]["delta_turns"] == len(later_turns)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
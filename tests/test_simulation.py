@@ -11,6 +11,11 @@ from agora.core.agent import Agent, create_agents_from_config
 from agora.core.environment import Environment, Space
 from agora.core.logger import calculate_gini_coefficient
 from agora.core.personas import get_persona_prompt, PERSONA_PROMPTS
+from agora.core.budget import estimate_line_tokens, estimate_prompt_tokens, fit_sections
+from agora.core.context import get_output_tokens
+from agora.core.history import HistoryEngine, HistoricalEvent
+from agora.core.inequality import InequalityTracker
+from agora.core.population import PopulationRegistry
 
 
 class TestAgent:
@@ -184,5 +189,194 @@ class TestPersonas:
         assert prompt == PERSONA_PROMPTS["citizen"]
 
 
+class TestTokenBudget:
+    """토큰 추정기와 섹션 다듬기 테스트"""
+
+    def test_estimate_is_additive_over_lines(self):
+        text = "Energy: 100/200\n시장에서 거래했습니다.\n- merchant_01 supported citizen_02."
+        assert estimate_prompt_tokens(text) == sum(estimate_line_tokens(l) for l in text.split("\n"))
+        assert estimate_line_tokens("") == 0
+        assert estimate_line_tokens("internationalization") == 1 + len("internationalization") // 8
+
+    def test_trim_order(self):
+        sections = {
+            "historical_summary": "- 에폭 3: big\n- 에폭 1: small",
+            "recent_events": "- a traded.\n- b traded.\n- c traded.",
+            "support_context": "[SUPPORT]\n- Top supporters: x",
+        }
+        total = sum(estimate_prompt_tokens(v) for v in sections.values())
+
+        # 역사 요약의 덜 중요한 뒤쪽 줄부터
+        fitted = fit_sections(sections, total - 1, "None")
+        assert fitted["historical_summary"] == "- 에폭 3: big"
+        assert fitted["recent_events"] == sections["recent_events"]
+
+        # 예산이 부족하면 최소 줄만 남김 (가장 최근 사건, 지지 관계 헤더)
+        fitted = fit_sections(sections, 0, "None")
+        assert fitted == {
+            "historical_summary": "None",
+            "recent_events": "- c traded.",
+            "support_context": "[SUPPORT]",
+        }
+
+    def test_output_tokens_by_energy(self):
+        assert get_output_tokens(150) == 1000
+        assert get_output_tokens(60) == 500
+        assert get_output_tokens(20) == 250
+        assert get_output_tokens(20, {"minimal": 300}) == 300
+
+
+class TestInequalityTracker:
+    """점진 지니 계수가 정렬 방식과 같은 값인지"""
+
+    def test_matches_sorted_gini(self):
+        import random
+
+        rng = random.Random(3)
+        tracker = InequalityTracker(max_value=200)
+        values: list[int] = []
+        for _ in range(3000):
+            if values and rng.random() < 0.4:
+                value = values.pop(rng.randrange(len(values)))
+                tracker.remove(value)
+            else:
+                value = rng.choice([0, 1, 5, 5, 100, 200, rng.randint(0, 200)])
+                values.append(value)
+                tracker.add(value)
+            assert tracker.gini() == calculate_gini_coefficient(values)
+        assert (tracker.n, tracker.total) == (len(values), sum(values))
+
+    def test_edge_cases(self):
+        tracker = InequalityTracker(max_value=10)
+        assert tracker.gini() == 0.0
+        tracker.add(0)
+        tracker.add(0)
+        assert tracker.gini() == 0.0
+
+        # 상한을 넘는 값은 트리를 키워서 받는다
+        tracker.add(50)
+        assert tracker.max_value >= 50
+        assert tracker.gini() == calculate_gini_coefficient([0, 0, 50])
+
+        tracker.update(50, 7)
+        assert tracker.gini() == calculate_gini_coefficient([0, 0, 7])
+        with pytest.raises(ValueError):
+            tracker.remove(3)
+
+
+class TestHistoryEngine:
+    """상위 k 요약과 색인이 전체 정렬/스캔과 같은 결과인지"""
+
+    @staticmethod
+    def sorted_summary(events: list[HistoricalEvent], detailed: bool, max_events: int) -> str:
+        ranked = sorted(events, key=lambda e: (e.importance, e.epoch), reverse=True)
+        selected = ranked[:max_events] if detailed else [e for e in ranked if e.importance >= 4][:5]
+        if not selected:
+            return "특별히 기록할 만한 사건이 없습니다."
+        return "\n".join(f"- 에폭 {e.epoch}: {e.description}" for e in selected)
+
+    def test_matches_full_sort(self):
+        import random
+
+        rng = random.Random(11)
+        engine = HistoryEngine()
+        assert engine.get_summary() == "아직 기록된 역사가 없습니다."
+        for i in range(400):
+            epoch = i // 8
+            kind = rng.choice(["death", "mutual_support", "tax_change", "crisis", "whisper_leaked"])
+            if kind == "death":
+                engine.record_death(epoch, f"agent_{rng.randrange(6)}")
+            elif kind == "mutual_support":
+                engine.record_auto(epoch, kind, agent_a=f"agent_{rng.randrange(6)}", agent_b="agent_0")
+            elif kind == "tax_change":
+                engine.record_tax_change(epoch, 0.1, 0.2)
+            elif kind == "crisis":
+                engine.record_crisis(epoch, "drought")
+            else:
+                engine.record(epoch, kind, f"leak {i}", importance=rng.randint(1, 5), agents_involved=["agent_1"])
+
+            if i % 37 == 0:
+                for detailed, max_events in ((True, 10), (False, 5), (True, 20), (True, 100)):
+                    assert engine.get_summary(detailed, max_events) == self.sorted_summary(
+                        engine.events, detailed, max_events
+                    )
+
+        for event_type in ("death", "first_death", "crisis", "unknown"):
+            assert engine.get_events_by_type(event_type) == [e for e in engine.events if e.event_type == event_type]
+        for agent_id in ("agent_0", "agent_1", "nobody"):
+            assert engine.get_events_involving(agent_id) == [e for e in engine.events if agent_id in e.agents_involved]
+
+    def test_summary_reused_until_new_event(self):
+        engine = HistoryEngine()
+        engine.record_crisis(1, "drought")
+        first = engine.get_summary(detailed=True)
+        assert engine.get_summary(detailed=True) is first
+
+        engine.record_death(2, "agent_1")
+        assert engine.get_summary(detailed=True) != first
+
+        # record()를 거치지 않은 변경도 반영
+        engine.events.append(HistoricalEvent(epoch=3, event_type="custom", description="x", importance=5))
+        assert engine.get_summary(detailed=True).startswith("- 에폭 3: x")
+        assert len(engine.get_events_by_type("custom")) == 1
+
+        engine.clear()
+        assert engine.get_summary() == "아직 기록된 역사가 없습니다."
+        assert engine.get_events_by_type("crisis") == []
+
+
+class TestPopulationRegistry:
+    """인구 색인이 전체 스캔과 같은 결과를 유지하는지"""
+
+    @staticmethod
+    def assert_matches_scan(registry: PopulationRegistry, agents: list[Agent]) -> None:
+        alive = [a for a in agents if a.is_alive]
+        assert registry.alive_agents() == alive
+        assert registry.alive_count == len(alive)
+        assert registry.total_energy == sum(a.energy for a in alive)
+        assert registry.total_influence == sum(a.influence for a in alive)
+        for location in ("plaza", "market", "alley_a"):
+            assert registry.agents_in(location) == [a for a in alive if a.location == location]
+        assert registry.exhausted_agents() == [a for a in agents if a.alive and a.energy <= 0]
+        assert registry.gini() == calculate_gini_coefficient([a.energy for a in alive])
+
+    def test_tracks_random_mutations(self):
+        import random
+
+        rng = random.Random(7)
+        agents = [Agent(id=f"a{i}", persona="citizen", energy=rng.randint(0, 30)) for i in range(40)]
+        registry = PopulationRegistry(agents)
+        self.assert_matches_scan(registry, agents)
+
+        for _ in range(2000):
+            agent = rng.choice(agents)
+            op = rng.randrange(5)
+            if op == 0:
+                agent.decay_energy(rng.randint(1, 10))
+            elif op == 1:
+                agent.gain_energy(rng.randint(1, 10))
+            elif op == 2:
+                agent.move_to(rng.choice(["plaza", "market", "alley_a"]))
+            elif op == 3:
+                agent.gain_influence()
+            elif agent.energy <= 0:
+                agent.alive = False
+        self.assert_matches_scan(registry, agents)
+
+    def test_returned_lists_are_copies(self):
+        agents = [Agent(id="a", persona="citizen"), Agent(id="b", persona="citizen")]
+        registry = PopulationRegistry(agents)
+        registry.alive_agents().reverse()
+        assert registry.alive_agents() == agents
+
+    def test_simulation_uses_registry(self, tmp_path, make_simulation):
+        sim = make_simulation(tmp_path, total_epochs=15)
+        sim.run()
+        self.assert_matches_scan(sim.population, sim.agents)
+        assert sim.get_agents_in_location("market") == [
+            a for a in sim.agents if a.is_alive and a.location == "market"
+        ]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,147 @@
+"""Ollama 모델 예열/keep_alive 고정/num_ctx 자동 설정 테스트"""
+
+import asyncio
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agora.adapters import OllamaAdapter
+
+
+class GenerateServer:
+    """Ollama /api/generate 대역: 평가한 프롬프트 문자 수 // 4를 토큰 수로 보고
+
+    num_ctx가 직전 요청과 다르면 모델을 다시 올린 것으로 보고 load_duration을 채운다.
+    """
+
+    def __init__(self):
+        self.requests: list[dict] = []
+        self._num_ctx = object()
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with server._lock:
+                    server.requests.append(payload)
+                    num_ctx = payload.get("options", {}).get("num_ctx")
+                    reloaded = num_ctx != server._num_ctx
+                    server._num_ctx = num_ctx
+
+                tokens = len(payload.get("prompt", "")) // 4
+                body = json.dumps({
+                    "response": '{"thought": "ok", "action": "idle"}',
+                    "load_duration": 500_000_000 if reloaded else 0,
+                    "prompt_eval_count": tokens,
+                    "prompt_eval_duration": tokens * 1_000_000,
+                    "done": True,
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True,
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestOllamaWarmUp:
+    """예열 결과와 런 동안의 요청 설정"""
+
+    def test_adapter_warm_up(self):
+        with GenerateServer() as server:
+            adapter = OllamaAdapter(base_url=server.url, num_ctx=2048, keep_alive=-1)
+            result = adapter.warm_up("x" * 400)
+            assert adapter.release("5m")
+
+        warm, release = server.requests
+        assert warm["options"] == {"num_predict": 1, "temperature": adapter.temperature, "num_ctx": 2048}
+        assert warm["keep_alive"] == -1
+        assert result["prompt_eval_count"] == 100 and result["load_ms"] == 500.0
+        assert release == {"model": adapter.model, "keep_alive": "5m"}
+
+    def test_warm_up_unreachable(self):
+        adapter = OllamaAdapter(base_url="http://127.0.0.1:9", timeout=1)
+        assert "error" in adapter.warm_up()
+
+    def test_simulation_auto_num_ctx(self, tmp_path, make_simulation):
+        with GenerateServer() as server:
+            sim = make_simulation(
+                tmp_path, total_epochs=1,
+                config_overrides={
+                    "default_adapter": "ollama",
+                    "ollama": {"base_url": server.url, "num_ctx": "auto", "warm_up": {"enabled": True}},
+                },
+            )
+            warm_up_requests = len(server.requests)
+            sim.run()
+
+        with open(sim.run_dir / "metadata.json", encoding="utf-8") as f:
+            (entry,) = json.load(f)["warm_up"]
+        measured = entry["prompt_tokens"]
+        assert entry["agents"] == len(sim.agents)
+        # 초기 프롬프트가 아니라 프롬프트 예산 상한(2000 추정 토큰)을 실제 토큰으로 환산해 잡는다
+        ceiling = entry["prompt_ceiling_tokens"]
+        assert ceiling > measured
+        assert entry["num_ctx"] == -(-int(ceiling * 1.5 + 1000) // 256) * 256
+        assert entry["num_ctx"] >= ceiling + 1000
+        assert entry["probe"]["load_ms"] == 500.0 and entry["load_ms"] == 500.0
+        assert entry["prompt_eval_ms"] == float(measured)
+
+        probe, final = server.requests[:warm_up_requests]
+        assert probe["options"]["num_ctx"] == 8192
+        assert final["options"]["num_ctx"] == entry["num_ctx"]
+
+        # 런 중 요청은 예열과 같은 설정이라 다시 올리지 않고, 끝나면 keep_alive를 되돌린다
+        turns = server.requests[warm_up_requests:-1]
+        assert turns and all(
+            r["options"]["num_ctx"] == entry["num_ctx"] and r["keep_alive"] == -1 for r in turns
+        )
+        assert server.requests[-1] == {"model": entry["model"], "keep_alive": "5m"}
+
+    def test_release_after_failed_run(self, tmp_path, make_simulation):
+        # 런 도중 예외가 나도 keep_alive를 되돌리고 이벤트 루프를 닫는다
+        with GenerateServer() as server:
+            sim = make_simulation(
+                tmp_path, total_epochs=3,
+                config_overrides={
+                    "default_adapter": "ollama",
+                    "ollama": {"base_url": server.url, "warm_up": {"enabled": True}},
+                },
+            )
+            sim._run_async(asyncio.sleep(0))
+
+            def fail(epoch, sim):
+                raise KeyboardInterrupt
+
+            with pytest.raises(KeyboardInterrupt):
+                sim.run(callback=fail)
+
+        assert server.requests[-1] == {"model": "mock", "keep_alive": "5m"}
+        assert sim._pinned_adapters == [] and sim._loop is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])